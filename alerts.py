@@ -0,0 +1,259 @@
+import ast
+import copy
+import csv
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from ratios import to_number
+
+# 관심 조건(알림 규칙) 엔진
+# 규칙 파일(JSON): [{"id": "frgn-lowpbr", "name": "외국인 순매수 + 저PBR + 자사주 5% 초과",
+#                   "when": "`외국인 순매매량` > 0 and PBR < 1 and `자사주 비율(%)` > 5"}, ...]
+# - when 은 DataFrame.eval/query 와 같은 문법 (공백/괄호가 있는 열 이름은 `백틱`, and/or/not, 0 < PER < 10, 시장 == 'KOSPI', in [...])
+# - 규칙을 읽을 때 한 번만 최상위 and 조건 단위로 쪼개서 numpy 배열 연산 코드로 컴파일하고,
+#   여러 규칙에 같은 조건이 있으면 한 번만 계산. 열도 규칙 전체에서 필요한 것만 한 번 읽음
+# - 실행마다 (규칙, 종목) 일치 목록을 직전 실행과 비교해서 새로 걸린 것만 피드(feed.csv, latest.json)에 남김
+
+RULES_FILE = 'alert_rules.json'
+ALERT_DIR = 'alerts'
+FEED_COLUMNS = ['실행일', '업데이트', '규칙', '규칙명', '종목코드', '종목명', '시장', '현재가']
+
+_BACKTICK = re.compile(r'`([^`]+)`')
+_CMP = {ast.Gt: '>', ast.GtE: '>=', ast.Lt: '<', ast.LtE: '<=', ast.Eq: '==', ast.NotEq: '!='}
+_ARITH = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+
+class RuleError(ValueError):
+    pass
+
+class _Vectorize(ast.NodeTransformer):
+    # 조건식 -> 열 배열(_c['열'])에 대한 numpy 연산. and/or/not 은 &/|/~, 연쇄 비교는 비교 여러 개의 &, in 은 isin()
+    def __init__(self, aliases):
+        self.aliases = aliases
+        self.columns = set()
+
+    def generic_visit(self, node):
+        allowed = (ast.Expression, ast.BoolOp, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Name, ast.Constant,
+                   ast.List, ast.Tuple, ast.Load, ast.And, ast.Or, ast.Not, ast.USub, ast.UAdd, ast.In, ast.NotIn) + _ARITH + tuple(_CMP)
+        if not isinstance(node, allowed):
+            raise RuleError(f"지원하지 않는 문법입니다: {type(node).__name__}")
+        return super().generic_visit(node)
+
+    def visit_Name(self, node):
+        if node.id in ('True', 'False'):
+            return ast.copy_location(ast.Constant(node.id == 'True'), node)
+        column = self.aliases.get(node.id, node.id)
+        self.columns.add(column)
+        return ast.copy_location(ast.Subscript(ast.Name('_c', ast.Load()), ast.Constant(column), ast.Load()), node)
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        out = node.values[0]
+        for value in node.values[1:]:
+            out = ast.BinOp(out, op, value)
+        return ast.copy_location(out, node)
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.copy_location(ast.UnaryOp(ast.Invert(), node.operand), node)
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        parts, left = [], node.left
+        for op, right in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)):
+                part = ast.Call(ast.Name('isin', ast.Load()), [left, right], [])
+                if isinstance(op, ast.NotIn):
+                    part = ast.UnaryOp(ast.Invert(), part)
+            else:
+                part = ast.Compare(left, [op], [right])
+            parts.append(part)
+            left = right
+        out = parts[0]
+        for part in parts[1:]:
+            out = ast.BinOp(out, ast.BitAnd(), part)
+        return ast.copy_location(out, node)
+
+def _parse(text):
+    # 백틱 열 이름은 파이썬 식별자로 바꿔서 파싱 (_col0, _col1 ...)
+    aliases = {}
+
+    def alias(m):
+        name = f"_col{len(aliases)}"
+        aliases[name] = m.group(1)
+        return name
+
+    try:
+        tree = ast.parse(_BACKTICK.sub(alias, text).strip(), mode='eval')
+    except SyntaxError as e:
+        raise RuleError(f"조건식을 해석할 수 없습니다: {text} ({e.msg})")
+    return tree.body, aliases
+
+def _conjuncts(node):
+    # 최상위 and 를 조건 목록으로 펼침 (연쇄 비교 0 < PER < 10 도 비교 두 개로)
+    if isinstance(node, ast.BoolOp) and isinstance(node.op, ast.And):
+        return [c for value in node.values for c in _conjuncts(value)]
+    if isinstance(node, ast.Compare) and len(node.ops) > 1:
+        lefts = [node.left] + node.comparators[:-1]
+        return [ast.Compare(l, [op], [r]) for l, op, r in zip(lefts, node.ops, node.comparators)]
+    return [node]
+
+def _condition_key(node, aliases):
+    # 같은 조건이면 규칙마다 쓴 모양(공백/백틱 여부)이 달라도 같은 키
+    node = copy.deepcopy(node)
+    for name in ast.walk(node):
+        if isinstance(name, ast.Name):
+            name.id = aliases.get(name.id, name.id)
+    return ast.unparse(node)
+
+class RuleSet:
+    def __init__(self, rules):
+        self.rules = []
+        self.conditions = {}
+        self._slots = {}
+        # 꺼 둔 규칙은 평가하지 않지만 직전 결과(state.json)는 유지 -> 다시 켰을 때 기존 일치 종목이 새로 걸린 것으로 나오지 않음
+        self.disabled = set()
+        seen = set()
+        for rule in rules:
+            if not rule.get('enabled', True):
+                if rule.get('id'):
+                    self.disabled.add(str(rule['id']).strip())
+                continue
+            rule_id = str(rule.get('id') or '').strip()
+            if not rule_id or not rule.get('when'):
+                raise RuleError(f"규칙에는 id와 when이 있어야 합니다: {rule}")
+            if rule_id in seen:
+                raise RuleError(f"규칙 id가 중복됩니다: {rule_id}")
+            seen.add(rule_id)
+            try:
+                body, aliases = _parse(str(rule['when']))
+                slots = [self._condition(node, aliases) for node in _conjuncts(body)]
+            except RuleError as e:
+                raise RuleError(f"[{rule_id}] {e}")
+            self.rules.append({'id': rule_id, 'name': rule.get('name', rule_id), 'when': rule['when'], 'conditions': slots})
+
+    def _condition(self, node, aliases):
+        key = _condition_key(node, aliases)
+        if key not in self._slots:
+            # 연쇄 비교를 나눈 조건끼리는 가운데 항 노드를 같이 쓰므로 복사본을 변환
+            transform = _Vectorize(aliases)
+            tree = ast.fix_missing_locations(ast.Expression(transform.visit(copy.deepcopy(node))))
+            self._slots[key] = len(self.conditions)
+            self.conditions[key] = (compile(tree, f'<조건 {key}>', 'eval'), sorted(transform.columns))
+        return self._slots[key]
+
+    def __len__(self):
+        return len(self.rules)
+
+    def columns(self):
+        return sorted({col for _, cols in self.conditions.values() for col in cols})
+
+    def load_columns(self, df):
+        # 규칙 전체에서 쓰는 열만 한 번씩: 숫자 열은 float64(결측 = NaN, 비교하면 False), 나머지는 문자열 배열
+        cols = {}
+        for col in self.columns():
+            if col == '종목코드' and df.index.name == '종목코드':
+                cols[col] = df.index.astype(str).to_numpy()
+            elif col not in df.columns:
+                continue
+            elif pd.api.types.is_numeric_dtype(df[col]):
+                cols[col] = to_number(df[col]).to_numpy(dtype='float64', na_value=np.nan)
+            else:
+                cols[col] = df[col].astype(object).where(df[col].notna(), None).to_numpy()
+        return cols
+
+    def evaluate(self, df):
+        # (규칙 수 x 종목 수) 불리언 행렬과 평가하지 못한 규칙 {id: 사유}
+        n = len(df)
+        cols = self.load_columns(df)
+        masks = np.zeros((len(self.conditions), n), dtype=bool)
+        failed = {}
+        scope = {'__builtins__': {}, 'isin': np.isin}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for i, (key, (code, needed)) in enumerate(self.conditions.items()):
+                missing = [c for c in needed if c not in cols]
+                if missing:
+                    failed[i] = f"없는 열: {', '.join(missing)}"
+                    continue
+                try:
+                    masks[i] = np.broadcast_to(np.asarray(eval(code, scope, {'_c': cols}), dtype=bool), (n,))
+                except Exception as e:
+                    failed[i] = f"{key}: {e}"
+        result = np.zeros((len(self.rules), n), dtype=bool)
+        errors = {}
+        for r, rule in enumerate(self.rules):
+            bad = [failed[i] for i in rule['conditions'] if i in failed]
+            if bad:
+                errors[rule['id']] = '; '.join(bad)
+                continue
+            result[r] = masks[rule['conditions']].all(axis=0)
+        return result, errors
+
+    def matches(self, df):
+        # 일치한 (규칙, 종목) 목록. 종목코드는 인덱스 또는 열
+        result, errors = self.evaluate(df)
+        codes = df.index.astype(str).to_numpy() if df.index.name == '종목코드' else df['종목코드'].astype(str).to_numpy()
+        rule_rows, stock_rows = np.nonzero(result)
+        frame = pd.DataFrame({'규칙': [self.rules[r]['id'] for r in rule_rows], '규칙명': [self.rules[r]['name'] for r in rule_rows],
+                              '종목코드': codes[stock_rows], '_row': stock_rows})
+        return frame, errors
+
+def load_rules(path=RULES_FILE):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return RuleSet(data['rules'] if isinstance(data, dict) else data)
+
+class AlertFeed:
+    # state.json : 직전 실행의 규칙별 일치 종목
+    # feed.csv   : 새로 걸린 (규칙, 종목)을 실행마다 이어 붙임 (엑셀에서 바로 열리도록 utf-8-sig)
+    # latest.json: 이번 실행에서 새로 걸린 것만
+    def __init__(self, root=ALERT_DIR):
+        self.root = root
+        self.state_path = os.path.join(root, 'state.json')
+        self.feed_path = os.path.join(root, 'feed.csv')
+        self.latest_path = os.path.join(root, 'latest.json')
+
+    def previous(self):
+        # {규칙: [종목코드, ...]}
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                return dict(json.load(f)['matches'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def _write_json(self, path, data):
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(path + '.tmp', path)
+
+    def update(self, matches, df, run_date, updated_at=None, errors=None, keep=()):
+        # keep: 이번에 평가하지 못했거나(errors) 꺼 둔 규칙. 직전 일치 목록을 그대로 넘겨서 복구됐을 때 다시 알림이 쏟아지지 않게 함
+        os.makedirs(self.root, exist_ok=True)
+        previous = self.previous()
+        before = {(rule, code) for rule, codes in previous.items() for code in codes}
+        keys = list(zip(matches['규칙'], matches['종목코드']))
+        is_new = np.fromiter((key not in before for key in keys), dtype=bool, count=len(keys))
+        new = matches.loc[is_new].reset_index(drop=True)
+
+        rows = new['_row'].to_numpy()
+        out = pd.DataFrame({'실행일': run_date, '업데이트': updated_at or '', '규칙': new['규칙'], '규칙명': new['규칙명'],
+                            '종목코드': new['종목코드']})
+        for col in FEED_COLUMNS[5:]:
+            out[col] = df[col].to_numpy()[rows] if col in df.columns else None
+        write_header = not os.path.exists(self.feed_path)
+        out.to_csv(self.feed_path, mode='a', header=write_header, index=False, encoding='utf-8-sig' if write_header else 'utf-8',
+                   quoting=csv.QUOTE_MINIMAL)
+
+        records = json.loads(out.to_json(orient='records', force_ascii=False))
+        self._write_json(self.latest_path, {'run_date': run_date, 'updated_at': updated_at, 'new': records, 'errors': errors or {}})
+        state = {rule: previous[rule] for rule in set(errors or {}) | set(keep) if rule in previous}
+        for rule, code in keys:
+            state.setdefault(rule, []).append(code)
+        self._write_json(self.state_path, {'run_date': run_date, 'updated_at': updated_at, 'matches': state})
+        return out
@@ -0,0 +1,74 @@
+import os
+import sys
+import timeit
+from io import StringIO
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from naver_parser import parse_market_sum, parse_investor_rows
+
+# 저장된 페이지 픽스처로 기존(BeautifulSoup + read_html) 방식과 전용 추출기를 비교하는 마이크로 벤치마크
+# 사용법: python bench/bench_parsers.py [반복횟수]
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+def legacy_market_sum(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    table = soup.find('table', {'class': 'type_2'})
+    df = pd.read_html(StringIO(str(table)))[0]
+    df = df.dropna(subset=['종목명'])
+    links = table.find_all('a', class_='tltle')
+    df['종목코드'] = [link['href'].split('code=')[-1] for link in links]
+    return df.drop(columns=['N', '토론실'], errors='ignore').reset_index(drop=True)
+
+def legacy_investor(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    for table in soup.find_all('table', {'class': 'type2'}):
+        for row in table.find_all('tr'):
+            tds = row.find_all('td')
+            if len(tds) >= 9:
+                date_text = tds[0].text.strip()
+                if len(date_text) == 10 and date_text.count('.') == 2:
+                    return tds[5].text.strip(), tds[6].text.strip(), tds[8].text.strip()
+    return None
+
+def load(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+def check_same(html_ms, html_frgn):
+    old_df = legacy_market_sum(html_ms)
+    new_df, _ = parse_market_sum(html_ms)
+    assert list(old_df.columns) == list(new_df.columns), (list(old_df.columns), list(new_df.columns))
+    for col in old_df.columns:
+        a = pd.to_numeric(old_df[col].astype(str).str.replace(',', ''), errors='coerce')
+        b = pd.to_numeric(new_df[col].astype(str).str.replace(',', ''), errors='coerce')
+        if a.notna().any():
+            assert a.astype(float).fillna(-1).tolist() == b.astype(float).fillna(-1).tolist(), col
+        else:
+            assert old_df[col].astype(str).tolist() == new_df[col].astype(str).tolist(), col
+
+    _, _, inst, fore, ratio = parse_investor_rows(html_frgn, limit=1)[0]
+    assert legacy_investor(html_frgn) == (inst, fore, ratio)
+
+def run(number=50):
+    html_ms = load('market_sum_group1.html')
+    html_ms2 = load('market_sum_group2.html')
+    html_frgn = load('frgn.html')
+    check_same(html_ms, html_frgn)
+    check_same(html_ms2, html_frgn)
+
+    cases = [
+        ('시가총액 페이지', lambda: legacy_market_sum(html_ms), lambda: parse_market_sum(html_ms)),
+        ('수급(frgn) 페이지', lambda: legacy_investor(html_frgn), lambda: parse_investor_rows(html_frgn, limit=1)),
+    ]
+    print(f"{'대상':<16}{'기존(ms)':>12}{'추출기(ms)':>12}{'배율':>8}")
+    for label, old, new in cases:
+        t_old = min(timeit.repeat(old, number=number, repeat=3)) / number * 1000
+        t_new = min(timeit.repeat(new, number=number, repeat=3)) / number * 1000
+        print(f"{label:<16}{t_old:>12.3f}{t_new:>12.3f}{t_old / t_new:>7.1f}x")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,142 @@
+import argparse
+import csv
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import naver_fixtures as nf
+from naver_server import add_arguments
+
+# 전체 파이프라인(get_full_market_data -> merge_treasury_stock -> process_and_save_html) 오프라인 벤치마크
+# 로컬 대역 서버(naver_server.py)를 별도 프로세스로 띄우고 main.py --base-url 로 실행한 뒤
+# main.py가 남긴 실행 리포트에서 처리량/지연 수치를 뽑아 커밋별로 비교할 수 있는 JSON으로 저장
+# 사용법: python bench/bench_pipeline.py [--scales 1 10] [--latency 0.05 --error-rate 0.01 ...]
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+BASE_TICKERS = 2600
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def wait_for_port(port, timeout=15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"대역 서버가 {port} 포트에서 시작되지 않았습니다.")
+
+def write_treasury_csv(path, tickers):
+    # 대역 서버 종목과 같은 코드로 자사주 CSV 생성 (원본과 같은 cp949 / 따옴표 형식)
+    with open(path, 'w', encoding='cp949', newline='') as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        writer.writerow(['종목코드', '종목명', '총발행주식수(C)', '자기주식수(D)'])
+        for sosok in (0, 1):
+            for no in range(1, tickers // 2 + 1):
+                s = nf.stock_values(sosok * 100000 + no)
+                total = s['listed_stock_cnt'] * 1000
+                writer.writerow([s['code'], s['name'], total, total * (no % 7) // 100])
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except Exception:
+        return None
+
+def server_args(args, tickers, port):
+    return [sys.executable, os.path.join(BENCH_DIR, 'naver_server.py'), '--port', str(port), '--tickers', str(tickers),
+            '--latency', str(args.latency), '--jitter', str(args.jitter), '--error-rate', str(args.error_rate),
+            '--burst-every', str(args.burst_every), '--burst-len', str(args.burst_len), '--seed', str(args.seed)]
+
+def summarize(tickers, wall, report):
+    timings = report.get('timings', {})
+    counters = report.get('counters', {})
+    limiter = report.get('investor_limiter', {})
+    requests = sum(timings.get(k, {}).get('count', 0) for k in ('market_sum.request', 'investor.request'))
+    summary = {
+        'tickers': tickers,
+        'rows': report.get('rows'),
+        'wall_s': round(wall, 2),
+        'tickers_per_s': round(tickers / wall, 1),
+        'requests': requests,
+        'requests_per_s': round(requests / wall, 1),
+        'mb_downloaded': round((counters.get('market_sum.bytes', 0) + counters.get('investor.bytes', 0)) / 1e6, 1),
+        'peak_rss_mb': report.get('peak_rss_mb'),
+        'stages_s': {k: v['seconds'] for k, v in report.get('stages', {}).items()},
+        'retries': limiter.get('retries', 0) + counters.get('market_sum.retries', 0),
+        'throttled': limiter.get('throttled', 0),
+        'hedges': limiter.get('hedges', 0),
+        'failed': len(limiter.get('failed_codes', [])),
+    }
+    for name in ('market_sum.request', 'investor.request', 'investor.queue_wait', 'investor.parse'):
+        if name in timings:
+            summary[name] = {k: timings[name][k] for k in ('count', 'mean_s', 'p50_s', 'p95_s', 'max_s')}
+    return summary
+
+def run_scale(args, tickers):
+    port = free_port()
+    server = subprocess.Popen(server_args(args, tickers, port))
+    try:
+        wait_for_port(port)
+        with tempfile.TemporaryDirectory() as work:
+            write_treasury_csv(os.path.join(work, 'data.csv'), tickers)
+            report_path = os.path.join(work, 'report.json')
+            max_pages = math.ceil(tickers / 2 / nf.PER_PAGE)
+            cmd = [sys.executable, os.path.join(ROOT, 'main.py'), '--base-url', f'http://127.0.0.1:{port}',
+                   '--max-pages', str(max_pages), '--report', report_path] + (['--staged'] if args.staged else [])
+            if args.parse_workers:
+                cmd += ['--parse-workers', str(args.parse_workers)]
+            start = time.perf_counter()
+            subprocess.run(cmd, cwd=work, check=True, stdout=subprocess.DEVNULL if args.quiet else None,
+                           stderr=subprocess.DEVNULL if args.quiet else None)
+            wall = time.perf_counter() - start
+            with open(report_path, encoding='utf-8') as f:
+                report = json.load(f)
+    finally:
+        server.terminate()
+        server.wait()
+    return summarize(tickers, wall, report)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scales', type=float, nargs='+', default=[1, 10], help=f"종목 수 배율 (1 = {BASE_TICKERS}종목)")
+    parser.add_argument('--out', default=None, help="결과 JSON 경로 (기본: bench/results/pipeline-<커밋>.json)")
+    parser.add_argument('--quiet', action='store_true', help="main.py 출력 숨김")
+    parser.add_argument('--staged', action='store_true', help="main.py를 --staged(비스트리밍)로 실행해 비교")
+    parser.add_argument('--parse-workers', type=int, default=0, help="main.py --parse-workers 값 (0이면 루프 안에서 파싱)")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = []
+    for scale in args.scales:
+        tickers = int(BASE_TICKERS * scale)
+        print(f"\n=== {tickers}종목 (x{scale:g}) ===")
+        results.append(run_scale(args, tickers))
+
+    print(f"\n{'종목 수':>8}{'전체(s)':>10}{'종목/s':>9}{'요청/s':>9}{'수급 p50':>10}{'수급 p95':>10}{'재시도':>8}{'실패':>6}{'메모리(MB)':>12}")
+    for r in results:
+        inv = r.get('investor.request', {})
+        print(f"{r['tickers']:>8}{r['wall_s']:>10.1f}{r['tickers_per_s']:>9.1f}{r['requests_per_s']:>9.1f}"
+              f"{inv.get('p50_s', 0):>10.3f}{inv.get('p95_s', 0):>10.3f}{r['retries']:>8}{r['failed']:>6}{r['peak_rss_mb']:>12.1f}")
+
+    out = args.out or os.path.join(BENCH_DIR, 'results', f"pipeline-{commit or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    server_config = {k: getattr(args, k) for k in ('latency', 'jitter', 'error_rate', 'burst_every', 'burst_len', 'seed')}
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump({'commit': commit, 'staged': args.staged, 'server': server_config, 'results': results}, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ratios import compute_ratios
+
+# 재무비율 계산: 기존 행 단위 apply 방식과 벡터 비율 엔진 비교
+# 사용법: python bench/bench_ratios.py
+
+def make_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+
+    def commas(values):
+        return pd.Series(values).map('{:,}'.format)
+
+    return pd.DataFrame({
+        '종목코드': [f"{i:06d}" for i in range(n)],
+        '현재가': commas(rng.integers(0, 300000, n)),
+        '매출액': commas(rng.integers(-10, 500000, n)),
+        '영업이익': commas(rng.integers(-5000, 50000, n)),
+        '당기순이익': commas(rng.integers(-5000, 40000, n)),
+        '자산총계': commas(rng.integers(0, 900000, n)),
+        '부채총계': commas(rng.integers(0, 900000, n)),
+        '보통주배당금(원)': commas(rng.choice([0, 100, 500, 1500], n)),
+    })
+
+def legacy_ratios(merged_df):
+    merged_df['보통주배당금_num'] = pd.to_numeric(merged_df['보통주배당금(원)'].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+    merged_df['현재가_num'] = pd.to_numeric(merged_df['현재가'].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+    merged_df['배당수익률'] = merged_df.apply(
+        lambda x: (x['보통주배당금_num'] / x['현재가_num'] * 100) if x['현재가_num'] > 0 else 0, axis=1
+    )
+    merged_df['매출액_num'] = pd.to_numeric(merged_df['매출액'].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+    merged_df['영업이익_num'] = pd.to_numeric(merged_df['영업이익'].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+    merged_df['영업이익률(%)'] = merged_df.apply(
+        lambda x: (x['영업이익_num'] / x['매출액_num'] * 100) if x['매출액_num'] > 0 else 0, axis=1
+    )
+    merged_df['자산_num'] = pd.to_numeric(merged_df['자산총계'].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+    merged_df['부채_num'] = pd.to_numeric(merged_df['부채총계'].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+    merged_df['자본_num'] = merged_df['자산_num'] - merged_df['부채_num']
+    merged_df['부채비율'] = merged_df.apply(
+        lambda x: (x['부채_num'] / x['자본_num'] * 100) if x['자본_num'] > 0 else 0, axis=1
+    )
+    return merged_df
+
+def timed(func, df):
+    start = time.perf_counter()
+    out = func(df.copy())
+    return out, time.perf_counter() - start
+
+def run(sizes=(2600, 100000)):
+    print(f"{'행 수':>8}{'기존(s)':>10}{'엔진(s)':>10}{'배율':>8}")
+    for n in sizes:
+        df = make_frame(n)
+        old, t_old = timed(legacy_ratios, df)
+        new, t_new = timed(compute_ratios, df)
+        for col in ['배당수익률', '영업이익률(%)', '부채비율']:
+            assert np.allclose(old[col].to_numpy(dtype=float), new[col].to_numpy(dtype=float)), col
+        print(f"{n:>8}{t_old:>10.3f}{t_new:>10.4f}{t_old / t_new:>7.0f}x")
+
+if __name__ == "__main__":
+    run()
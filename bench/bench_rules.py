@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from alerts import RuleSet
+
+# 알림 규칙: 규칙마다 DataFrame.query 를 부르는 방식과 컴파일된 규칙 묶음(조건 공유 + numpy 마스크) 비교
+# 행 단위 파이썬 루프(규칙 x 종목)는 2600행에서만 측정
+# 사용법: python bench/bench_rules.py [규칙 수]
+
+COLUMNS = ['PER', 'PBR', '부채비율', '배당수익률', '외국인 순매매량', '기관 5일 누적', '외국인 5일 누적', '자사주 비율(%)']
+
+def make_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+
+    def with_missing(values, rate):
+        return np.where(rng.random(n) < rate, np.nan, values)
+
+    return pd.DataFrame({
+        '시장': pd.Categorical(rng.choice(['KOSPI', 'KOSDAQ'], n)),
+        'PER': with_missing(rng.uniform(-50, 80, n).round(2), 0.1).astype('float32'),
+        'PBR': with_missing(rng.uniform(0.1, 9, n).round(2), 0.05).astype('float32'),
+        '부채비율': rng.uniform(0, 400, n).round(2).astype('float32'),
+        '배당수익률': rng.uniform(0, 8, n).round(2).astype('float32'),
+        '외국인 순매매량': pd.array(rng.integers(-500000, 500000, n), dtype='Int64'),
+        '기관 5일 누적': pd.array(rng.integers(-10 ** 6, 10 ** 6, n), dtype='Int64'),
+        '외국인 5일 누적': pd.array(rng.integers(-10 ** 6, 10 ** 6, n), dtype='Int64'),
+        '자사주 비율(%)': with_missing(rng.uniform(0, 20, n).round(2), 0.7).astype('float32'),
+    }, index=pd.Index([f"{i:06d}" for i in range(n)], name='종목코드'))
+
+def make_rules(count, seed=0):
+    # 실제 규칙처럼 자주 쓰는 조건(순매수 > 0, PBR < 1 등)을 여러 규칙이 같이 씀
+    rng = np.random.default_rng(seed)
+    common = ['`외국인 순매매량` > 0', 'PBR < 1', '`기관 5일 누적` > 0', "시장 == 'KOSPI'", '0 < PER < 10']
+    rules = []
+    for i in range(count):
+        parts = list(rng.choice(common, rng.integers(0, 3), replace=False))
+        for col in rng.choice(COLUMNS, rng.integers(1, 3), replace=False):
+            parts.append(f"`{col}` {rng.choice(['>', '<'])} {rng.choice([0, 1, 3, 5, 10, 100])}")
+        rules.append({'id': f"r{i}", 'when': ' and '.join(parts)})
+    return rules
+
+def query_loop(df, rules):
+    return [df.query(rule['when']).index for rule in rules]
+
+def row_loop(df, rules):
+    # 규칙을 파이썬 식으로 바꿔 종목마다 평가 (결측 비교는 False)
+    records = df.reset_index().to_dict('records')
+    exprs = [compile(rule['when'].replace('`', '').replace('외국인 순매매량', '_f').replace('기관 5일 누적', '_i5')
+                     .replace('외국인 5일 누적', '_f5').replace('자사주 비율(%)', '_t'), 'rule', 'eval') for rule in rules]
+    names = {'외국인 순매매량': '_f', '기관 5일 누적': '_i5', '외국인 5일 누적': '_f5', '자사주 비율(%)': '_t'}
+    hits = []
+    for expr in exprs:
+        for row in records:
+            scope = {names.get(k, k): (np.nan if v is pd.NA else v) for k, v in row.items()}
+            if eval(expr, {}, scope):
+                hits.append(row['종목코드'])
+    return hits
+
+def timed(func, *args):
+    start = time.perf_counter()
+    out = func(*args)
+    return out, time.perf_counter() - start
+
+def run(count=300, sizes=(2600, 100000)):
+    rules = make_rules(count)
+    compiled, t_compile = timed(RuleSet, rules)
+    print(f"규칙 {count}개 -> 조건 {len(compiled.conditions)}개, 컴파일 {t_compile * 1000:.1f}ms")
+    print(f"{'행 수':>8}{'행 루프(s)':>12}{'query(s)':>10}{'엔진(ms)':>10}{'배율':>8}")
+    for n in sizes:
+        df = make_frame(n)
+        (result, _), t_engine = timed(compiled.evaluate, df)
+        expected, t_query = timed(query_loop, df, rules)
+        for r, index in enumerate(expected):
+            assert result[r].sum() == len(index), compiled.rules[r]['when']
+        t_row = f"{timed(row_loop, df, rules)[1]:>12.2f}" if n <= 2600 else f"{'-':>12}"
+        print(f"{n:>8}{t_row}{t_query:>10.3f}{t_engine * 1000:>10.2f}{t_query / t_engine:>7.0f}x")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
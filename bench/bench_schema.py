@@ -0,0 +1,141 @@
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import naver_fixtures as nf
+import formatters
+import payload
+from naver_parser import parse_market_sum
+from ratios import compute_ratios
+from schema import apply_schema, RATIO_DTYPE
+from scoring import add_scores
+from snapshot_store import typed_frame
+
+# 병합 데이터: 기존(문자열/object 열 + 열 기준 merge)과 타입 스키마(Int64/float32/category + 종목코드 인덱스 join) 비교
+# 병합 이후 단계(비율 계산, 표 포맷, JSON 페이로드, 점수, 스냅샷 변환)까지 합친 시간과 최대 메모리를 측정
+# 방식마다 새 파이썬 프로세스에서 측정 (앞 방식이 남긴 할당/캐시가 다음 방식의 수치에 섞이지 않게 함)
+# - 시간: tracemalloc 없이 5번 실행한 최솟값
+# - 최대 RSS 증가: 수집 결과 프레임을 넘겨준 뒤(호출 쪽 참조 없음) 끝까지 실행하는 동안의 최대 RSS - 시작 RSS
+#   Arrow 문자열 버퍼까지 포함한 실제 메모리. /proc/self/clear_refs로 최대값을 초기화할 수 있는 리눅스에서만 측정, 그 외 '-'
+# - 파이썬 힙: tracemalloc 최대값. Arrow 버퍼는 잡히지 않아 문자열 열이 많은 기존 방식이 작게 나오므로 참고용
+# 사용법: python bench/bench_schema.py [종목 수 ...]
+
+INT_COLS = ['현재가', '보통주배당금(원)', '시가총액', '매출액', '영업이익', '당기순이익', '거래량', '상장주식수']
+FLOAT_COLS = ['영업이익률(%)', '부채비율', '외국인 보유율(%)', 'PER', 'PBR', '배당수익률']
+
+def raw_groups(tickers):
+    frames = {}
+    for name, fields in (('group1', nf.GROUP1), ('group2', nf.GROUP2)):
+        pages = []
+        for sosok in (0, 1):
+            per_market = tickers // 2
+            for page in range(1, per_market // nf.PER_PAGE + 1):
+                df, _ = parse_market_sum(nf.market_sum_page(fields, sosok, page, total=per_market))
+                pages.append(df.assign(시장='KOSPI' if sosok == 0 else 'KOSDAQ'))
+        frames[name] = pd.concat(pages, ignore_index=True)
+    return frames['group1'], frames['group2']
+
+def investor_frame(codes):
+    # 012 이전 형식처럼 부호/콤마/%가 붙은 문자열
+    n = len(codes)
+    return pd.DataFrame({'종목코드': codes, '기관 순매매량': [f"{(i * 7919) % 200000 - 100000:+,}" for i in range(n)],
+                         '외국인 순매매량': [f"{(i * 104729) % 300000 - 150000:+,}" for i in range(n)],
+                         '외국인 보유율(%)': [f"{(i * 37) % 6000 / 100:.2f}%" for i in range(n)]})
+
+def legacy(df1, df2, inv):
+    merged = pd.merge(df1, df2.drop(columns=['현재가', '전일비', '등락률', '시장']), on=['종목코드', '종목명'], how='left')
+    merged = pd.merge(merged, inv, on='종목코드', how='left').rename(columns={'보통주배당금': '보통주배당금(원)'})
+    return compute_ratios(merged)
+
+def typed(df1, df2, inv):
+    # 수집과 같이 두 번째 그룹은 첫 그룹과 겹치는 기본 열을 버린 뒤 타입 지정
+    merged = apply_schema(df1).join(apply_schema(df2.drop(columns=['종목명', '현재가', '전일비', '등락률', '시장'])), how='left')
+    merged = merged.join(apply_schema(inv), how='left').rename(columns={'보통주배당금': '보통주배당금(원)'})
+    return compute_ratios(merged, dtype=RATIO_DTYPE)
+
+def downstream(df):
+    if df.index.name == '종목코드':
+        df = df.reset_index()
+    formatters.format_diff(df['전일비'], df['등락률'])
+    formatters.format_rate(df['등락률'])
+    for col in ['기관 순매매량', '외국인 순매매량']:
+        formatters.format_net_buy(df[col])
+    for col in INT_COLS:
+        formatters.format_int(df[col])
+    for col in FLOAT_COLS:
+        formatters.format_float(df[col])
+    payload.build_payload(df, INT_COLS, FLOAT_COLS)
+    typed_frame(df)
+
+BUILDS = {'기존': legacy, '스키마': typed}
+
+def run_once(build, df1, df2, inv):
+    start = time.perf_counter()
+    df = build(df1, df2, inv)
+    t_build = time.perf_counter() - start
+    start = time.perf_counter()
+    downstream(df)
+    add_scores(df)
+    return df, t_build, time.perf_counter() - start
+
+def proc_status(key):
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(key):
+                return int(line.split()[1]) * 1024
+
+def peak_rss(build, inputs):
+    # inputs는 비워서 넘김 -> 병합하면서 원래 페이지 프레임이 해제되는 효과까지 반영
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        return None
+    start = proc_status('VmRSS:')
+    args = inputs[:]
+    inputs.clear()
+    run_once(build, *args)
+    return proc_status('VmHWM:') - start
+
+def measure(name, tickers):
+    build = BUILDS[name]
+    df1, df2 = raw_groups(tickers)
+    inputs = [df1, df2, investor_frame(df1['종목코드'].tolist())]
+    spare = [df.copy(deep=True) for df in inputs]
+    del df1, df2
+    gc.collect()
+    rss = peak_rss(build, inputs)
+    runs = [run_once(build, *spare) for _ in range(5)]
+    t_build, t_down = min(r[1] for r in runs), min(r[2] for r in runs)
+    size = runs[0][0].memory_usage(deep=True).sum()
+    del runs
+    tracemalloc.start()
+    run_once(build, *spare)
+    heap = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'size': size / 1e6, 'build': t_build, 'down': t_down, 'heap': heap / 1e6, 'rss': rss / 1e6 if rss is not None else None}
+
+def run(tickers):
+    print(f"종목 {tickers // 2 // nf.PER_PAGE * nf.PER_PAGE * 2}개")
+    print(f"{'방식':>8}{'프레임(MB)':>12}{'병합(s)':>10}{'이후 단계(s)':>14}{'합계(s)':>10}{'최대 RSS 증가(MB)':>19}{'파이썬 힙(MB)':>15}")
+    for name in BUILDS:
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', name, str(tickers)],
+                             capture_output=True, text=True, check=True)
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        rss = f"{r['rss']:>19.1f}" if r['rss'] is not None else f"{'-':>19}"
+        print(f"{name:>8}{r['size']:>12.2f}{r['build']:>10.3f}{r['down']:>14.3f}{r['build'] + r['down']:>10.3f}{rss}{r['heap']:>15.1f}")
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--child']:
+        print(json.dumps(measure(sys.argv[2], int(sys.argv[3]))))
+    else:
+        for tickers in ([int(a) for a in sys.argv[1:]] or [2600, 26000]):
+            run(tickers)
@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scoring import score_frame, DEFAULT_WEIGHTS, FACTOR_RULES, WINSOR
+
+# 횡단면 점수: 시장별 groupby + 행 단위 apply 방식과 팩터 행렬(NumPy) 방식 비교
+# 사용법: python bench/bench_scoring.py
+
+def make_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+
+    def with_missing(values, rate):
+        return np.where(rng.random(n) < rate, np.nan, values)
+
+    return pd.DataFrame({
+        '시장': pd.Categorical(rng.choice(['KOSPI', 'KOSDAQ'], n)),
+        'PER': with_missing(rng.uniform(-50, 80, n).round(2), 0.1).astype('float32'),
+        'PBR': with_missing(rng.uniform(0.1, 9, n).round(2), 0.05).astype('float32'),
+        '영업이익률(%)': rng.uniform(-30, 40, n).round(2).astype('float32'),
+        '부채비율': rng.uniform(0, 400, n).round(2).astype('float32'),
+        '배당수익률': rng.uniform(0, 8, n).round(2).astype('float32'),
+        '상장주식수': pd.array(rng.integers(1000, 10 ** 6, n), dtype='Int64'),
+        '외국인 5일 누적': pd.array(rng.integers(-10 ** 6, 10 ** 6, n), dtype='Int64'),
+        '기관 5일 누적': pd.array(rng.integers(-10 ** 6, 10 ** 6, n), dtype='Int64'),
+    }, index=pd.Index([f"{i:06d}" for i in range(n)], name='종목코드'))
+
+def legacy_scores(df, weights=DEFAULT_WEIGHTS, top_n=50):
+    # 열마다 시장별 apply로 윈저라이즈/표준화, 종합점수는 행 단위 apply
+    factors = pd.DataFrame(index=df.index)
+    for name in weights:
+        v = df[name].astype('float64')
+        rule = FACTOR_RULES.get(name)
+        if rule == 'inverse':
+            v = v.apply(lambda x: 1 / x if x else np.nan)
+        elif rule == 'lower':
+            v = -v
+        elif rule == 'per_share':
+            v = v / (df['상장주식수'].astype('float64') * 10)
+        factors[name] = v.groupby(df['시장'], observed=True).apply(
+            lambda g: (g.clip(g.quantile(WINSOR), g.quantile(1 - WINSOR)) - g.clip(g.quantile(WINSOR), g.quantile(1 - WINSOR)).mean())
+            / g.clip(g.quantile(WINSOR), g.quantile(1 - WINSOR)).std(ddof=0)).droplevel(0)
+        factors[name + ' 백분위'] = v.groupby(df['시장'], observed=True).rank(pct=True)
+
+    def combine(row):
+        total = sum(weights[k] for k in weights if row[k] == row[k])
+        return sum(row[k] * weights[k] for k in weights if row[k] == row[k]) / total if total else np.nan
+
+    score = factors.apply(combine, axis=1)
+    top = score.groupby(df['시장'], observed=True).apply(lambda g: g.nlargest(top_n))
+    return score, top
+
+def timed(func, *args):
+    start = time.perf_counter()
+    out = func(*args)
+    return out, time.perf_counter() - start
+
+def run(sizes=(2600, 100000)):
+    print(f"{'행 수':>8}{'기존(s)':>10}{'행렬(s)':>10}{'배율':>8}")
+    for n in sizes:
+        df = make_frame(n)
+        (old, _), t_old = timed(legacy_scores, df)
+        new, t_new = timed(score_frame, df)
+        assert np.allclose(old.to_numpy(), new['종합점수'].to_numpy(), equal_nan=True)
+        print(f"{n:>8}{t_old:>10.3f}{t_new:>10.4f}{t_old / t_new:>7.0f}x")
+
+if __name__ == "__main__":
+    run()
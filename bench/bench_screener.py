@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from screener import ScreenerIndex
+
+# 스크리너: 매 요청마다 전체 프레임을 불리언 마스크 + 정렬로 거르는 방식과 정렬 배열 인덱스 비교
+# 범위 조건 1~3개 + 시장 + 정렬 + 상위 50개 조회를 같은 조건으로 반복해서 평균 시간 측정
+# 사용법: python bench/bench_screener.py
+
+def make_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+
+    def with_missing(values, rate):
+        return np.where(rng.random(n) < rate, np.nan, values)
+
+    df = pd.DataFrame({
+        '종목코드': [f"{i:06d}" for i in range(n)],
+        '종목명': pd.Categorical([f"테스트종목{i}" for i in range(n)]),
+        '시장': pd.Categorical(rng.choice(['KOSPI', 'KOSDAQ'], n)),
+        '현재가': pd.array(rng.integers(500, 300000, n), dtype='Int64'),
+        '시가총액': pd.array(rng.integers(100, 500000, n), dtype='Int64'),
+        '외국인 순매매량': pd.array(rng.integers(-500000, 500000, n), dtype='Int64'),
+        'PER': with_missing(rng.uniform(-50, 80, n).round(2), 0.1).astype('float32'),
+        'PBR': with_missing(rng.uniform(0.1, 9, n).round(2), 0.05).astype('float32'),
+        '부채비율': rng.uniform(0, 400, n).round(2).astype('float32'),
+        '배당수익률': rng.uniform(0, 8, n).round(2).astype('float32'),
+        '자사주 비율(%)': with_missing(rng.uniform(0, 20, n).round(2), 0.7).astype('float32'),
+    })
+    return df.set_index('종목코드')
+
+QUERIES = [
+    ([('PBR', None, 1.0)], 'KOSPI', '시가총액', True),
+    ([('PER', 0, 10), ('부채비율', None, 100)], None, '배당수익률', True),
+    ([('PBR', None, 1.0), ('자사주 비율(%)', 5, None), ('외국인 순매매량', 1, None)], None, 'PER', False),
+    ([('시가총액', 300000, None)], 'KOSDAQ', None, False),
+]
+
+def pandas_query(df, filters, market, sort, desc, limit=50):
+    mask = pd.Series(True, index=df.index)
+    for col, lo, hi in filters:
+        values = df[col].astype('float64')
+        mask &= values.notna()
+        if lo is not None:
+            mask &= values >= lo
+        if hi is not None:
+            mask &= values <= hi
+    if market is not None:
+        mask &= df['시장'] == market
+    out = df[mask]
+    if sort is not None:
+        out = out.sort_values(sort, ascending=not desc, kind='stable', na_position='last')
+    return len(out), out.head(limit).reset_index().to_dict('records')
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat
+
+def run(sizes=(2600, 100000), repeat=20):
+    print(f"{'행 수':>8}{'인덱스 생성(s)':>16}{'마스크(ms)':>12}{'인덱스(ms)':>12}{'배율':>8}")
+    for n in sizes:
+        df = make_frame(n)
+        index, t_build = timed(lambda: ScreenerIndex(df), 1)
+        t_mask = t_index = 0.0
+        for filters, market, sort, desc in QUERIES:
+            (total, _), t = timed(lambda: pandas_query(df, filters, market, sort, desc), repeat)
+            t_mask += t
+            result, t = timed(lambda: index.query(filters=filters, market=market, sort=sort, desc=desc, limit=50), repeat)
+            t_index += t
+            assert result['total'] == total, (filters, result['total'], total)
+        t_mask, t_index = t_mask / len(QUERIES) * 1000, t_index / len(QUERIES) * 1000
+        print(f"{n:>8}{t_build:>16.3f}{t_mask:>12.2f}{t_index:>12.3f}{t_mask / t_index:>7.0f}x")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,63 @@
+import base64
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import bench_schema
+import main
+import payload
+from investor_flows import NET_COLS
+
+# 렌더링 회귀 확인: 값이 하나도 없는 열이 있어도 json/table 두 방식 모두 대시보드를 만들어야 함
+# - 자사주 CSV가 없어서 '자사주 비율(%)' 전체가 결측인 경우
+# - 수급 수집이 전부 실패해서 순매매량/보유율 전체가 결측인 경우
+# json은 해당 열이 모두 결측으로 인코딩되고, table은 모두 '-'로 표시되는지 확인
+# 사용법: python bench/check_render.py [종목 수]
+
+EMPTY_COLS = ['자사주 비율(%)', '외국인 보유율(%)'] + NET_COLS
+
+def empty_frame(tickers):
+    df1, df2 = bench_schema.raw_groups(tickers)
+    df = bench_schema.typed(df1, df2, bench_schema.investor_frame(df1['종목코드'].tolist()))
+    for col in NET_COLS + ['외국인 보유율(%)']:
+        df[col] = df[col].where(pd.Series(False, index=df.index))
+    df = main.merge_treasury_stock(df, csv_path=os.path.join(tempfile.gettempdir(), 'missing-treasury.csv'))
+    return main.score_market(df)
+
+def json_columns(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.loads(re.search(r'<script id="stockData" type="application/json">(.*?)</script>', f.read(), re.S).group(1))
+    out = {}
+    for k, col in enumerate(data['columns']):
+        encoded = data['numeric'].get(str(k))
+        if encoded:
+            values = np.frombuffer(base64.b64decode(encoded['data']), dtype='<' + encoded['dtype']).astype('float64')
+            out[col] = np.where(values == payload.INT32_NULL, np.nan, values) if encoded['dtype'] == 'i4' else values
+    return out
+
+def table_columns(path):
+    with open(path, encoding='utf-8') as f:
+        return pd.read_html(io.StringIO(f.read()), attrs={'id': 'stockTable'}, keep_default_na=False)[0].astype(str)
+
+def run(tickers):
+    df = empty_frame(tickers)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path, table_path = os.path.join(tmp, 'json.html'), os.path.join(tmp, 'table.html')
+        main.process_and_save_html(df.copy(), filename=json_path, output='json')
+        main.process_and_save_html(df.copy(), filename=table_path, output='table')
+        numeric, table = json_columns(json_path), table_columns(table_path)
+    for col in EMPTY_COLS:
+        assert np.isnan(numeric[col]).all(), f"json: {col}"
+        assert (table[col] == '-').all(), f"table: {col}"
+    print(f"[확인] 종목 {len(df)}개, 빈 열 {len(EMPTY_COLS)}개: json/table 모두 결측으로 렌더링")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
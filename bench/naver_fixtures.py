@@ -0,0 +1,144 @@
+import os
+import random
+
+# 네이버 금융 페이지 구조를 그대로 흉내 낸 고정 페이지 생성기
+# (벤치마크/로컬 테스트 서버에서 사용. 값은 종목 번호로 시드한 난수)
+
+FIELD_HEADERS = {
+    'sales': '매출액', 'operating_profit': '영업이익', 'net_income': '당기순이익',
+    'property_total': '자산총계', 'debt_total': '부채총계', 'dividend': '보통주배당금',
+    'market_sum': '시가총액', 'per': 'PER', 'pbr': 'PBR', 'quant': '거래량', 'listed_stock_cnt': '상장주식수',
+    'amount': '거래대금', 'frgn_rate': '외국인비율', 'roe': 'ROE', 'roa': 'ROA', 'eps': 'EPS', 'bps': 'BPS',
+}
+GROUP1 = ['sales', 'operating_profit', 'net_income', 'property_total', 'debt_total', 'dividend']
+GROUP2 = ['market_sum', 'per', 'pbr', 'quant', 'listed_stock_cnt']
+PER_PAGE = 50
+
+_PAGE_HEAD = """<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">
+<html lang="ko"><head><meta http-equiv="Content-Type" content="text/html; charset=euc-kr">
+<title>{title} : 네이버페이 증권</title>
+<link rel="stylesheet" type="text/css" href="https://ssl.pstatic.net/imgstock/static.pc/20240101/css/finance_header.css">
+<script type="text/javascript" src="https://ssl.pstatic.net/imgstock/static.pc/20240101/js/jindo.min.ns.js"></script>
+</head><body><div id="wrap"><div id="header">
+""" + "".join(f'<div class="gnb_item"><a href="/sise/menu{i}.naver" class="gnb_link">메뉴 {i}</a><ul class="sub">'
+              + "".join(f'<li><a href="/sise/sub{i}_{j}.naver">하위 메뉴 {j}</a></li>' for j in range(12)) + '</ul></div>\n'
+              for i in range(20)) + "</div>\n"
+
+_PAGE_TAIL = "<div id=\"footer\">" + "".join(f'<a href="/policy{i}.naver">약관 {i}</a>' for i in range(30)) + "</div></div></body></html>"
+
+def stock_values(no, tick=0):
+    r = random.Random(no)
+    price = r.randint(5, 3000) * 100 + r.randint(0, 99)
+    diff = r.randint(-30, 30) * 5
+    s = {
+        'code': f"{(no * 7919) % 1000000:06d}", 'name': f"테스트종목{no}", 'price': price, 'diff': diff,
+        'sales': r.randint(-10, 500000), 'operating_profit': r.randint(-5000, 50000), 'net_income': r.randint(-5000, 40000),
+        'property_total': r.randint(10, 900000), 'debt_total': r.randint(0, 500000), 'dividend': r.choice([0, 0, 100, 500, 1500]),
+        'market_sum': r.randint(100, 500000), 'per': round(r.uniform(-50, 80), 2) if r.random() > 0.1 else None,
+        'pbr': round(r.uniform(0.1, 9), 2) if r.random() > 0.05 else None,
+        'quant': r.randint(0, 10 ** 7), 'listed_stock_cnt': r.randint(1000, 10 ** 6),
+        'amount': r.randint(0, 10 ** 6), 'frgn_rate': round(r.uniform(0, 60), 2),
+        'roe': round(r.uniform(-30, 40), 2) if r.random() > 0.1 else None, 'roa': round(r.uniform(-10, 20), 2) if r.random() > 0.1 else None,
+        'eps': r.randint(-5000, 20000), 'bps': r.randint(100, 200000),
+    }
+    if tick:
+        # 장중 시세 흉내: tick마다 일부 종목의 가격/거래량만 움직임 (재무 항목은 그대로)
+        t = random.Random(f"{no}-{tick}")
+        if t.random() < 0.3:
+            move = t.randint(-3, 3) * 5
+            s['price'] += move
+            s['diff'] += move
+            s['quant'] += t.randint(0, 10 ** 5)
+    return s
+
+def _fmt(v):
+    if v is None: return 'N/A'
+    if isinstance(v, float): return f"{v:,.2f}"
+    return f"{v:,}"
+
+def _arrow(diff):
+    if diff > 0: return '<em class="bu_p bu_pup"><span class="blind">상승</span></em>'
+    if diff < 0: return '<em class="bu_p bu_pdn"><span class="blind">하락</span></em>'
+    return ''
+
+def market_sum_page(field_ids, sosok, page, total=1300, tick=0):
+    last_page = max(1, (total + PER_PAGE - 1) // PER_PAGE)
+    start = (page - 1) * PER_PAGE
+    count = max(0, min(PER_PAGE, total - start))
+    heads = ['N', '종목명', '현재가', '전일비', '등락률'] + [FIELD_HEADERS[f] for f in field_ids] + ['토론실']
+    span = len(heads)
+
+    out = [_PAGE_HEAD.format(title='시가총액'), '<div class="box_type_l">\n<table class="type_2" summary="코스피 시가총액 리스트">\n<caption>코스피</caption>\n<thead>\n<tr>\n']
+    out += [f'<th scope="col">{h}</th>\n' for h in heads]
+    out.append(f'</tr>\n</thead>\n<tbody>\n<tr><td class="blank_08" colspan="{span}"></td></tr>\n')
+    for k in range(count):
+        no = start + k + 1
+        s = stock_values(sosok * 100000 + no, tick)
+        rate = s['diff'] / s['price'] * 100
+        out.append('<tr onMouseOver="mouseOver(this)" onMouseOut="mouseOut(this)">\n')
+        out.append(f'<td class="no">{no}</td>\n<td><a href="/item/main.naver?code={s["code"]}" class="tltle">{s["name"]}</a></td>\n')
+        out.append(f'<td class="number">{s["price"]:,}</td>\n')
+        out.append(f'<td class="number">\n\t{_arrow(s["diff"])}<span class="tah p11 {"red02" if s["diff"] > 0 else "nv01"}">\n\t\t{abs(s["diff"]):,}\n\t\t</span>\n</td>\n')
+        out.append(f'<td class="number">\n\t<span class="tah p11 {"red01" if rate > 0 else "nv01"}">\n\t{rate:+.2f}%\n\t</span>\n</td>\n')
+        out += [f'<td class="number">{_fmt(s[f])}</td>\n' for f in field_ids]
+        out.append(f'<td class="center"><a href="/item/board.naver?code={s["code"]}"><img src="https://ssl.pstatic.net/imgstock/images5/ico_debatebl2.gif" width="15" height="13" alt="토론실"></a></td>\n</tr>\n')
+        if k % 5 == 4:
+            out.append(f'<tr><td class="division_line" colspan="{span}"></td></tr>\n')
+    out.append(f'<tr><td class="blank_08" colspan="{span}"></td></tr>\n</tbody>\n</table>\n</div>\n')
+    out.append('<table summary="페이지 네비게이션 리스트" class="Nnavi" align="center">\n<tr>\n')
+    first_no = (page - 1) // 10 * 10 + 1
+    for p in range(first_no, min(first_no + 10, last_page + 1)):
+        cls = ' class="on"' if p == page else ''
+        out.append(f'<td{cls}><a href="/sise/sise_market_sum.naver?sosok={sosok}&amp;page={p}">{p}</a></td>\n')
+    if last_page > 1:
+        out.append(f'<td class="pgRR"><a href="/sise/sise_market_sum.naver?sosok={sosok}&amp;page={last_page}">맨뒤\n<img src="https://ssl.pstatic.net/static/n/cmn/bu_pgarRR.gif" width="8" height="5" alt="" border="0"></a></td>\n')
+    out.append('</tr>\n</table>\n')
+    out.append(_PAGE_TAIL)
+    return ''.join(out)
+
+def frgn_page(code, page=1, days=20):
+    r = random.Random(f"{code}-{page}")
+    out = [_PAGE_HEAD.format(title=f'{code} 외국인·기관')]
+    out.append('<table class="type2" summary="외국인 한도주식수, 보유주식수, 보유율에 관한 표입니다."><tr><th>외국인한도주식수(A)</th><td>' + f"{r.randint(10**6, 10**8):,}" + '</td></tr></table>\n')
+    out.append('<table summary="외국인 기관 순매매 거래량에 관한표이며 날짜별로 정보를 제공합니다." width="100%" class="type2">\n<caption>외국인 기관 순매매 거래량</caption>\n')
+    out.append('<tr><th rowspan="2">날짜</th><th rowspan="2">종가</th><th rowspan="2">전일비</th><th rowspan="2">등락률</th><th rowspan="2">거래량</th><th>기관</th><th colspan="3">외국인</th></tr>\n')
+    out.append('<tr><th>순매매량</th><th>순매매량</th><th>보유주수</th><th>보유율</th></tr>\n<tr><td colspan="9" height="8"></td></tr>\n')
+    year, month, day = 2026, 10, 28
+    for k in range(days):
+        d, m = day - (page - 1) * days - k, month
+        while d <= 0:
+            m -= 1; d += 30
+        close = r.randint(5, 3000) * 100
+        diff = r.randint(-30, 30) * 5
+        inst = r.randint(-500000, 500000)
+        fore = r.randint(-500000, 500000)
+        out.append('<tr onMouseOver="mouseOver(this)" onMouseOut="mouseOut(this)">\n')
+        out.append(f'<td class="tc"><span class="tah p10 gray03">{year}.{m:02d}.{d:02d}</span></td>\n')
+        out.append(f'<td class="num"><span class="tah p11">{close:,}</span></td>\n')
+        out.append(f'<td class="num">{_arrow(diff)}<span class="tah p11">{abs(diff):,}</span></td>\n')
+        out.append(f'<td class="num"><span class="tah p11">{diff / close * 100:+.2f}%</span></td>\n')
+        out.append(f'<td class="num"><span class="tah p11">{r.randint(0, 10**7):,}</span></td>\n')
+        out.append(f'<td class="num"><span class="tah p11">{inst:+,}</span></td>\n')
+        out.append(f'<td class="num"><span class="tah p11">{fore:+,}</span></td>\n')
+        out.append(f'<td class="num"><span class="tah p11">{r.randint(10**5, 10**8):,}</span></td>\n')
+        out.append(f'<td class="num"><span class="tah p11">{r.uniform(0, 60):.2f}%</span></td>\n</tr>\n')
+        if k % 5 == 4:
+            out.append('<tr><td colspan="9" class="division_line"></td></tr>\n')
+    out.append('</table>\n')
+    out.append(_PAGE_TAIL)
+    return ''.join(out)
+
+def save_fixtures(out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    pages = {
+        'market_sum_group1.html': market_sum_page(GROUP1, 0, 1),
+        'market_sum_group2.html': market_sum_page(GROUP2, 0, 1),
+        'frgn.html': frgn_page('005930'),
+    }
+    for name, html in pages.items():
+        with open(os.path.join(out_dir, name), 'w', encoding='utf-8') as f:
+            f.write(html)
+    return list(pages)
+
+if __name__ == "__main__":
+    print(save_fixtures(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')))
@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from functools import lru_cache
+from urllib.parse import quote, unquote
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import naver_fixtures as nf
+
+# 네이버 금융 대역 서버 (오프라인 벤치마크/회귀 테스트용)
+# - /sise/field_submit.naver: fieldIds를 쿠키에 저장하고 returnUrl로 리다이렉트 (실제 사이트와 같은 방식)
+# - /sise/sise_market_sum.naver: 쿠키에 저장된 항목으로 시가총액 페이지 생성
+# - /item/frgn.naver: 종목별 외국인/기관 페이지 (&page=N 지원)
+# 응답은 실제처럼 EUC-KR로 인코딩하고, 지연/지터/오류율/429 연속 구간을 설정할 수 있음
+# --tick-seconds를 주면 그 주기마다 일부 종목 시세가 바뀜 (장중 갱신 테스트용)
+# 사용법: python bench/naver_server.py --port 8800 --tickers 2600 --latency 0.05 --jitter 0.03
+#         python main.py --base-url http://127.0.0.1:8800
+
+FIELD_COOKIE = 'field_list'
+DEFAULT_FIELDS = ['quant', 'market_sum', 'per', 'pbr']
+MAX_FIELDS = 6  # 실제 사이트처럼 항목은 한 번에 최대 6개까지만 선택됨
+
+class Behaviour:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, burst_every=0, burst_len=0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.burst_every = burst_every
+        self.burst_len = burst_len
+        self.random = random.Random(seed)
+        self.requests = 0
+
+    async def apply(self):
+        # 요청 번호 기준으로 burst_every 건마다 마지막 burst_len 건은 429 (차단 구간 흉내)
+        self.requests += 1
+        n = self.requests
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.burst_every and n % self.burst_every >= self.burst_every - self.burst_len:
+            return web.Response(status=429, text='Too Many Requests')
+        if self.error_rate and self.random.random() < self.error_rate:
+            return web.Response(status=503, text='Service Unavailable')
+        return None
+
+def euc_kr(text):
+    return web.Response(body=text.encode('euc-kr'), content_type='text/html', charset='euc-kr')
+
+@lru_cache(maxsize=4096)
+def market_sum_body(fields, sosok, page, total, tick=0):
+    return nf.market_sum_page(list(fields), sosok, page, total=total, tick=tick).encode('euc-kr')
+
+def make_app(tickers=2600, behaviour=None, tick_seconds=0):
+    behaviour = behaviour or Behaviour()
+    per_market = tickers // 2
+
+    async def field_submit(request):
+        fields = [v for k, v in request.query.items() if k == 'fieldIds'][:MAX_FIELDS]
+        response = web.HTTPFound(request.query.get('returnUrl') or '/sise/sise_market_sum.naver')
+        response.set_cookie(FIELD_COOKIE, quote(','.join(fields)), path='/')
+        return response
+
+    async def market_sum(request):
+        error = await behaviour.apply()
+        if error is not None: return error
+        cookie = request.cookies.get(FIELD_COOKIE)
+        fields = tuple(f for f in unquote(cookie).split(',') if f in nf.FIELD_HEADERS) if cookie else tuple(DEFAULT_FIELDS)
+        sosok = int(request.query.get('sosok', 0))
+        page = int(request.query.get('page', 1))
+        tick = int(time.time() // tick_seconds) if tick_seconds else 0
+        body = market_sum_body(fields, sosok, page, per_market, tick)
+        return web.Response(body=body, content_type='text/html', charset='euc-kr')
+
+    async def frgn(request):
+        error = await behaviour.apply()
+        if error is not None: return error
+        return euc_kr(nf.frgn_page(request.query.get('code', '000000'), int(request.query.get('page', 1))))
+
+    app = web.Application()
+    app['behaviour'] = behaviour
+    app.router.add_get('/sise/field_submit.naver', field_submit)
+    app.router.add_get('/sise/sise_market_sum.naver', market_sum)
+    app.router.add_get('/item/frgn.naver', frgn)
+    return app
+
+def add_arguments(parser):
+    parser.add_argument('--tickers', type=int, default=2600, help="전체 종목 수 (코스피/코스닥 절반씩)")
+    parser.add_argument('--latency', type=float, default=0.05, help="기본 응답 지연(초)")
+    parser.add_argument('--jitter', type=float, default=0.03, help="지연에 더할 무작위 지터 상한(초)")
+    parser.add_argument('--error-rate', type=float, default=0.01, help="503 응답 비율")
+    parser.add_argument('--burst-every', type=int, default=1000, help="N건마다 429 구간 시작 (0이면 끔)")
+    parser.add_argument('--burst-len', type=int, default=30, help="429 구간 길이(건)")
+    parser.add_argument('--seed', type=int, default=0)
+
+def behaviour_from_args(args):
+    return Behaviour(args.latency, args.jitter, args.error_rate, args.burst_every, args.burst_len, args.seed)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--tick-seconds', type=float, default=0, help="N초마다 일부 종목 시세 변경 (0이면 고정)")
+    add_arguments(parser)
+    args = parser.parse_args()
+    web.run_app(make_app(args.tickers, behaviour_from_args(args), args.tick_seconds), host=args.host, port=args.port, print=None)
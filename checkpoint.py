@@ -0,0 +1,86 @@
+import json
+import os
+import pickle
+import shutil
+import threading
+
+# 중단된 수집을 이어서 하기 위한 체크포인트 저장소 (실행일 단위)
+# checkpoints/2024-01-02/market_sum/group1-3f2a9c1e-0-5.pkl : 항목 그룹/시장/페이지별 파싱 결과
+# checkpoints/2024-01-02/investors.jsonl           : 종목코드별 수급 행 (한 줄에 한 종목, 받는 즉시 추가)
+# 같은 날 다시 실행하면 저장된 단위는 건너뛰고 나머지만 요청함
+
+CHECKPOINT_DIR = 'checkpoints'
+
+class CheckpointStore:
+    def __init__(self, run_date, root=CHECKPOINT_DIR):
+        self.root = root
+        self.path = os.path.join(root, run_date)
+        self.page_dir = os.path.join(self.path, 'market_sum')
+        self.investor_file = os.path.join(self.path, 'investors.jsonl')
+        self._investors = None
+        self._partial_line = False
+        self._lock = threading.Lock()
+        os.makedirs(self.page_dir, exist_ok=True)
+
+    def prune(self):
+        # 다른 날짜의 체크포인트는 이어 받을 일이 없으므로 정리
+        for name in os.listdir(self.root):
+            full = os.path.join(self.root, name)
+            if full != self.path and os.path.isdir(full):
+                shutil.rmtree(full, ignore_errors=True)
+
+    def remove(self):
+        # 실행이 끝까지 성공하면 그날 체크포인트는 필요 없음
+        shutil.rmtree(self.path, ignore_errors=True)
+        self._investors = None
+
+    def clear(self):
+        # 강제 새 실행: 저장된 단위를 모두 버리고 빈 저장소로 다시 시작
+        self.remove()
+        os.makedirs(self.page_dir, exist_ok=True)
+
+    # ---- 시가총액 페이지 ----
+    def _page_file(self, group, sosok, page):
+        return os.path.join(self.page_dir, f"{group}-{sosok}-{page}.pkl")
+
+    def load_page(self, group, sosok, page):
+        try:
+            with open(self._page_file(group, sosok, page), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def save_page(self, group, sosok, page, result):
+        # 임시 파일에 쓰고 교체해서 중간에 끊겨도 깨진 파일이 남지 않게 함
+        path = self._page_file(group, sosok, page)
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+
+    # ---- 종목별 수급 ----
+    def investors(self):
+        if self._investors is None:
+            self._investors = {}
+            if os.path.exists(self.investor_file):
+                with open(self.investor_file, encoding='utf-8') as f:
+                    for line in f:
+                        self._partial_line = not line.endswith('\n')
+                        # [수정] 중단되면서 잘린 줄이나 형식이 다른 줄은 건너뛰고 나머지 종목은 그대로 사용
+                        try:
+                            code, rows = json.loads(line)
+                            rows = [tuple(row) for row in rows]
+                        except (ValueError, TypeError):
+                            continue
+                        self._investors[code] = rows
+        return self._investors
+
+    def save_investor(self, code, rows):
+        line = json.dumps([code, rows], ensure_ascii=False)
+        with self._lock:
+            self.investors()[code] = rows
+            with open(self.investor_file, 'a', encoding='utf-8') as f:
+                # [추가] 마지막 줄이 개행 없이 잘려 있으면 줄을 바꾼 뒤 추가 (새 줄이 잘린 줄에 붙어 같이 버려지지 않게)
+                if self._partial_line:
+                    f.write('\n')
+                    self._partial_line = False
+                f.write(line + '\n')
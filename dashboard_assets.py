@@ -0,0 +1,507 @@
+# 대시보드 페이지 스크립트
+# - TABLE_PAGE_SCRIPT: HTML 표 출력 모드 (DataTables가 DOM에서 직접 필터/정렬)
+# - JSON_PAGE_SCRIPT: JSON 출력 모드. 빌드 시 만든 숫자 타입 배열/정렬 순열을 Web Worker에서 필터/정렬하고
+#   결과 행 번호로 표를 다시 그림 (__KINDS__ 등 자리표시자는 process_and_save_html에서 채움)
+
+TABLE_PAGE_SCRIPT = r"""
+            $(document).ready( function () {
+                $.fn.dataTable.ext.search.push(
+                    function( settings, data, dataIndex ) {
+                        function parseVal(val) {
+                            if (!val || val === '-' || val === 'N/A') return null;
+                            var tmp = document.createElement("DIV");
+                            tmp.innerHTML = val;
+                            var text = tmp.textContent || tmp.innerText || "";
+                            text = text.replace(/,/g, '').replace(/%/g, '').replace(/▲/g, '').replace(/▼/g, '').replace(/\+/g, '').trim();
+                            var num = parseFloat(text);
+                            return isNaN(num) ? null : num;
+                        }
+
+                        // [수정됨] 상장주식수가 다시 추가되면서 자사주 비율 인덱스가 19번으로 변경됨
+                        var filters = [
+                            { col: 1,  minId: '#min_col_1',  maxId: '#max_col_1' },   // 현재가
+                            { col: 7,  minId: '#min_col_7',  maxId: '#max_col_7' },   // 시가총액
+                            { col: 9,  minId: '#min_col_9',  maxId: '#max_col_9' },   // 영업이익
+                            { col: 10, minId: '#min_col_10', maxId: '#max_col_10' },  // 영업이익률(%)
+                            { col: 13, minId: '#min_col_13', maxId: '#max_col_13' },  // PER
+                            { col: 14, minId: '#min_col_14', maxId: '#max_col_14' },  // PBR
+                            { col: 12, minId: '#min_col_12', maxId: '#max_col_12' },  // 부채비율
+                            { col: 16, minId: '#min_col_16', maxId: '#max_col_16' },  // 배당수익률
+                            { col: 6,  minId: '#min_col_6',  maxId: '#max_col_6' },   // 외국인 보유율
+                            { col: 19, minId: '#min_col_19', maxId: '#max_col_19' }   // 자사주 비율 (수정)
+                        ];
+
+                        for (var i = 0; i < filters.length; i++) {
+                            var f = filters[i];
+                            var minStr = $(f.minId).val();
+                            var maxStr = $(f.maxId).val();
+                            
+                            if (minStr !== "" || maxStr !== "") {
+                                var cellVal = parseVal(data[f.col]);
+                                
+                                if (cellVal === null) return false; 
+                                
+                                if (minStr !== "" && cellVal < parseFloat(minStr)) return false;
+                                if (maxStr !== "" && cellVal > parseFloat(maxStr)) return false;
+                            }
+                        }
+                        return true; 
+                    }
+                );
+
+                var table = $('#stockTable').DataTable({
+                    "dom": 'rti', 
+                    "paging": false,
+                    "scrollY": "60vh",
+                    "scrollX": true,
+                    "scrollCollapse": true,
+                    "fixedHeader": true,
+                    "fixedColumns": {
+                        "leftColumns": 1
+                    },
+                    "searching": true, 
+                    "ordering": true,
+                    "order": [[ 7, "desc" ]], 
+                    "language": { 
+                        "url": "//cdn.datatables.net/plug-ins/1.13.6/i18n/ko.json",
+                        "info": "총 _TOTAL_개 종목",
+                        "infoFiltered": "(전체 _MAX_개 중 필터링됨)",
+                        "infoEmpty": "조건에 맞는 검색 결과가 없습니다."
+                    }
+                });
+
+                function performSearch() {
+                    var keyword = $('#customSearchInput').val();
+                    var $btn = $('#customSearchBtn');
+                    var $spinner = $('#searchSpinner');
+                    var $text = $('#searchText');
+
+                    $btn.prop('disabled', true);
+                    $spinner.removeClass('d-none');
+                    $text.text(' 중...');
+
+                    setTimeout(function() {
+                        table.search(keyword).draw();
+                        $btn.prop('disabled', false);
+                        $spinner.addClass('d-none');
+                        $text.text('🔍 검색');
+                    }, 150);
+                }
+
+                $('#customSearchBtn').on('click', performSearch);
+                $('#customSearchInput').on('keypress', function(e) {
+                    if (e.which == 13 || e.keyCode == 13) { performSearch(); }
+                });
+
+                $('#toggleFilterBtn').on('click', function() {
+                    $('#filterPanel').slideToggle('fast');
+                });
+
+                $('#applyRangeBtn').on('click', function() {
+                    var $btn = $(this);
+                    var $spinner = $('#rangeSpinner');
+                    var $text = $('#rangeText');
+
+                    $btn.prop('disabled', true);
+                    $spinner.removeClass('d-none');
+                    $text.text(' 적용중');
+
+                    setTimeout(function() {
+                        table.draw(); 
+                        $btn.prop('disabled', false);
+                        $spinner.addClass('d-none');
+                        $text.text('적용하기');
+                        $('#filterPanel').slideUp('fast'); 
+                    }, 150);
+                });
+
+                $('#clearRangeBtn').on('click', function() {
+                    $('#filterPanel input').val('');
+                    table.draw();
+                });
+
+                $('#resetBtn').on('click', function() {
+                    var $btn = $(this);
+                    var $spinner = $('#resetSpinner');
+                    var $text = $('#resetText');
+
+                    $btn.prop('disabled', true);
+                    $spinner.removeClass('d-none');
+                    $text.text(' 복구중');
+
+                    setTimeout(function() {
+                        $('#customSearchInput').val('');
+                        $('#filterPanel input').val(''); 
+                        table.search('').columns().search('');
+                        table.order([[ 7, "desc" ]]);
+                        table.draw();
+
+                        $btn.prop('disabled', false);
+                        $spinner.addClass('d-none');
+                        $text.text('🔄 초기화');
+                    }, 150);
+                });
+            });
+"""
+
+JSON_PAGE_SCRIPT = r"""
+            var STOCK_KINDS = __KINDS__;
+            var ORDER_COL = __ORDER_COL__;
+            var NAME_MAX_WIDTH = __NAME_MAX_WIDTH__;
+            var DATA_URL = __DATA_URL__;
+            var DELTA_URL = __DELTA_URL__;
+            var DELTA_BASE = __DELTA_BASE__;
+            var DELTA_POLL_MS = 60000;
+            var CODE_COL = STOCK_KINDS.indexOf('code');
+            var RATE_COL = STOCK_KINDS.indexOf('rate');
+            var NAME_COL = STOCK_KINDS.indexOf('name');
+            var RED = '<span style="color: #ff4d4d;">', BLUE = '<span style="color: #4da6ff;">', END = '</span>';
+
+            // ---- 표시용 렌더러 (숫자 원시값 -> 기존 표와 같은 표시 형식) ----
+            function comma(v) { return v.toLocaleString('en-US'); }
+            function fixed2(v) {
+                var s = v.toFixed(2);
+                return (v < 0 || Object.is(v, -0)) && s.charAt(0) !== '-' ? '-' + s : s;
+            }
+
+            function numeric(display) {
+                return function(v, type, row) {
+                    if (type === 'display') return display(v, row);
+                    return v === null ? '' : v;
+                };
+            }
+
+            var RENDERERS = {
+                name: function(v, type, row) {
+                    if (type !== 'display') return v;
+                    return '<a href="https://finance.naver.com/item/main.naver?code=' + row[CODE_COL] + '" target="_blank" class="text-info text-decoration-none fw-bold" style="display: inline-block; max-width: ' + NAME_MAX_WIDTH + 'px; overflow: hidden; text-overflow: ellipsis; white-space: nowrap; vertical-align: middle;">' + v + '</a>';
+                },
+                code: function(v) { return v; },
+                text: function(v) { return v === null ? '-' : v; },
+                int: numeric(function(v) { return (v === null || v === 0) ? '-' : comma(v); }),
+                float: numeric(function(v) { return v === null ? '-' : fixed2(v); }),
+                diff: numeric(function(v, row) {
+                    if (v === null) return '-';
+                    if (v === 0) return '0';
+                    var rate = RATE_COL >= 0 ? row[RATE_COL] : 0;
+                    if (rate > 0) return RED + '▲ ' + comma(v) + END;
+                    if (rate < 0) return BLUE + '▼ ' + comma(v) + END;
+                    return comma(v);
+                }),
+                rate: numeric(function(v) {
+                    if (v === null) return '-';
+                    if (v > 0) return RED + '+' + fixed2(v) + '%' + END;
+                    if (v < 0) return BLUE + fixed2(v) + '%' + END;
+                    return fixed2(v) + '%';
+                }),
+                net: numeric(function(v) {
+                    if (v === null) return '-';
+                    if (v > 0) return RED + '+' + comma(v) + END;
+                    if (v < 0) return BLUE + comma(v) + END;
+                    return '0';
+                })
+            };
+
+            // ---- 타입 배열 디코딩 ----
+            var TYPED = { i4: Int32Array, f8: Float64Array, u2: Uint16Array, u4: Uint32Array };
+            var INT32_NULL = -2147483648;
+
+            function decode(spec) {
+                var bin = atob(spec.data), bytes = new Uint8Array(bin.length);
+                for (var i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+                return new TYPED[spec.dtype](bytes.buffer);
+            }
+
+            function numericColumn(spec) {
+                var raw = decode(spec), out = new Float64Array(raw.length);
+                for (var i = 0; i < raw.length; i++) {
+                    out[i] = (spec.dtype === 'i4' && raw[i] === INT32_NULL) ? NaN : raw[i] / spec.scale;
+                }
+                return out;
+            }
+
+            // ---- 필터/정렬 엔진: 빌드 시 만든 숫자 열과 정렬 순열만으로 결과 행 번호를 계산 ----
+            function createEngine() {
+                var cols = {}, perms = {}, names = [], n = 0;
+                return {
+                    init: function(msg) { cols = msg.cols; perms = msg.perms; names = msg.names; n = msg.n; },
+                    query: function(q) {
+                        var mask = new Uint8Array(n), i, j, k;
+                        mask.fill(1);
+                        for (k = 0; k < q.filters.length; k++) {
+                            var f = q.filters[k], c = cols[f.col];
+                            if (!c) continue;
+                            for (i = 0; i < n; i++) {
+                                var v = c[i];
+                                if (v !== v || (f.min !== null && v < f.min) || (f.max !== null && v > f.max)) mask[i] = 0;
+                            }
+                        }
+                        var words = q.keyword ? q.keyword.toLowerCase().split(/\s+/).filter(Boolean) : [];
+                        if (words.length) {
+                            for (i = 0; i < n; i++) {
+                                if (!mask[i]) continue;
+                                for (k = 0; k < words.length; k++) {
+                                    if (names[i].indexOf(words[k]) < 0) { mask[i] = 0; break; }
+                                }
+                            }
+                        }
+                        var perm = perms[q.sortCol], out = new Int32Array(n), m = 0;
+                        for (j = 0; j < n; j++) {
+                            i = perm ? perm[q.desc ? n - 1 - j : j] : j;
+                            if (mask[i]) out[m++] = i;
+                        }
+                        return out.slice(0, m);
+                    }
+                };
+            }
+
+            function startEngine(onResult) {
+                var local = null, worker = null, initMsg = null, lastQuery = null;
+                function useLocal() {
+                    worker = null;
+                    local = createEngine();
+                    if (initMsg) local.init(initMsg);
+                }
+                function runLocal(q) {
+                    var rows = local.query(q);
+                    setTimeout(function() { onResult({ id: q.id, rows: rows }); }, 0);
+                }
+                try {
+                    var src = createEngine.toString() + '\nvar engine = createEngine();\n' +
+                        'self.onmessage = function(e) { var d = e.data; if (d.type === "init") { engine.init(d); return; } ' +
+                        'var rows = engine.query(d); self.postMessage({ id: d.id, rows: rows }, [rows.buffer]); };';
+                    worker = new Worker(URL.createObjectURL(new Blob([src], { type: 'text/javascript' })));
+                    worker.onmessage = function(e) { onResult(e.data); };
+                    // 워커를 못 쓰는 환경이면 메인 스레드에서 같은 엔진으로 처리
+                    worker.onerror = function() { useLocal(); if (lastQuery) runLocal(lastQuery); };
+                } catch (e) {
+                    useLocal();
+                }
+                return {
+                    init: function(msg) {
+                        initMsg = msg;
+                        if (local) { local.init(msg); return; }
+                        worker.postMessage({ type: 'init', n: msg.n, cols: msg.cols, perms: msg.perms, names: msg.names });
+                    },
+                    query: function(q) {
+                        lastQuery = q;
+                        if (local) { runLocal(q); return; }
+                        worker.postMessage(q);
+                    }
+                };
+            }
+
+            function loadPayload(done) {
+                if (DATA_URL) { $.getJSON(DATA_URL, done); return; }
+                done(JSON.parse(document.getElementById('stockData').textContent));
+            }
+
+            $(document).ready( function () {
+                loadPayload(function (payload) {
+                    var n = payload.n, ncol = STOCK_KINDS.length, cols = {}, perms = {}, i, k;
+                    for (k in payload.numeric) cols[k] = numericColumn(payload.numeric[k]);
+                    for (k in payload.order) perms[k] = decode(payload.order[k]);
+
+                    var rows = new Array(n);
+                    for (i = 0; i < n; i++) {
+                        var row = new Array(ncol);
+                        for (k = 0; k < ncol; k++) {
+                            if (cols[k]) { var v = cols[k][i]; row[k] = v !== v ? null : v; }
+                            else row[k] = payload.text[k] ? payload.text[k][i] : null;
+                        }
+                        rows[i] = row;
+                    }
+                    var names = NAME_COL >= 0 ? payload.text[NAME_COL].map(function(s) { return String(s).toLowerCase(); }) : [];
+
+                    var table = $('#stockTable').DataTable({
+                        "data": [],
+                        "columns": STOCK_KINDS.map(function(kind) { return { "render": RENDERERS[kind], "visible": kind !== 'code' }; }),
+                        "deferRender": true,
+                        "scroller": true,
+                        "dom": 'rt',
+                        "paging": true,
+                        "scrollY": "60vh",
+                        "scrollX": true,
+                        "scrollCollapse": true,
+                        "fixedHeader": true,
+                        "fixedColumns": {
+                            "leftColumns": 1
+                        },
+                        "searching": false,
+                        "ordering": false,
+                        "language": {
+                            "url": "//cdn.datatables.net/plug-ins/1.13.6/i18n/ko.json"
+                        }
+                    });
+                    $(table.table().container()).append('<div class="dataTables_info" id="stockInfo"></div>');
+                    $(table.columns().header()).css('cursor', 'pointer');
+
+                    var state = { keyword: '', sortCol: ORDER_COL, desc: true }, seq = 0, pending = {};
+
+                    function showResult(indices) {
+                        var subset = new Array(indices.length);
+                        for (var j = 0; j < indices.length; j++) subset[j] = rows[indices[j]];
+                        table.clear().rows.add(subset).draw();
+
+                        var info = indices.length ? '총 ' + comma(indices.length) + '개 종목' : '조건에 맞는 검색 결과가 없습니다.';
+                        if (indices.length < n) info += ' (전체 ' + comma(n) + '개 중 필터링됨)';
+                        $('#stockInfo').text(info);
+
+                        $(table.columns().header()).removeClass('sorting_asc sorting_desc').addClass('sorting');
+                        $(table.column(state.sortCol).header()).removeClass('sorting').addClass(state.desc ? 'sorting_desc' : 'sorting_asc');
+                    }
+
+                    var engine = startEngine(function (res) {
+                        var done = pending[res.id];
+                        delete pending[res.id];
+                        if (res.id === seq) showResult(res.rows);
+                        if (done) done();
+                    });
+
+                    function readFilters() {
+                        var filters = [];
+                        $('#filterPanel input[id^="min_col_"]').each(function () {
+                            var col = parseInt(this.id.substring(8), 10);
+                            var minStr = $(this).val(), maxStr = $('#max_col_' + col).val();
+                            if (minStr !== "" || maxStr !== "") {
+                                filters.push({ col: col, min: minStr !== "" ? parseFloat(minStr) : null, max: maxStr !== "" ? parseFloat(maxStr) : null });
+                            }
+                        });
+                        return filters;
+                    }
+
+                    function runQuery(done) {
+                        var id = ++seq;
+                        pending[id] = done;
+                        engine.query({ id: id, filters: readFilters(), keyword: state.keyword, sortCol: state.sortCol, desc: state.desc });
+                    }
+
+                    // 워커 응답이 올 때까지만 버튼을 잠그고 스피너 표시
+                    function busy(btn, spinner, text, label) {
+                        $(btn).prop('disabled', true);
+                        $(spinner).removeClass('d-none');
+                        $(text).text(label);
+                    }
+
+                    function idle(btn, spinner, text, label) {
+                        $(btn).prop('disabled', false);
+                        $(spinner).addClass('d-none');
+                        $(text).text(label);
+                    }
+
+                    engine.init({ n: n, cols: cols, perms: perms, names: names });
+                    runQuery();
+
+                    // ---- 장중 갱신: refresh가 남기는 변경분(deltas/)을 주기적으로 받아 표를 제자리에서 갱신 ----
+                    var deltaSession = null, deltaSeq = 0, polling = false, codeRow = {};
+                    if (CODE_COL >= 0) for (i = 0; i < n; i++) codeRow[rows[i][CODE_COL]] = i;
+
+                    function sortOrder(c) {
+                        // 빌드 시 정렬 순열과 같은 규칙 (결측은 맨 앞, 같은 값은 원래 순서)
+                        var idx = new Array(n), j;
+                        for (j = 0; j < n; j++) idx[j] = j;
+                        idx.sort(function (a, b) {
+                            var x = c[a], y = c[b];
+                            if (x !== x) x = -Infinity;
+                            if (y !== y) y = -Infinity;
+                            return x < y ? -1 : (x > y ? 1 : a - b);
+                        });
+                        return n < 65536 ? Uint16Array.from(idx) : Uint32Array.from(idx);
+                    }
+
+                    function applyDelta(d) {
+                        var touched = [];
+                        d.columns.forEach(function (name, c) {
+                            var k = payload.columns.indexOf(name);
+                            if (k < 0 || !cols[k]) return;
+                            touched.push(k);
+                            d.codes.forEach(function (code, r) {
+                                var i = codeRow[code], v = d.values[c][r];
+                                if (i === undefined) return;
+                                cols[k][i] = v === null ? NaN : v;
+                                rows[i][k] = v;
+                            });
+                        });
+                        touched.forEach(function (k) { if (perms[k]) perms[k] = sortOrder(cols[k]); });
+                        deltaSeq = d.seq;
+                        $('.update-time').text('⏱ 업데이트: ' + d.updated_at);
+                    }
+
+                    function pollDeltas() {
+                        if (polling) return;
+                        polling = true;
+                        function finish(changed) {
+                            polling = false;
+                            if (changed) { engine.init({ n: n, cols: cols, perms: perms, names: names }); runQuery(); }
+                        }
+                        $.getJSON(DELTA_URL + 'manifest.json', { t: Date.now() }).done(function (m) {
+                            // 다른 기준 스냅샷의 변경분은 무시, 갱신 세션이 바뀌면 기준 페이지부터 다시 받음
+                            if (m.base !== DELTA_BASE || m.seq <= deltaSeq) { finish(false); return; }
+                            if (deltaSession !== null && m.session !== deltaSession) { location.reload(); return; }
+                            deltaSession = m.session;
+                            var changed = false;
+                            // 처음이거나 보관 개수보다 뒤처졌으면 누적 변경분으로 한 번에 따라잡고, 아니면 번호 순서대로 적용
+                            (function next(name) {
+                                if (!name) { finish(changed); return; }
+                                $.getJSON(DELTA_URL + name, { t: Date.now() }).done(function (d) {
+                                    if (d.session !== deltaSession) { finish(changed); return; }
+                                    if (name === 'cumulative.json' || d.seq > deltaSeq) { applyDelta(d); changed = true; }
+                                    next(deltaSeq < m.seq ? 'delta-' + (deltaSeq + 1) + '.json' : null);
+                                }).fail(function () {
+                                    next(name === 'cumulative.json' ? null : 'cumulative.json');
+                                });
+                            })(deltaSeq === 0 || m.seq - deltaSeq > m.keep ? 'cumulative.json' : 'delta-' + (deltaSeq + 1) + '.json');
+                        }).fail(function () { finish(false); });
+                    }
+
+                    if (DELTA_URL && CODE_COL >= 0) {
+                        pollDeltas();
+                        setInterval(pollDeltas, DELTA_POLL_MS);
+                    }
+
+                    function performSearch() {
+                        state.keyword = $('#customSearchInput').val();
+                        busy('#customSearchBtn', '#searchSpinner', '#searchText', ' 중...');
+                        runQuery(function () { idle('#customSearchBtn', '#searchSpinner', '#searchText', '🔍 검색'); });
+                    }
+
+                    $('#customSearchBtn').on('click', performSearch);
+                    $('#customSearchInput').on('keypress', function(e) {
+                        if (e.which == 13 || e.keyCode == 13) { performSearch(); }
+                    });
+
+                    $('#toggleFilterBtn').on('click', function() {
+                        $('#filterPanel').slideToggle('fast');
+                    });
+
+                    $(table.table().header()).on('click', 'th', function () {
+                        var col = table.column(this).index();
+                        if (col === undefined) return;
+                        state.desc = (col === state.sortCol) ? !state.desc : false;
+                        state.sortCol = col;
+                        runQuery();
+                    });
+
+                    $('#applyRangeBtn').on('click', function() {
+                        busy('#applyRangeBtn', '#rangeSpinner', '#rangeText', ' 적용중');
+                        runQuery(function () {
+                            idle('#applyRangeBtn', '#rangeSpinner', '#rangeText', '적용하기');
+                            $('#filterPanel').slideUp('fast');
+                        });
+                    });
+
+                    $('#clearRangeBtn').on('click', function() {
+                        $('#filterPanel input').val('');
+                        runQuery();
+                    });
+
+                    $('#resetBtn').on('click', function() {
+                        busy('#resetBtn', '#resetSpinner', '#resetText', ' 복구중');
+                        $('#customSearchInput').val('');
+                        $('#filterPanel input').val('');
+                        state = { keyword: '', sortCol: ORDER_COL, desc: true };
+                        runQuery(function () { idle('#resetBtn', '#resetSpinner', '#resetText', '🔄 초기화'); });
+                    });
+                });
+            });
+"""
@@ -0,0 +1,44 @@
+import glob
+import json
+import os
+import time
+
+# 장중 갱신(refresh)이 남기는 변경분 파일
+# deltas/manifest.json    : 기준 스냅샷(base), 갱신 세션, 최신 번호(seq), 보관 개수(keep)
+# deltas/delta-<seq>.json : 직전 갱신 이후 바뀐 종목만
+# deltas/cumulative.json  : 기준 스냅샷 이후 바뀐 종목 전체 (새로 연 페이지나 너무 뒤처진 페이지가 한 번에 따라잡는 용도)
+# 값은 모두 절대값이라 같은 파일을 두 번 적용해도 결과가 같음. 매니페스트는 항상 마지막에 교체
+
+class DeltaWriter:
+    def __init__(self, root, base, keep=120):
+        self.root = root
+        self.base = base
+        self.keep = keep
+        self.session = f"{int(time.time() * 1000):x}"
+        self.seq = 0
+        os.makedirs(root, exist_ok=True)
+        # 이전 세션의 변경분은 다른 기준으로 만든 것일 수 있으므로 정리
+        for path in glob.glob(os.path.join(root, 'delta-*.json')) + [os.path.join(root, 'cumulative.json')]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _write(self, name, data):
+        path = os.path.join(self.root, name)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+        os.replace(path + '.tmp', path)
+        return os.path.getsize(path)
+
+    def write(self, delta, cumulative, updated_at):
+        self.seq += 1
+        header = {'base': self.base, 'session': self.session, 'seq': self.seq, 'updated_at': updated_at}
+        size = self._write(f"delta-{self.seq}.json", dict(header, **delta))
+        self._write('cumulative.json', dict(header, **cumulative))
+        self._write('manifest.json', dict(header, keep=self.keep))
+        try:
+            os.remove(os.path.join(self.root, f"delta-{self.seq - self.keep}.json"))
+        except OSError:
+            pass
+        return size
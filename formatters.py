@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+# HTML 대시보드용 셀 포맷터 (열 단위 벡터 연산)
+# 기존 행 단위 format_diff / format_rate / format_net_buy / 정수·실수 포맷과 바이트 단위로 같은 결과를 냄
+# 숫자 -> 문자열 변환과 부호/색상 판정은 NumPy 배열 연산으로, 조각 결합은 np.strings로 처리
+
+RED = '<span style="color: #ff4d4d;">'
+BLUE = '<span style="color: #4da6ff;">'
+END = '</span>'
+_NAN_WORDS = {'nan', '+nan', '-nan'}
+
+def as_text(series):
+    # str(val)과 같은 문자열 (NaN -> 'nan', None -> 'None')
+    return series.to_numpy(dtype=object).astype(str)
+
+def _join(*parts):
+    out = parts[0]
+    for part in parts[1:]:
+        out = np.strings.add(out, part)
+    return out
+
+def thousands(values):
+    # f"{x:,}" 과 동일 (int64)
+    values = np.asarray(values, dtype='int64')
+    # np.strings.zfill은 빈 배열에서 최대 폭을 구하다 실패하므로 먼저 반환
+    if len(values) == 0:
+        return np.array([], dtype=str)
+    neg = values < 0
+    mag = np.abs(values)
+    digits = np.strings.str_len(mag.astype(str))
+    groups = (digits - 1) // 3
+
+    out = (mag // np.power(1000, groups, dtype='int64')).astype(str)
+    for j in range(int(groups.max(initial=0)) - 1, -1, -1):
+        part = np.strings.zfill(((mag // 1000 ** j) % 1000).astype(str), 3)
+        out = np.where(groups > j, _join(out, ',', part), out)
+    return np.where(neg, np.strings.add('-', out), out)
+
+def fixed2(values):
+    # f"{x:.2f}" 과 동일. 반올림 경계에 걸린 값이나 inf/nan만 파이썬 포맷으로 처리
+    values = np.asarray(values, dtype='float64')
+    if len(values) == 0:
+        return np.array([], dtype=str)
+    finite = np.isfinite(values)
+    with np.errstate(over='ignore', invalid='ignore'):
+        scaled = np.where(finite, values * 100, 0.0)
+        frac = np.abs(scaled - np.trunc(scaled))
+        exact = finite & (np.abs(frac - 0.5) > 1e-6) & (np.abs(scaled) < 2 ** 52)
+
+    cents = np.abs(np.rint(np.where(exact, scaled, 0.0))).astype('int64')
+    sign = np.where(np.signbit(values), '-', '')
+    out = _join(sign, (cents // 100).astype(str), '.', np.strings.zfill((cents % 100).astype(str), 2))
+
+    slow = np.flatnonzero(~exact)
+    if len(slow):
+        out = out.astype(object)
+        out[slow] = [f"{v:.2f}" for v in values[slow]]
+        out = out.astype(str)
+    return out
+
+def parse_float(text):
+    # float(str) 규칙: 변환 실패 여부와 값을 함께 반환
+    cleaned = pd.Series(text).str.strip()
+    num = pd.to_numeric(cleaned, errors='coerce').to_numpy(dtype='float64')
+    ok = ~np.isnan(num) | cleaned.str.lower().isin(_NAN_WORDS).to_numpy()
+    return num, ok
+
+def parse_rate(rate_col):
+    # 등락률 부호 판정용 값과 변환 성공 여부. float 열은 문자열을 거치지 않음 (NaN은 'nan'처럼 변환 성공으로 봄)
+    if pd.api.types.is_float_dtype(rate_col):
+        return rate_col.astype('float64').to_numpy(na_value=np.nan), np.ones(len(rate_col), dtype=bool)
+    return parse_float(pd.Series(as_text(rate_col)).str.replace('%', '').str.replace(',', ''))
+
+def format_diff(diff_col, rate_col):
+    if pd.api.types.is_integer_dtype(diff_col):
+        # [수정] 스키마를 거친 부호 있는 정수 열은 문자열로 바꿔 숫자만 다시 추리지 않음
+        has_digits = diff_col.notna().to_numpy()
+        diff = np.abs(diff_col.fillna(0).to_numpy(dtype='int64'))
+        text = as_text(diff_col) if not has_digits.all() else ''
+    else:
+        text = as_text(diff_col)
+        digits = pd.Series(text).str.replace(r'[^\d]', '', regex=True)
+        has_digits = (digits.str.len() > 0).to_numpy()
+        diff = pd.to_numeric(digits.where(has_digits, '0')).to_numpy(dtype='int64')
+
+    rate, rate_ok = parse_rate(rate_col)
+    body = thousands(diff)
+    return np.select(
+        [~has_digits, diff == 0, ~rate_ok, rate > 0, rate < 0],
+        [text, '0', text, _join(RED, '▲ ', body, END), _join(BLUE, '▼ ', body, END)],
+        default=body,
+    )
+
+def format_rate(rate_col):
+    text = as_text(rate_col)
+    rate, ok = parse_float(pd.Series(text).str.replace('%', '').str.replace(',', ''))
+    body = np.strings.add(fixed2(rate), '%')
+    return np.select(
+        [~ok, rate > 0, rate < 0],
+        [text, _join(RED, '+', body, END), _join(BLUE, body, END)],
+        default=body,
+    )
+
+def format_net_buy(col):
+    missing = col.isna().to_numpy()
+    if pd.api.types.is_numeric_dtype(col):
+        num = col.astype('float64').to_numpy(na_value=np.nan)
+        ok = np.isfinite(num)
+        text = as_text(col) if (~ok & ~missing).any() else ''
+    else:
+        text = as_text(col)
+        num, ok = parse_float(pd.Series(text).str.replace(',', '').str.replace('+', ''))
+        ok &= np.isfinite(num)
+    whole = np.trunc(np.where(ok, num, 0)).astype('int64')
+    body = thousands(whole)
+    return np.select(
+        [missing, ~ok, whole > 0, whole < 0],
+        ['-', text, _join(RED, '+', body, END), _join(BLUE, body, END)],
+        default='0',
+    )
+
+def format_int(col):
+    if pd.api.types.is_numeric_dtype(col):
+        values = np.trunc(col.astype('float64').fillna(0).to_numpy()).astype('int64')
+    else:
+        values = pd.to_numeric(col.astype(str).str.replace(',', ''), errors='coerce').fillna(0).astype(int).to_numpy()
+    return np.where(values != 0, thousands(values), '-')
+
+def format_float(col):
+    if pd.api.types.is_float_dtype(col):
+        values = col.astype('float64').to_numpy()
+    else:
+        values = pd.to_numeric(col.astype(str).str.replace('%', '').str.replace(',', ''), errors='coerce').to_numpy(dtype='float64')
+    return np.where(np.isnan(values), '-', fixed2(values))
+
+def name_links(name_col, code_col, name_max_width):
+    head = '<a href="https://finance.naver.com/item/main.naver?code='
+    mid = (f'" target="_blank" class="text-info text-decoration-none fw-bold" style="display: inline-block; max-width: {name_max_width}px; '
+           'overflow: hidden; text-overflow: ellipsis; white-space: nowrap; vertical-align: middle;">')
+    return _join(head, as_text(code_col), mid, as_text(name_col), '</a>')
@@ -0,0 +1,214 @@
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import metrics
+from throttle import ThrottleError
+
+# 디스크 HTTP 응답 캐시 (개발/렌더링 반복용)
+# - 키: 메서드 + URL + 쿼리 파라미터 + 현재 선택된 fieldIds (시가총액 페이지 내용이 항목 선택 쿠키에 따라 달라지므로)
+# - 본문: zlib 압축, 본문 해시로 파일 이름을 정해 같은 내용은 한 번만 저장
+# - 색인: SQLite (생성 시각으로 TTL 판단, 마지막 사용 시각으로 용량 초과 시 LRU 삭제)
+# - 재생(replay): 저장된 응답만 사용하고 네트워크에는 나가지 않음 (없는 요청은 ReplayMiss로 실행을 멈춤)
+
+CACHE_DIR = '.http_cache'
+DEFAULT_TTL = 6 * 3600
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+FIELD_SUBMIT = 'field_submit.naver'
+_CHARSET = re.compile(r'charset=([\w-]+)', re.I)
+
+class CachedEntry:
+    def __init__(self, status, content_type, body):
+        self.status = status
+        self.content_type = content_type
+        self.body = body
+
+class ReplayMiss(ThrottleError):
+    # [수정] 재생 중 캐시에 없는 요청을 404 빈 페이지로 넘기면 수집이 0개 종목으로 조용히 끝나므로 예외로 알림
+    # (404라서 재시도 대상도 아님)
+    def __init__(self, url):
+        super().__init__(404)
+        self.url = url
+
+    def __str__(self):
+        return f"재생(--replay) 캐시에 없는 요청입니다: {self.url}"
+
+class ResponseCache:
+    def __init__(self, root=CACHE_DIR, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, replay=False):
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.replay = replay
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, 'bodies'), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(root, 'index.sqlite'), check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, url TEXT, status INTEGER, content_type TEXT, '
+                         'body TEXT, size INTEGER, created REAL, accessed REAL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)')
+        self._total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    @staticmethod
+    def make_key(method, url, params=None, context=None):
+        query = urlencode(sorted(params if isinstance(params, list) else (params or {}).items()), doseq=True)
+        raw = f"{method.upper()} {url}?{query}#{context or ''}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _body_path(self, digest):
+        return os.path.join(self.root, 'bodies', digest[:2], digest + '.z')
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute('SELECT status, content_type, body, created FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None or (not self.replay and time.time() - row[3] > self.ttl):
+                metrics.count('http_cache.miss')
+                return None
+            self._db.execute('UPDATE entries SET accessed = ? WHERE key = ?', (time.time(), key))
+            self._db.commit()
+        try:
+            with open(self._body_path(row[2]), 'rb') as f:
+                body = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            metrics.count('http_cache.miss')
+            return None
+        metrics.count('http_cache.hit')
+        return CachedEntry(row[0], row[1], body)
+
+    def put(self, key, url, status, content_type, body):
+        if self.replay:
+            return
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._body_path(digest)
+        data = zlib.compress(body, 6)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # [수정] 같은 본문을 여러 스레드가 동시에 저장할 수 있으므로 스레드마다 다른 임시 파일에 쓴 뒤 교체
+            with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix='.tmp', delete=False) as f:
+                f.write(data)
+            os.replace(f.name, path)
+        now = time.time()
+        with self._lock:
+            old = self._db.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+            self._db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                             (key, url, status, content_type, digest, len(data), now, now))
+            self._total += len(data) - (old[0] if old else 0)
+            if self._total > self.max_bytes:
+                self._evict()
+            self._db.commit()
+        metrics.count('http_cache.store')
+
+    def _evict(self):
+        # 가장 오래 쓰이지 않은 항목부터 용량 한도의 90%까지 삭제. 더 이상 참조되지 않는 본문 파일도 함께 삭제
+        target = self.max_bytes * 0.9
+        removed = []
+        for key, digest, size in self._db.execute('SELECT key, body, size FROM entries ORDER BY accessed').fetchall():
+            if self._total <= target:
+                break
+            removed.append((key, digest))
+            self._total -= size
+        self._db.executemany('DELETE FROM entries WHERE key = ?', [(key,) for key, _ in removed])
+        for _, digest in removed:
+            if self._db.execute('SELECT 1 FROM entries WHERE body = ? LIMIT 1', (digest,)).fetchone() is None:
+                try:
+                    os.remove(self._body_path(digest))
+                except OSError:
+                    pass
+        metrics.count('http_cache.evicted', len(removed))
+
+def charset(content_type, default='utf-8'):
+    match = _CHARSET.search(content_type or '')
+    return match.group(1) if match else default
+
+def decode(body, content_type, default='utf-8'):
+    return body.decode(charset(content_type, default), errors='replace')
+
+class CachedSession(requests.Session):
+    # requests.Session 대신 사용. field_submit 요청으로 바뀐 항목 선택을 기억해서 캐시 키에 포함
+    def __init__(self, cache):
+        super().__init__()
+        self.cache = cache
+        self.fields = ''
+
+    def request(self, method, url, params=None, **kwargs):
+        if FIELD_SUBMIT in url:
+            self.fields = ','.join(v for k, v in (params or []) if k == 'fieldIds')
+            if self.cache.replay:
+                return self._response(url, CachedEntry(200, 'text/html', b''))
+            return super().request(method, url, params=params, **kwargs)
+        if method.upper() != 'GET':
+            return super().request(method, url, params=params, **kwargs)
+
+        key = self.cache.make_key(method, url, params, self.fields)
+        entry = self.cache.get(key)
+        if entry is None and self.cache.replay:
+            raise ReplayMiss(url)
+        if entry is not None:
+            return self._response(url, entry)
+
+        res = super().request(method, url, params=params, **kwargs)
+        if res.status_code == 200:
+            self.cache.put(key, res.url, res.status_code, res.headers.get('Content-Type', ''), res.content)
+        return res
+
+    def _response(self, url, entry):
+        res = requests.Response()
+        res.status_code = entry.status
+        res._content = entry.body
+        res.url = url
+        res.headers = CaseInsensitiveDict({'Content-Type': entry.content_type})
+        res.encoding = requests.utils.get_encoding_from_headers(res.headers)
+        return res
+
+class CachedResponse:
+    # aiohttp 응답 중 수급 수집에서 쓰는 부분(status / read / text)만 흉내
+    def __init__(self, entry):
+        self.status = entry.status
+        self.headers = {'Content-Type': entry.content_type}
+        self._body = entry.body
+
+    async def read(self):
+        return self._body
+
+    async def text(self):
+        return decode(self._body, self.headers['Content-Type'])
+
+class _CachedRequest:
+    def __init__(self, owner, url, kwargs):
+        self.owner = owner
+        self.url = url
+        self.kwargs = kwargs
+
+    async def __aenter__(self):
+        cache = self.owner.cache
+        key = cache.make_key('GET', self.url, self.kwargs.get('params'))
+        entry = cache.get(key)
+        if entry is None and cache.replay:
+            raise ReplayMiss(self.url)
+        if entry is None:
+            async with self.owner.session.get(self.url, **self.kwargs) as response:
+                entry = CachedEntry(response.status, response.headers.get('Content-Type', ''), await response.read())
+            if entry.status == 200:
+                cache.put(key, self.url, entry.status, entry.content_type, entry.body)
+        return CachedResponse(entry)
+
+    async def __aexit__(self, *exc):
+        return False
+
+class CachedClientSession:
+    # aiohttp.ClientSession을 감싸서 get()만 캐시를 거치게 함
+    def __init__(self, session, cache):
+        self.session = session
+        self.cache = cache
+
+    def get(self, url, **kwargs):
+        return _CachedRequest(self, url, kwargs)
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+from ratios import to_number
+
+# 종목별 외국인/기관 수급 시계열
+# frgn.naver 한 페이지(약 20거래일)의 모든 날짜 행을 긴 형태 표로 모은 뒤,
+# 최근 N일 누적 순매매량을 종목별 누적합 차이로 한 번에 계산 (종목 단위 루프 없음)
+
+HISTORY_COLS = ['종목코드', '날짜', '종가', '기관 순매매량', '외국인 순매매량', '외국인 보유율(%)']
+NET_COLS = ['기관 순매매량', '외국인 순매매량']
+FLOW_WINDOWS = [5, 20]
+
+def flow_columns(windows=FLOW_WINDOWS):
+    return [f"{col.split()[0]} {w}일 누적" for w in windows for col in NET_COLS]
+
+def history_frame(results):
+    # results: [(종목코드, [(날짜, 종가, 기관, 외국인, 보유율), ...]), ...]
+    records = [(code,) + tuple(row) for code, rows in results for row in rows]
+    hist = pd.DataFrame(records, columns=HISTORY_COLS)
+    for col in HISTORY_COLS[2:]:
+        hist[col] = to_number(hist[col]).astype('float64')
+    hist['날짜'] = pd.to_datetime(hist['날짜'], format='%Y.%m.%d', errors='coerce')
+    hist = hist.dropna(subset=['날짜']).drop_duplicates(['종목코드', '날짜'])
+    return hist.sort_values(['종목코드', '날짜'], kind='stable').reset_index(drop=True)
+
+def add_rolling_flows(hist, windows=FLOW_WINDOWS):
+    # 종목별 누적합에서 N행 전 누적합을 빼서 최근 N거래일 합계를 구함. N일이 안 되는 구간은 결측
+    codes = hist['종목코드']
+    position = hist.groupby(codes, sort=False).cumcount().to_numpy()
+    for col in NET_COLS:
+        values = hist[col].fillna(0)
+        cumsum = values.groupby(codes, sort=False).cumsum()
+        for w in windows:
+            before = cumsum.groupby(codes, sort=False).shift(w).fillna(0)
+            hist[f"{col.split()[0]} {w}일 누적"] = np.where(position >= w - 1, cumsum - before, np.nan)
+    return hist
+
+def latest_flows(hist):
+    # 종목별 가장 최근 거래일 행 (당일 순매매량/보유율 + 누적 수급)
+    latest = hist.drop_duplicates('종목코드', keep='last')
+    return latest.drop(columns=['날짜', '종가']).reset_index(drop=True)
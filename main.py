@@ -1,274 +1,520 @@
-import requests
 import pandas as pd
-from bs4 import BeautifulSoup
-from io import StringIO
-from tqdm import tqdm
 import os
+import time
 from datetime import datetime, timedelta, timezone
-import asyncio
-import aiohttp
-import nest_asyncio
-import re
-import random
+from ratios import compute_ratios, affected_ratios, safe_ratio, to_number
+from investor_flows import flow_columns, NET_COLS
+from scoring import add_scores, parse_weights, SCORE_COLS, TOP_N
+import formatters
+import payload
+import dashboard_assets
+import json
+import html
+import argparse
+import metrics
 
-nest_asyncio.apply()
+# [수정] 수집에만 쓰는 모듈(requests, aiohttp, tqdm, nest_asyncio, lxml 파서, 응답 캐시, 파싱 프로세스 풀)은
+# 해당 함수 안에서 import. render 하위 명령은 스냅샷만 읽어서 바로 HTML을 만듦
+# 동시성 제어(throttle, asyncio, 스레드 풀), 열 스키마, 체크포인트, 참조 데이터 캐시, 수급 시계열 계산도 같은 방식.
+# investor_flows는 열 이름(NET_COLS, flow_columns)만 위에서 가져옴 (payload도 같은 모듈을 씀)
+
+# [추가] 로컬 대역 서버(bench/naver_server.py)로 돌릴 수 있도록 주소를 한 곳에서 관리 (--base-url)
+BASE_URL = "https://finance.naver.com"
+MARKET_SUM_URL = BASE_URL + "/sise/sise_market_sum.naver?sosok={}&page={}"
+INVESTOR_URL = BASE_URL + "/item/frgn.naver?code={}"
+
+def set_base_url(base_url):
+    global BASE_URL, MARKET_SUM_URL, INVESTOR_URL
+    BASE_URL = base_url.rstrip('/')
+    MARKET_SUM_URL = BASE_URL + "/sise/sise_market_sum.naver?sosok={}&page={}"
+    INVESTOR_URL = BASE_URL + "/item/frgn.naver?code={}"
 
 def set_naver_custom_fields(session, field_ids):
-    url = "https://finance.naver.com/sise/field_submit.naver"
-    params = [('menu', 'market_sum'), ('returnUrl', 'http://finance.naver.com/sise/sise_market_sum.naver')]
+    url = BASE_URL + "/sise/field_submit.naver"
+    params = [('menu', 'market_sum'), ('returnUrl', BASE_URL + '/sise/sise_market_sum.naver')]
     for fid in field_ids:
         params.append(('fieldIds', fid))
     session.get(url, params=params)
 
-def crawl_market_sum(session, desc_label):
-    base_url = "https://finance.naver.com/sise/sise_market_sum.naver?sosok={}&page={}"
-    result_df = pd.DataFrame()
-    
+MAX_MARKET_PAGES = 44
+MARKET_SUM_WORKERS = 8
+
+# [추가] 시가총액 페이지에서 받을 항목(fieldIds). 네이버는 한 번에 최대 6개까지만 선택되므로 그룹으로 나눠서 수집
+MAX_FIELDS_PER_GROUP = 6
+MARKET_FIELDS = ['sales', 'operating_profit', 'net_income', 'property_total', 'debt_total', 'dividend',
+                 'market_sum', 'per', 'pbr', 'quant', 'listed_stock_cnt']
+# 모든 그룹 페이지에 공통으로 나오는 종목 기본 정보 (병합할 때 첫 그룹 것만 사용)
+BASE_COLUMNS = ['종목명', '현재가', '전일비', '등락률', '시장']
+
+def parse_field_ids(text):
+    # argparse type: 쉼표 구분 fieldIds -> 중복 없는 목록. 비어 있으면 받을 항목 그룹이 없으므로 오류
+    fields = list(dict.fromkeys(f.strip() for f in text.split(',') if f.strip()))
+    if not fields:
+        raise argparse.ArgumentTypeError("받을 항목이 없습니다. 예: --fields sales,market_sum,per")
+    return fields
+
+def plan_field_groups(field_ids, max_fields=MAX_FIELDS_PER_GROUP):
+    # 중복을 빼고 필요한 최소 그룹 수로 고르게 나눔 (11개 -> 6 + 5, 13개 -> 5 + 5 + 3)
+    fields = list(dict.fromkeys(field_ids))
+    if not fields:
+        return []
+    n_groups = -(-len(fields) // max_fields)
+    size = -(-len(fields) // n_groups)
+    return [fields[i:i + size] for i in range(0, len(fields), size)]
+
+def fetch_market_sum_page(session, sosok, page, retries=3):
+    import random
+    from naver_parser import parse_market_sum
+    from throttle import RETRY_STATUS
+    for n in range(retries + 1):
+        start = time.perf_counter()
+        res = session.get(MARKET_SUM_URL.format(sosok, page))
+        metrics.observe('market_sum.request', time.perf_counter() - start)
+        metrics.count('market_sum.bytes', len(res.content))
+        # [추가] 429/5xx 응답 페이지가 빈 페이지로 조용히 빠지지 않도록 지터 백오프 후 재요청
+        if res.status_code not in RETRY_STATUS or n == retries:
+            break
+        metrics.count(f'market_sum.status.{res.status_code}')
+        metrics.count('market_sum.retries')
+        time.sleep(random.uniform(0, 0.5 * 2 ** n))
+
+    if res.status_code != 200:
+        return None, None
+
+    start = time.perf_counter()
+    result = parse_market_sum(res.text)
+    metrics.observe('market_sum.parse', time.perf_counter() - start)
+    return result
+
+def crawl_market_sum(session, desc_label, max_workers=MARKET_SUM_WORKERS, on_codes=None, checkpoint=None, group=None, drop_columns=None):
+    # on_codes: 페이지가 파싱될 때마다 그 페이지의 종목코드 목록으로 호출 (스트리밍 수급 수집용)
+    # drop_columns: 열 타입을 지정하기 전에 버릴 열 (두 번째 그룹부터는 첫 그룹과 겹치는 기본 열을 변환하지 않음)
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from tqdm import tqdm
+    from schema import apply_schema
+    frames = []
+
+    def fetch(sosok, page):
+        # [추가] 체크포인트에 저장된 페이지는 다시 요청하지 않고, 새로 받은 페이지는 바로 저장
+        if checkpoint:
+            cached = checkpoint.load_page(group, sosok, page)
+            if cached is not None:
+                metrics.count('checkpoint.market_sum_pages')
+                return cached
+        result = fetch_market_sum_page(session, sosok, page)
+        if checkpoint and result[0] is not None:
+            checkpoint.save_page(group, sosok, page, result)
+        return result
+
     for sosok in [0, 1]:
         market_name = 'KOSPI' if sosok == 0 else 'KOSDAQ'
-        for page in tqdm(range(1, 45), desc=f"{desc_label} - {market_name}"):
-            res = session.get(base_url.format(sosok, page))
-            soup = BeautifulSoup(res.text, 'html.parser')
-            table = soup.find('table', {'class': 'type_2'})
-            
-            if not table: continue
-            
-            try:
-                df = pd.read_html(StringIO(str(table)))[0]
-            except ValueError:
-                break
-                
-            df = df.dropna(subset=['종목명'])
-            links = table.find_all('a', class_='tltle')
-            codes = [link['href'].split('code=')[-1] for link in links]
-            
-            if len(codes) == len(df):
-                df['종목코드'] = codes
+
+        # [수정] 1페이지에서 마지막 페이지를 한 번만 확인한 뒤 나머지 페이지는 병렬로 요청
+        first_df, last_page = fetch(sosok, 1)
+        if on_codes and first_df is not None:
+            on_codes(first_df['종목코드'].tolist())
+        if last_page is None:
+            last_page = 1 if first_df is not None and len(first_df) < 10 else MAX_MARKET_PAGES
+        last_page = min(last_page, MAX_MARKET_PAGES)
+
+        pages = {1: first_df}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(fetch, sosok, page): page for page in range(2, last_page + 1)}
+            for future in tqdm(as_completed(futures), total=last_page, initial=1, desc=f"{desc_label} - {market_name}"):
+                pages[futures[future]] = future.result()[0]
+                if on_codes and pages[futures[future]] is not None:
+                    on_codes(pages[futures[future]]['종목코드'].tolist())
+
+        # 페이지 순서를 유지한 채 빈 페이지는 제외
+        for page in sorted(pages):
+            if pages[page] is not None:
+                # [추가] 스냅샷에서 시장별 조회가 가능하도록 시장 구분을 남김
+                frames.append(pages[page].assign(시장=market_name))
+
+    if not frames:
+        return apply_schema(pd.DataFrame(columns=['종목명', '종목코드']))
+
+    # [수정] 수집 직후 한 번만 열 타입을 지정 (정수/실수/범주형 + 종목코드 인덱스, 중복 종목 제거 포함)
+    df = pd.concat(frames, ignore_index=True)
+    if drop_columns:
+        df = df.drop(columns=drop_columns, errors='ignore')
+    return apply_schema(df)
+
+INVESTOR_HISTORY_PAGES = 1
+# [추가] 디스크 응답 캐시 (--cache / --replay 일 때만 사용)
+HTTP_CACHE = None
+# [추가] 수급 페이지 파싱 프로세스 수 (0이면 이벤트 루프 안에서 파싱, --parse-workers)
+PARSE_WORKERS = 0
+
+async def fetch_investor(session, code, limiter, pages=None, parse_pool=None):
+    from http_cache import ReplayMiss
+    from naver_parser import parse_investor_rows
+    from throttle import ThrottleError, EmptyPageError, PageParseError
+    # [수정] 무작위 대기 + 예외 무시 대신 적응형 동시성 제어기에서 재시도/헤지 처리
+    # [수정] 첫 행만 쓰지 않고 페이지의 모든 날짜 행을 반환. pages > 1 이면 &page=N 으로 과거 구간까지 채움
+    async def attempt(page):
+        url = INVESTOR_URL.format(code) + (f"&page={page}" if page > 1 else "")
+        queued = time.perf_counter()
+        async with limiter.slot():
+            # [추가] 동시성 제한 대기 / 요청 지연 / 다운로드 크기 / 파싱 시간을 따로 기록
+            metrics.observe('investor.queue_wait', time.perf_counter() - queued)
+            start = time.perf_counter()
+            async with session.get(url) as response:
+                if response.status != 200:
+                    metrics.count(f'investor.status.{response.status}')
+                    raise ThrottleError(response.status)
+                body = await response.read()
+                content_type = response.headers.get('Content-Type', '')
+                text = None if parse_pool else await response.text()
+            metrics.observe('investor.request', time.perf_counter() - start)
+        metrics.count('investor.bytes', len(body))
+
+        # [추가] 파싱 프로세스 풀이 있으면 응답 바이트만 넘기고 루프는 다음 요청을 처리
+        try:
+            if parse_pool:
+                rows = await parse_pool.parse(body, content_type)
             else:
-                continue
-                
-            df = df.drop(columns=['N', '토론실'], errors='ignore')
-            result_df = pd.concat([result_df, df], ignore_index=True)
-            if len(df) < 10: break
-            
-    return result_df.drop_duplicates(subset=['종목코드']).reset_index(drop=True)
+                start = time.perf_counter()
+                rows = parse_investor_rows(text)
+                metrics.observe('investor.parse', time.perf_counter() - start)
+        except Exception as e:
+            # 페이지 내용 문제는 재시도 대상이 아님 (파싱 프로세스가 죽은 경우는 ParsePool이 루프 안 파싱으로 처리)
+            raise PageParseError(f"{code}: {e}") from e
+        if not rows:
+            raise EmptyPageError(code)
+        return rows
 
-async def fetch_investor(session, code, sem):
-    async with sem:
-        url = f"https://finance.naver.com/item/frgn.naver?code={code}"
+    rows = []
+    for page in range(1, (pages or INVESTOR_HISTORY_PAGES) + 1):
         try:
-            await asyncio.sleep(random.uniform(0.1, 0.4))
-            
-            async with session.get(url, timeout=10) as response:
-                if response.status == 200:
-                    text = await response.text()
-                    soup = BeautifulSoup(text, 'html.parser')
-                    
-                    tables = soup.find_all('table', {'class': 'type2'})
-                    for table in tables:
-                        rows = table.find_all('tr')
-                        for row in rows:
-                            tds = row.find_all('td')
-                            if len(tds) >= 9:
-                                date_text = tds[0].text.strip()
-                                if len(date_text) == 10 and date_text.count('.') == 2:
-                                    inst_net = tds[5].text.strip()
-                                    fore_net = tds[6].text.strip()
-                                    fore_ratio = tds[8].text.strip()
-                                    return code, inst_net, fore_net, fore_ratio
-        except Exception:
-            pass
-    return code, '0', '0', '0.00'
-
-async def get_all_investors(codes):
+            rows.extend(await limiter.run(lambda: attempt(page)))
+        except ReplayMiss:
+            # 재생 캐시에 없는 페이지는 실패 종목으로 넘기지 않고 실행을 멈춤
+            raise
+        except Exception as e:
+            # 최종 실패 종목은 0이 아닌 결측값으로 남기고 별도로 기록 (과거 페이지 실패는 받은 데까지만 사용)
+            # [수정] 2페이지 이후의 빈 페이지는 실패가 아니라 과거 구간의 끝(상장 기간이 짧은 종목)이므로 세지 않음
+            if page == 1 or not isinstance(e, EmptyPageError):
+                metrics.count(f'investor.failed.{type(e).__name__}')
+            break
+    return code, rows
+
+def open_investor_session(limiter):
+    import aiohttp
+    connector = aiohttp.TCPConnector(limit=limiter.max_limit)
+    timeout = aiohttp.ClientTimeout(total=10)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, headers={'User-Agent': 'Mozilla/5.0'})
+
+async def stream_investors(code_queue, limiter=None, checkpoint=None, session=None, parse_pool=None):
+    # [추가] 큐에 들어오는 종목코드를 바로 수집 작업으로 띄우고, None이 들어오면 남은 작업을 마저 기다림
+    # session / parse_pool을 넘기면 호출한 쪽(장중 갱신)이 계속 재사용하고, 없으면 여기서 만들고 닫음
+    import asyncio
+    from tqdm import tqdm
+    from http_cache import CachedClientSession
+    from parse_pool import ParsePool
+    from throttle import AdaptiveLimiter
     print("\n[비동기] 기관/외국인 수급 및 보유율 데이터를 수집합니다... (약 1~2분 소요)")
-    results = []
-    sem = asyncio.Semaphore(15)
+    limiter = limiter or AdaptiveLimiter()
     
-    connector = aiohttp.TCPConnector(limit=15)
-    async with aiohttp.ClientSession(connector=connector, headers={'User-Agent': 'Mozilla/5.0'}) as session:
-        tasks = [fetch_investor(session, code, sem) for code in codes]
-        for task in tqdm(asyncio.as_completed(tasks), total=len(codes), desc="수급 수집"):
-            res = await task
-            results.append(res)
-    return results
-
-def get_full_market_data():
-    session = requests.Session()
+    own_session, own_pool = session is None, parse_pool is None and PARSE_WORKERS > 0
+    if own_session:
+        session = open_investor_session(limiter)
+    if own_pool:
+        parse_pool = ParsePool(PARSE_WORKERS)
+    client = CachedClientSession(session, HTTP_CACHE) if HTTP_CACHE else session
+    tasks = []
+    try:
+        async def fetch(code):
+            result = await fetch_investor(client, code, limiter, parse_pool=parse_pool)
+            if checkpoint and result[1]:
+                checkpoint.save_investor(*result)
+            return result
+
+        # [추가] 체크포인트에 이미 받은 종목은 요청하지 않고 저장된 결과를 사용
+        saved = checkpoint.investors() if checkpoint else {}
+        seen, resumed = set(), []
+        progress = tqdm(total=0, desc="수급 수집")
+        while True:
+            code = await code_queue.get()
+            if code is None:
+                break
+            if code in seen:
+                continue
+            seen.add(code)
+            progress.total += 1
+            if code in saved:
+                resumed.append((code, saved[code]))
+                progress.update()
+                continue
+            task = asyncio.ensure_future(fetch(code))
+            task.add_done_callback(lambda _: progress.update())
+            tasks.append(task)
+        results = resumed + list(await asyncio.gather(*tasks))
+        progress.close()
+    except BaseException:
+        # [수정] 취소되거나(시가총액 수집 실패) 한 종목이 실행을 멈추는 예외를 내면 남은 종목 작업도 취소하고
+        # 끝날 때까지 기다린 뒤 세션을 닫음 (대기 중인 작업이 닫힌 세션으로 요청하거나 루프에 남지 않게 함)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        if own_pool:
+            parse_pool.close()
+        if own_session:
+            await session.close()
+    if resumed:
+        metrics.count('checkpoint.investors', len(resumed))
+        print(f"[체크포인트] 수급 {len(resumed)}개 종목은 저장된 결과를 사용했습니다.")
+
+    failed = [code for code, rows in results if not rows]
+    stats = limiter.stats
+    metrics.record('investor_limiter', dict(stats, final_limit=round(limiter.limit, 2), failed_codes=failed))
+    print(f"수급 수집 통계: 요청 {stats['requests']}회, 재시도 {stats['retries']}회, 헤지 {stats['hedges']}회, "
+          f"429 {stats['throttled']}회, 최대 동시성 {stats['peak_limit']:.0f}, 최종 실패 {len(failed)}개")
+    if failed:
+        print(f"※ 수급 수집 실패 종목: {', '.join(failed[:20])}{' ...' if len(failed) > 20 else ''}")
+    return results, failed
+
+async def get_all_investors(codes, limiter=None, checkpoint=None, session=None, parse_pool=None):
+    import asyncio
+    code_queue = asyncio.Queue()
+    for code in list(codes) + [None]:
+        code_queue.put_nowait(code)
+    return await stream_investors(code_queue, limiter, checkpoint, session=session, parse_pool=parse_pool)
+
+def new_market_session():
+    import requests
+    from http_cache import CachedSession
+    session = CachedSession(HTTP_CACHE) if HTTP_CACHE else requests.Session()
     session.headers.update({'User-Agent': 'Mozilla/5.0'})
-    
-    group1 = ['sales', 'operating_profit', 'net_income', 'property_total', 'debt_total', 'dividend']
-    set_naver_custom_fields(session, group1)
-    df1 = crawl_market_sum(session, "1차 데이터 수집")
-    
-    # [수정] 2차 수집 파라미터에 'listed_stock_cnt'(상장주식수) 복구
-    group2 = ['market_sum', 'per', 'pbr', 'quant', 'listed_stock_cnt']
-    set_naver_custom_fields(session, group2)
-    df2 = crawl_market_sum(session, "2차 데이터 수집")
-    
-    common_cols = ['종목코드', '종목명']
-    merged_df = pd.merge(df1, df2.drop(columns=['현재가', '전일비', '등락률'], errors='ignore'), on=common_cols, how='left')
-    
+    # [추가] 페이지 병렬 요청 수만큼 커넥션 풀 크기를 맞춤
+    adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=MARKET_SUM_WORKERS)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def crawl_field_group(n, fields, on_codes=None, checkpoint=None):
+    import hashlib
+    # 항목 선택은 세션 쿠키에 저장되므로 그룹마다 세션을 따로 만들어 서로 섞이지 않게 함
+    session = new_market_session()
+    # 체크포인트 이름에 항목 구성을 넣어서 항목을 바꾼 재실행이 다른 그룹의 페이지를 이어 받지 않게 함
+    group = f"group{n}-" + hashlib.md5(','.join(fields).encode()).hexdigest()[:8]
+    with metrics.stage(f'market_sum.group{n}'):
+        set_naver_custom_fields(session, fields)
+        return crawl_market_sum(session, f"{n}차 데이터 수집", on_codes=on_codes, checkpoint=checkpoint, group=group,
+                                drop_columns=BASE_COLUMNS if n > 1 else None)
+
+def crawl_market_groups(on_codes=None, checkpoint=None, field_ids=None):
+    # [수정] 같은 세션으로 그룹을 하나씩 차례로 받던 방식에서, 그룹별 독립 세션으로 동시에 수집
+    from concurrent.futures import ThreadPoolExecutor
+    groups = plan_field_groups(field_ids or MARKET_FIELDS)
+    with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+        futures = [executor.submit(crawl_field_group, n, fields, on_codes, checkpoint) for n, fields in enumerate(groups, 1)]
+        return [future.result() for future in futures]
+
+def join_field_groups(frames):
+    # 첫 그룹을 기준으로 나머지 그룹의 항목 열만 종목코드 인덱스로 붙임
+    merged_df = frames[0]
+    for df in frames[1:]:
+        merged_df = merged_df.join(df.drop(columns=BASE_COLUMNS, errors='ignore'), how='left')
+    return merged_df
+
+async def crawl_streaming(checkpoint=None):
+    # [추가] 시가총액 크롤링(스레드)과 수급 수집(이벤트 루프)을 겹쳐서 실행
+    # 1차 수집 페이지가 파싱되는 대로 종목코드를 큐에 넣고, 수급 작업은 큐에서 바로 꺼내 시작
+    import asyncio
+    loop = asyncio.get_running_loop()
+    code_queue = asyncio.Queue()
+
+    def push_codes(codes):
+        for code in codes:
+            loop.call_soon_threadsafe(code_queue.put_nowait, code)
+
+    def crawl():
+        try:
+            return crawl_market_groups(on_codes=push_codes, checkpoint=checkpoint)
+        finally:
+            loop.call_soon_threadsafe(code_queue.put_nowait, None)
+
+    investors = asyncio.ensure_future(stream_investors(code_queue, checkpoint=checkpoint))
+    try:
+        frames = await loop.run_in_executor(None, crawl)
+    except BaseException:
+        # [수정] 수급 작업을 취소만 하지 않고 정리가 끝날 때까지 기다림 (종목별 작업까지 모두 끝난 뒤 예외 전달)
+        investors.cancel()
+        await asyncio.gather(investors, return_exceptions=True)
+        raise
+    investor_data, failed_codes = await investors
+    return frames, investor_data, failed_codes
+
+def get_full_market_data(stream=True, checkpoint=None):
+    import asyncio
+    import nest_asyncio
+    from investor_flows import history_frame, add_rolling_flows, latest_flows
+    from schema import apply_schema, RATIO_DTYPE
+    nest_asyncio.apply()
     loop = asyncio.get_event_loop()
-    investor_data = loop.run_until_complete(get_all_investors(merged_df['종목코드'].tolist()))
-    inv_df = pd.DataFrame(investor_data, columns=['종목코드', '기관 순매매량', '외국인 순매매량', '외국인 보유율(%)'])
-    merged_df = pd.merge(merged_df, inv_df, on='종목코드', how='left')
+    if stream:
+        with metrics.stage('market_sum+investors'):
+            frames, investor_data, failed_codes = loop.run_until_complete(crawl_streaming(checkpoint))
+    else:
+        frames = crawl_market_groups(checkpoint=checkpoint)
+
+    # [수정] 항목 그룹별 결과를 종목코드 인덱스 기준으로 join
+    merged_df = join_field_groups(frames)
+    # [추가] 시가총액 페이지를 하나도 못 받았으면(재시도 후에도 429/503 등) 0개 종목으로 스냅샷/대시보드를 덮어쓰지 않고 중단
+    if merged_df.empty:
+        metrics.count('market_sum.empty')
+        raise SystemExit("[오류] 시가총액 페이지에서 종목을 하나도 받지 못했습니다. 스냅샷과 대시보드를 덮어쓰지 않고 종료합니다.")
+    
+    if not stream:
+        with metrics.stage('investors'):
+            investor_data, failed_codes = loop.run_until_complete(get_all_investors(merged_df.index.tolist(), checkpoint=checkpoint))
+    # [수정] 종목별 일자 시계열로 모은 뒤 5일/20일 누적 수급을 계산하고, 최근 거래일 값만 표에 병합
+    with metrics.stage('investor_flows'):
+        history_df = add_rolling_flows(history_frame(investor_data))
+        merged_df = merged_df.join(apply_schema(latest_flows(history_df)), how='left')
+    merged_df.attrs['investor_failed'] = failed_codes
+    # [추가] 나중에 스냅샷에서 다시 렌더링해도 수집 시각이 표시되도록 남김
+    merged_df.attrs['updated_at'] = datetime.now(timezone(timedelta(hours=9))).strftime("%Y-%m-%d %H:%M")
     
     print("\n수집된 데이터를 바탕으로 재무비율을 계산합니다...")
     
-    div_col = next((c for c in merged_df.columns if '배당금' in c), None)
-    if div_col:
-        merged_df = merged_df.rename(columns={div_col: '보통주배당금(원)'})
-        merged_df['보통주배당금_num'] = pd.to_numeric(merged_df['보통주배당금(원)'].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
-        
-        if '현재가' in merged_df.columns:
-            merged_df['현재가_num'] = pd.to_numeric(merged_df['현재가'].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
-            merged_df['배당수익률'] = merged_df.apply(
-                lambda x: (x['보통주배당금_num'] / x['현재가_num'] * 100) if x['현재가_num'] > 0 else 0, axis=1
-            )
+    with metrics.stage('ratios'):
+        div_col = next((c for c in merged_df.columns if '배당금' in c), None)
+        if div_col:
+            merged_df = merged_df.rename(columns={div_col: '보통주배당금(원)'})
         else:
-            merged_df['배당수익률'] = 0
-    else:
-        merged_df['보통주배당금(원)'] = 0
-        merged_df['배당수익률'] = 0
-
-    if '매출액' in merged_df.columns and '영업이익' in merged_df.columns:
-        merged_df['매출액_num'] = pd.to_numeric(merged_df['매출액'].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
-        merged_df['영업이익_num'] = pd.to_numeric(merged_df['영업이익'].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
-        merged_df['영업이익률(%)'] = merged_df.apply(
-            lambda x: (x['영업이익_num'] / x['매출액_num'] * 100) if x['매출액_num'] > 0 else 0, axis=1
-        )
-    else:
-        merged_df['영업이익률(%)'] = 0
+            merged_df['보통주배당금(원)'] = pd.array([0] * len(merged_df), dtype='Int64')
 
-    asset_col = next((c for c in merged_df.columns if '자산총계' in c), None)
-    debt_col = next((c for c in merged_df.columns if '부채총계' in c), None)
-    
-    if asset_col and debt_col:
-        merged_df['자산_num'] = pd.to_numeric(merged_df[asset_col].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
-        merged_df['부채_num'] = pd.to_numeric(merged_df[debt_col].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
-        merged_df['자본_num'] = merged_df['자산_num'] - merged_df['부채_num']
-        
-        merged_df['부채비율'] = merged_df.apply(
-            lambda x: (x['부채_num'] / x['자본_num'] * 100) if x['자본_num'] > 0 else 0, axis=1
-        )
-    else:
-        merged_df['부채비율'] = 0
+        # [수정] 행 단위 apply 대신 비율 엔진에서 한 번에 벡터 연산
+        merged_df = compute_ratios(merged_df, dtype=RATIO_DTYPE)
 
-    return merged_df
+    return merged_df, history_df
+
+def treasury_table(csv_df):
+    from schema import code_index, RATIO_DTYPE
+    ratio = safe_ratio(to_number(csv_df['자기주식수(D)']).fillna(0), to_number(csv_df['총발행주식수(C)']).fillna(0))
+    table = pd.DataFrame({'자사주 비율(%)': ratio.astype(RATIO_DTYPE)}, index=code_index(csv_df['종목코드']))
+    return table[~table.index.duplicated()]
 
 def merge_treasury_stock(df, csv_path='data.csv'):
+    # 이미 병합된 스냅샷에 다시 적용해도 되도록 기존 열은 버리고, join이 넘기지 않는 attrs(수집 시각 등)는 유지
+    from reference_data import load_reference
+    from schema import RATIO_DTYPE
+    attrs = dict(df.attrs)
+    df = df.drop(columns=['자사주 비율(%)'], errors='ignore')
     if os.path.exists(csv_path):
         print(f"[{csv_path}] 파일을 읽어 자사주 비율을 병합합니다.")
-        try:
-            csv_df = pd.read_csv(csv_path, encoding='cp949')
-        except UnicodeDecodeError:
-            try:
-                csv_df = pd.read_csv(csv_path, encoding='euc-kr')
-            except UnicodeDecodeError:
-                csv_df = pd.read_csv(csv_path, encoding='utf-8')
-        
-        csv_df['종목코드'] = csv_df['종목코드'].astype(str).str.zfill(6)
-        csv_df['자기주식수(D)'] = pd.to_numeric(csv_df['자기주식수(D)'].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
-        csv_df['총발행주식수(C)'] = pd.to_numeric(csv_df['총발행주식수(C)'].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
-        
-        csv_df['자사주 비율(%)'] = csv_df.apply(
-            lambda x: (x['자기주식수(D)'] / x['총발행주식수(C)'] * 100) if x['총발행주식수(C)'] > 0 else 0, axis=1
-        )
-        df = pd.merge(df, csv_df[['종목코드', '자사주 비율(%)']], on='종목코드', how='left')
+        # [수정] 매번 CSV를 다시 해석하지 않고, 파일이 바뀐 경우에만 변환해 둔 캐시를 사용
+        treasury = load_reference(csv_path, treasury_table, name='treasury', dtype={'종목코드': str})
+        df = df.join(treasury['자사주 비율(%)'], how='left')
     else:
         print(f"\n※ 경고: {csv_path} 파일을 찾을 수 없어 자사주 비율이 빈값으로 처리됩니다.")
-        df['자사주 비율(%)'] = None
+        metrics.count('treasury.missing_csv')
+        df['자사주 비율(%)'] = pd.Series(float('nan'), index=df.index, dtype=RATIO_DTYPE)
         
+    df.attrs.update(attrs)
     return df
 
-def process_and_save_html(df, filename="index.html", name_max_width=90):
+# [수정] 정수형 포맷에 상장주식수 추가
+DISPLAY_INT_COLS = ['현재가', '보통주배당금(원)', '시가총액', '매출액', '영업이익', '당기순이익', '거래량', '상장주식수(천주)', '시장 내 순위']
+DISPLAY_FLOAT_COLS = ['영업이익률(%)', '부채비율', '외국인 보유율(%)', 'PER', 'PBR', '배당수익률', '자사주 비율(%)', '종합점수', '종합 백분위']
+
+# [추가] 시장별 팩터 점수 (종합점수/종합 백분위/시장 내 순위). None이면 scoring.DEFAULT_WEIGHTS
+SCORE_WEIGHTS = None
+SCORE_TOP_N = TOP_N
+SCORE_DETAILS = False
+SCORE_ENABLED = True
+
+def score_market(df):
+    if not SCORE_ENABLED:
+        return df
+    with metrics.stage('scoring'):
+        return add_scores(df, SCORE_WEIGHTS, SCORE_TOP_N, details=SCORE_DETAILS)
+
+def score_columns(df):
+    # 점수 단계가 붙인 열 (종합점수/종합 백분위/시장 내 순위 + --score-details 팩터별 백분위)
+    return [c for c in df.columns if c in SCORE_COLS or c.endswith(' 백분위')]
+
+def process_and_save_html(df, filename="index.html", name_max_width=90, output="table", data_file=None, delta_url=None):
     print(f"모바일 앱 형태의 HTML 대시보드를 '{filename}'으로 생성 중입니다...")
     
     KST = timezone(timedelta(hours=9))
-    update_time_str = datetime.now(KST).strftime("%Y-%m-%d %H:%M")
+    update_time_str = df.attrs.get('updated_at') or datetime.now(KST).strftime("%Y-%m-%d %H:%M")
     
+    if df.index.name == '종목코드':
+        df = df.reset_index()
+
     # [수정] 컬럼명 정리 및 리스트에 '상장주식수(천주)' 추가
     if '상장주식수' in df.columns:
         df = df.rename(columns={'상장주식수': '상장주식수(천주)'})
         
     cols = ['종목명', '종목코드', '현재가', '전일비', '등락률', '기관 순매매량', '외국인 순매매량', '외국인 보유율(%)', 
-            '시가총액', '매출액', '영업이익', '영업이익률(%)', '당기순이익', '부채비율', 'PER', 'PBR', '보통주배당금(원)', '배당수익률', '거래량', '상장주식수(천주)', '자사주 비율(%)']
+            '시가총액', '매출액', '영업이익', '영업이익률(%)', '당기순이익', '부채비율', 'PER', 'PBR', '보통주배당금(원)', '배당수익률', '거래량', '상장주식수(천주)', '자사주 비율(%)'] + flow_columns() + SCORE_COLS
+    # [추가] 팩터별 백분위(--score-details)는 맨 뒤에 붙여서 기존 열 번호(구간 필터)를 유지
+    detail_cols = [c for c in df.columns if c.endswith(' 백분위') and c not in cols]
     
-    df = df[[c for c in cols if c in df.columns]]
+    df = df[[c for c in cols + detail_cols if c in df.columns]]
     
-    def format_diff(row):
-        try:
-            raw_diff = str(row['전일비']).replace(',', '').replace('+', '').replace('-', '').strip()
-            raw_diff = re.sub(r'[^\d]', '', raw_diff) 
-            if not raw_diff: return str(row['전일비'])
-            
-            diff_val = int(raw_diff)
-            if diff_val == 0: return '0'
-            
-            rate = float(str(row['등락률']).replace('%', '').replace(',', '').strip())
-            
-            if rate > 0:
-                return f'<span style="color: #ff4d4d;">▲ {diff_val:,}</span>'
-            elif rate < 0:
-                return f'<span style="color: #4da6ff;">▼ {diff_val:,}</span>'
-            else:
-                return f'{diff_val:,}'
-        except:
-            return str(row['전일비'])
+    int_cols, float_cols = DISPLAY_INT_COLS, DISPLAY_FLOAT_COLS + detail_cols
 
-    def format_rate(row):
-        try:
-            rate = float(str(row['등락률']).replace('%', '').replace(',', '').strip())
-            if rate > 0:
-                return f'<span style="color: #ff4d4d;">+{rate:.2f}%</span>'
-            elif rate < 0:
-                return f'<span style="color: #4da6ff;">{rate:.2f}%</span>'
-            else:
-                return f'{rate:.2f}%'
-        except:
-            return str(row['등락률'])
+    if output == 'json':
+        # [추가] 셀 마크업 대신 열 단위 원시 데이터를 넣고 브라우저에서 보이는 행만 렌더링(deferRender)
+        # 종목코드는 링크 생성용 숨김 열로 맨 뒤에 둬서 기존 열 번호(정렬/필터)를 유지
+        df = df[[c for c in df.columns if c != '종목코드'] + (['종목코드'] if '종목코드' in df.columns else [])]
+        table_payload = payload.build_payload(df, int_cols, float_cols)
+        data_json = payload.dumps(table_payload)
 
-    def format_net_buy(val):
-        try:
-            num = int(float(str(val).replace(',', '').replace('+', '').strip()))
-            if num > 0:
-                return f'<span style="color: #ff4d4d;">+{num:,}</span>'
-            elif num < 0:
-                return f'<span style="color: #4da6ff;">{num:,}</span>'
-            else:
-                return '0'
-        except:
-            return str(val)
+        header_cells = ''.join(f'<th>{html.escape(c)}</th>' for c in df.columns)
+        html_table = f'<table border="1" class="dataframe table table-dark table-striped table-hover align-middle nowrap" id="stockTable"><thead><tr>{header_cells}</tr></thead></table>'
 
-    df['전일비'] = df.apply(format_diff, axis=1)
-    df['등락률'] = df.apply(format_rate, axis=1)
-    
-    for col in ['기관 순매매량', '외국인 순매매량']:
-        if col in df.columns:
-            df[col] = df[col].apply(format_net_buy)
-
-    # [수정] 정수형 포맷에 상장주식수 추가
-    int_cols = ['현재가', '보통주배당금(원)', '시가총액', '매출액', '영업이익', '당기순이익', '거래량', '상장주식수(천주)']
-    for col in int_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', ''), errors='coerce').fillna(0).astype(int)
-            df[col] = df[col].apply(lambda x: f"{x:,}" if x != 0 else '-')
-            
-    float_cols = ['영업이익률(%)', '부채비율', '외국인 보유율(%)', 'PER', 'PBR', '배당수익률', '자사주 비율(%)']
-    for col in float_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col].astype(str).str.replace('%', '').str.replace(',', ''), errors='coerce')
-            df[col] = df[col].apply(lambda x: f"{x:.2f}" if pd.notna(x) else '-')
+        if data_file:
+            data_path = os.path.join(os.path.dirname(os.path.abspath(filename)), data_file)
+            with open(data_path, "w", encoding="utf-8") as f:
+                f.write(data_json)
+            data_url = json.dumps(data_file)
+            data_script = ''
+        else:
+            data_url = 'null'
+            data_script = f'<script id="stockData" type="application/json">{data_json}</script>'
 
-    if '종목명' in df.columns and '종목코드' in df.columns:
-        df['종목명'] = df.apply(
-            lambda row: f'<a href="https://finance.naver.com/item/main.naver?code={row["종목코드"]}" target="_blank" class="text-info text-decoration-none fw-bold" style="display: inline-block; max-width: {name_max_width}px; overflow: hidden; text-overflow: ellipsis; white-space: nowrap; vertical-align: middle;">{row["종목명"]}</a>', axis=1
-        )
+        # [수정] 필터/정렬은 빌드 시 만든 숫자 타입 배열 + 정렬 순열로 Web Worker에서 처리
+        order_col = df.columns.get_loc('시가총액') if '시가총액' in df.columns else 0
+        page_script = (dashboard_assets.JSON_PAGE_SCRIPT
+                       .replace('__KINDS__', json.dumps(table_payload['kinds']))
+                       .replace('__ORDER_COL__', str(order_col))
+                       .replace('__NAME_MAX_WIDTH__', str(name_max_width))
+                       .replace('__DATA_URL__', data_url)
+                       .replace('__DELTA_URL__', json.dumps(delta_url))
+                       .replace('__DELTA_BASE__', json.dumps(update_time_str)))
+    else:
+        # [수정] 행 단위 콜백 대신 열 단위 벡터 포맷터 사용 (출력 결과는 기존과 동일)
+        df['전일비'] = formatters.format_diff(df['전일비'], df['등락률'])
+        df['등락률'] = formatters.format_rate(df['등락률'])
+        
+        for col in ['기관 순매매량', '외국인 순매매량'] + flow_columns():
+            if col in df.columns:
+                df[col] = formatters.format_net_buy(df[col])
+
+        for col in int_cols:
+            if col in df.columns:
+                df[col] = formatters.format_int(df[col])
+                
+        for col in float_cols:
+            if col in df.columns:
+                df[col] = formatters.format_float(df[col])
+
+        if '종목명' in df.columns and '종목코드' in df.columns:
+            df['종목명'] = formatters.name_links(df['종목명'], df['종목코드'], name_max_width)
 
-    df = df.drop(columns=['종목코드'], errors='ignore')
+        df = df.drop(columns=['종목코드'], errors='ignore')
+
+        html_table = df.to_html(classes='table table-dark table-striped table-hover align-middle nowrap', table_id='stockTable', index=False, escape=False)
+        data_script = ''
+        page_script = dashboard_assets.TABLE_PAGE_SCRIPT
 
-    html_table = df.to_html(classes='table table-dark table-striped table-hover align-middle nowrap', table_id='stockTable', index=False, escape=False)
     td_max_width = name_max_width + 5
 
     html_template = f"""
@@ -292,6 +538,7 @@ def process_and_save_html(df, filename="index.html", name_max_width=90):
         <link href="https://cdn.datatables.net/1.13.6/css/dataTables.bootstrap5.min.css" rel="stylesheet">
         <link href="https://cdn.datatables.net/fixedheader/3.4.0/css/fixedHeader.bootstrap5.min.css" rel="stylesheet">
         <link href="https://cdn.datatables.net/fixedcolumns/4.3.0/css/fixedColumns.bootstrap5.min.css" rel="stylesheet">
+        <link href="https://cdn.datatables.net/scroller/2.2.0/css/scroller.bootstrap5.min.css" rel="stylesheet">
         
         <style>
             body {{ padding: 15px; background-color: #121212; font-size: 0.85rem; }}
@@ -438,152 +685,17 @@ def process_and_save_html(df, filename="index.html", name_max_width=90):
             
             {html_table}
         </div>
+        {data_script}
 
         <script src="https://code.jquery.com/jquery-3.7.0.min.js"></script>
         <script src="https://cdn.datatables.net/1.13.6/js/jquery.dataTables.min.js"></script>
         <script src="https://cdn.datatables.net/1.13.6/js/dataTables.bootstrap5.min.js"></script>
         <script src="https://cdn.datatables.net/fixedheader/3.4.0/js/dataTables.fixedHeader.min.js"></script>
         <script src="https://cdn.datatables.net/fixedcolumns/4.3.0/js/dataTables.fixedColumns.min.js"></script>
+        <script src="https://cdn.datatables.net/scroller/2.2.0/js/dataTables.scroller.min.js"></script>
 
         <script>
-            $(document).ready( function () {{
-                $.fn.dataTable.ext.search.push(
-                    function( settings, data, dataIndex ) {{
-                        function parseVal(val) {{
-                            if (!val || val === '-' || val === 'N/A') return null;
-                            var tmp = document.createElement("DIV");
-                            tmp.innerHTML = val;
-                            var text = tmp.textContent || tmp.innerText || "";
-                            text = text.replace(/,/g, '').replace(/%/g, '').replace(/▲/g, '').replace(/▼/g, '').replace(/\+/g, '').trim();
-                            var num = parseFloat(text);
-                            return isNaN(num) ? null : num;
-                        }}
-
-                        // [수정됨] 상장주식수가 다시 추가되면서 자사주 비율 인덱스가 19번으로 변경됨
-                        var filters = [
-                            {{ col: 1,  minId: '#min_col_1',  maxId: '#max_col_1' }},   // 현재가
-                            {{ col: 7,  minId: '#min_col_7',  maxId: '#max_col_7' }},   // 시가총액
-                            {{ col: 9,  minId: '#min_col_9',  maxId: '#max_col_9' }},   // 영업이익
-                            {{ col: 10, minId: '#min_col_10', maxId: '#max_col_10' }},  // 영업이익률(%)
-                            {{ col: 13, minId: '#min_col_13', maxId: '#max_col_13' }},  // PER
-                            {{ col: 14, minId: '#min_col_14', maxId: '#max_col_14' }},  // PBR
-                            {{ col: 12, minId: '#min_col_12', maxId: '#max_col_12' }},  // 부채비율
-                            {{ col: 16, minId: '#min_col_16', maxId: '#max_col_16' }},  // 배당수익률
-                            {{ col: 6,  minId: '#min_col_6',  maxId: '#max_col_6' }},   // 외국인 보유율
-                            {{ col: 19, minId: '#min_col_19', maxId: '#max_col_19' }}   // 자사주 비율 (수정)
-                        ];
-
-                        for (var i = 0; i < filters.length; i++) {{
-                            var f = filters[i];
-                            var minStr = $(f.minId).val();
-                            var maxStr = $(f.maxId).val();
-                            
-                            if (minStr !== "" || maxStr !== "") {{
-                                var cellVal = parseVal(data[f.col]);
-                                
-                                if (cellVal === null) return false; 
-                                
-                                if (minStr !== "" && cellVal < parseFloat(minStr)) return false;
-                                if (maxStr !== "" && cellVal > parseFloat(maxStr)) return false;
-                            }}
-                        }}
-                        return true; 
-                    }}
-                );
-
-                var table = $('#stockTable').DataTable({{
-                    "dom": 'rti', 
-                    "paging": false,
-                    "scrollY": "60vh",
-                    "scrollX": true,
-                    "scrollCollapse": true,
-                    "fixedHeader": true,
-                    "fixedColumns": {{
-                        "leftColumns": 1
-                    }},
-                    "searching": true, 
-                    "ordering": true,
-                    "order": [[ 7, "desc" ]], 
-                    "language": {{ 
-                        "url": "//cdn.datatables.net/plug-ins/1.13.6/i18n/ko.json",
-                        "info": "총 _TOTAL_개 종목",
-                        "infoFiltered": "(전체 _MAX_개 중 필터링됨)",
-                        "infoEmpty": "조건에 맞는 검색 결과가 없습니다."
-                    }}
-                }});
-
-                function performSearch() {{
-                    var keyword = $('#customSearchInput').val();
-                    var $btn = $('#customSearchBtn');
-                    var $spinner = $('#searchSpinner');
-                    var $text = $('#searchText');
-
-                    $btn.prop('disabled', true);
-                    $spinner.removeClass('d-none');
-                    $text.text(' 중...');
-
-                    setTimeout(function() {{
-                        table.search(keyword).draw();
-                        $btn.prop('disabled', false);
-                        $spinner.addClass('d-none');
-                        $text.text('🔍 검색');
-                    }}, 150);
-                }}
-
-                $('#customSearchBtn').on('click', performSearch);
-                $('#customSearchInput').on('keypress', function(e) {{
-                    if (e.which == 13 || e.keyCode == 13) {{ performSearch(); }}
-                }});
-
-                $('#toggleFilterBtn').on('click', function() {{
-                    $('#filterPanel').slideToggle('fast');
-                }});
-
-                $('#applyRangeBtn').on('click', function() {{
-                    var $btn = $(this);
-                    var $spinner = $('#rangeSpinner');
-                    var $text = $('#rangeText');
-
-                    $btn.prop('disabled', true);
-                    $spinner.removeClass('d-none');
-                    $text.text(' 적용중');
-
-                    setTimeout(function() {{
-                        table.draw(); 
-                        $btn.prop('disabled', false);
-                        $spinner.addClass('d-none');
-                        $text.text('적용하기');
-                        $('#filterPanel').slideUp('fast'); 
-                    }}, 150);
-                }});
-
-                $('#clearRangeBtn').on('click', function() {{
-                    $('#filterPanel input').val('');
-                    table.draw();
-                }});
-
-                $('#resetBtn').on('click', function() {{
-                    var $btn = $(this);
-                    var $spinner = $('#resetSpinner');
-                    var $text = $('#resetText');
-
-                    $btn.prop('disabled', true);
-                    $spinner.removeClass('d-none');
-                    $text.text(' 복구중');
-
-                    setTimeout(function() {{
-                        $('#customSearchInput').val('');
-                        $('#filterPanel input').val(''); 
-                        table.search('').columns().search('');
-                        table.order([[ 7, "desc" ]]);
-                        table.draw();
-
-                        $btn.prop('disabled', false);
-                        $spinner.addClass('d-none');
-                        $text.text('🔄 초기화');
-                    }}, 150);
-                }});
-            }});
+{page_script}
         </script>
     </body>
     </html>
@@ -591,9 +703,337 @@ def process_and_save_html(df, filename="index.html", name_max_width=90):
     
     with open(filename, "w", encoding="utf-8") as f:
         f.write(html_template)
+    metrics.count('render.bytes', len(html_template.encode('utf-8')))
     print(f"\n[성공] 최종 통합 대시보드가 '{filename}' 이름으로 생성되었습니다. (업데이트 시간: {update_time_str})")
 
+# [추가] 하위 명령(crawl -> merge-treasury -> render)끼리 주고받는 작업 스냅샷
+# 열 타입(Int64/float32/category)과 종목코드 인덱스, attrs를 그대로 보존하도록 Parquet으로 저장
+WORK_SNAPSHOT = os.path.join('work', 'market.parquet')
+
+def history_path(path):
+    return os.path.splitext(path)[0] + '.history.parquet'
+
+def save_frame(df, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    df.to_parquet(path + '.tmp')
+    os.replace(path + '.tmp', path)
+    return path
+
+def load_frame(path):
+    if not os.path.exists(path):
+        raise SystemExit(f"[오류] 스냅샷 '{path}'이 없습니다. 먼저 crawl 명령(또는 전체 실행)으로 수집하세요.")
+    return pd.read_parquet(path)
+
+def open_checkpoint(run_date, fresh=False):
+    # [추가] 실행일 단위 체크포인트: 중간에 끊긴 뒤 다시 실행하면 받은 페이지/종목은 건너뜀
+    from checkpoint import CheckpointStore
+    checkpoint = CheckpointStore(run_date)
+    checkpoint.prune()
+    if fresh:
+        checkpoint.clear()
+    return checkpoint
+
+def run_crawl(run_date, snapshot=WORK_SNAPSHOT, stream=True, fresh=False):
+    checkpoint = open_checkpoint(run_date, fresh)
+    df, history_df = get_full_market_data(stream=stream, checkpoint=checkpoint)
+    # [추가] render/refresh/alerts는 작업 스냅샷을 그대로 읽으므로 0개 종목 결과는 저장하지 않고 실패로 끝냄
+    if df.empty:
+        raise SystemExit(f"[오류] 수집 결과가 0개 종목이라 작업 스냅샷 '{snapshot}'을 저장하지 않습니다.")
+    with metrics.stage('work_snapshot'):
+        save_frame(df, snapshot)
+        save_frame(history_df, history_path(snapshot))
+    print(f"[스냅샷] 수집 결과 {len(df)}개 종목을 '{snapshot}'에 저장했습니다.")
+    metrics.record('rows', len(df))
+    checkpoint.remove()
+
+def run_merge_treasury(snapshot=WORK_SNAPSHOT, csv_path='data.csv'):
+    df = load_frame(snapshot)
+    with metrics.stage('merge_treasury_stock'):
+        df = merge_treasury_stock(df, csv_path)
+    save_frame(df, snapshot)
+    print(f"[스냅샷] 자사주 비율을 병합해 '{snapshot}'에 다시 저장했습니다.")
+
+def run_render(snapshot=WORK_SNAPSHOT, filename="index.html", output="json", name_max_width=90, data_file=None):
+    with metrics.stage('load_snapshot'):
+        df = load_frame(snapshot)
+    df = score_market(df)
+    with metrics.stage('process_and_save_html'):
+        process_and_save_html(df, filename=filename, name_max_width=name_max_width, output=output, data_file=data_file)
+    metrics.record('rows', len(df))
+
+# [추가] 장중 갱신: 자주 바뀌는 열만 다시 받고, 재무 항목(매출액/부채총계/배당금 등)은 작업 스냅샷 값을 그대로 사용
+REFRESH_FIELDS = ['quant', 'market_sum', 'per', 'pbr']
+QUOTE_COLUMNS = ['현재가', '전일비', '등락률', '거래량', '시가총액', 'PER', 'PBR']
+FLOW_COLUMNS = NET_COLS + ['외국인 보유율(%)'] + flow_columns()
+
+def update_columns(state, fresh, columns):
+    rows = state.index.intersection(fresh.index)
+    updated = []
+    for col in columns:
+        if col in state.columns and col in fresh.columns:
+            state.loc[rows, col] = fresh.loc[rows, col]
+            updated.append(col)
+    return updated
+
+async def refresh_once(state, market_session, investor_session, limiter, parse_pool=None, with_flows=True):
+    import asyncio
+    from investor_flows import history_frame, add_rolling_flows, latest_flows
+    from schema import apply_schema, RATIO_DTYPE
+    loop = asyncio.get_running_loop()
+    with metrics.stage('refresh.quotes'):
+        set_naver_custom_fields(market_session, REFRESH_FIELDS)
+        quotes = await loop.run_in_executor(None, crawl_market_sum, market_session, "시세 갱신")
+    changed = update_columns(state, quotes, QUOTE_COLUMNS)
+
+    if with_flows:
+        with metrics.stage('refresh.flows'):
+            investor_data, _ = await get_all_investors(state.index.tolist(), limiter, session=investor_session, parse_pool=parse_pool)
+            flows = apply_schema(latest_flows(add_rolling_flows(history_frame(investor_data))))
+        changed += update_columns(state, flows, FLOW_COLUMNS)
+
+    # 바뀐 열에 의존하는 비율만 다시 계산 (가격 -> 배당수익률)
+    compute_ratios(state, ratios=affected_ratios(changed), dtype=RATIO_DTYPE)
+    # [추가] 점수는 PER/PBR/배당수익률/수급에 따라 바뀌므로 매 주기 다시 계산해서 같은 열에 덮어씀
+    columns = score_columns(state)
+    if columns:
+        scored = score_market(state)
+        for col in columns:
+            state[col] = scored[col]
+    return state
+
+async def refresh_loop(state, writer, interval, cycles=0, flow_every=1):
+    import asyncio
+    from parse_pool import ParsePool
+    from throttle import AdaptiveLimiter
+    codes = state.index.tolist()
+    scores = score_columns(state)
+    tracked = QUOTE_COLUMNS + FLOW_COLUMNS + [r[0] for r in affected_ratios(QUOTE_COLUMNS + FLOW_COLUMNS)] + scores
+    float_cols = DISPLAY_FLOAT_COLS + [c for c in scores if c not in DISPLAY_INT_COLS + DISPLAY_FLOAT_COLS]
+    base_values = prev_values = payload.payload_values(state, tracked, DISPLAY_INT_COLS, float_cols)
+
+    # 같은 세션(커넥션 풀)과 파싱 프로세스를 갱신 주기 내내 재사용
+    limiter = AdaptiveLimiter()
+    market_session = new_market_session()
+    parse_pool = ParsePool(PARSE_WORKERS) if PARSE_WORKERS else None
+    try:
+        async with open_investor_session(limiter) as investor_session:
+            n = 0
+            while True:
+                n += 1
+                started = time.monotonic()
+                with_flows = flow_every > 0 and (n - 1) % flow_every == 0
+                await refresh_once(state, market_session, investor_session, limiter, parse_pool, with_flows)
+
+                values = payload.payload_values(state, tracked, DISPLAY_INT_COLS, float_cols)
+                delta = payload.build_delta(codes, prev_values, values)
+                cumulative = payload.build_delta(codes, base_values, values)
+                updated_at = datetime.now(timezone(timedelta(hours=9))).strftime("%Y-%m-%d %H:%M")
+                size = writer.write(delta, cumulative, updated_at)
+                prev_values = values
+                metrics.count('refresh.cycles')
+                metrics.count('refresh.delta_bytes', size)
+                print(f"[갱신 {n}] {updated_at} 변경 {len(delta['codes'])}개 종목 (누적 {len(cumulative['codes'])}개), "
+                      f"변경분 {size / 1024:.1f}KB, {time.monotonic() - started:.1f}초{' (수급 포함)' if with_flows else ''}")
+
+                if cycles and n >= cycles:
+                    break
+                await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+    finally:
+        if parse_pool:
+            parse_pool.close()
+        market_session.close()
+
+def run_refresh(snapshot=WORK_SNAPSHOT, filename="index.html", delta_dir='deltas', interval=300, cycles=0, flow_every=1, keep=120):
+    import asyncio
+    from deltas import DeltaWriter
+    # [수정] 기준 페이지도 일일 대시보드와 같은 점수 열을 갖도록 점수를 붙인 뒤 그림 (기본 출력이 index.html이라 덮어씀)
+    state = score_market(load_frame(snapshot))
+    state.attrs.setdefault('updated_at', datetime.now(timezone(timedelta(hours=9))).strftime("%Y-%m-%d %H:%M"))
+
+    # 변경분을 적용할 기준 페이지를 같은 스냅샷으로 먼저 그림 (기준 = 스냅샷 수집 시각)
+    delta_url = delta_dir.strip('/') + '/'
+    with metrics.stage('process_and_save_html'):
+        process_and_save_html(state.copy(), filename=filename, name_max_width=90, output="json", delta_url=delta_url)
+    writer = DeltaWriter(os.path.join(os.path.dirname(os.path.abspath(filename)), delta_dir), base=state.attrs['updated_at'], keep=keep)
+
+    print(f"\n[장중 갱신] {interval:g}초마다 시세를 다시 받아 '{writer.root}'에 변경분을 저장합니다. (Ctrl+C로 종료)")
+    try:
+        # [수정] get_event_loop()는 실행 중인 루프가 없을 때 새 루프를 만드는 동작이 폐기 예정이므로 asyncio.run으로 루프를 만들고 닫음
+        asyncio.run(refresh_loop(state, writer, interval, cycles, flow_every))
+    except KeyboardInterrupt:
+        print("\n[장중 갱신] 종료합니다.")
+
+# [추가] 로컬 스크리너 서버: 작업 스냅샷을 인덱스로 올려 두고 조건 검색 API 제공 (스냅샷이 바뀌면 자동 교체)
+def run_serve(snapshot=WORK_SNAPSHOT, host='127.0.0.1', port=8080, poll=5.0):
+    from aiohttp import web
+    from screener import ScreenerService
+    load_frame(snapshot)
+    with metrics.stage('screener_index'):
+        service = ScreenerService(snapshot, poll=poll)
+    print(f"[스크리너] {service.index.n}개 종목 인덱스 준비 완료. http://{host}:{port}/query 에서 조회하세요. (Ctrl+C로 종료)")
+    web.run_app(service.make_app(), host=host, port=port, print=None)
+
+# [추가] 알림 규칙: 규칙 파일이 있으면 점수까지 붙인 데이터로 평가하고, 직전 실행 대비 새로 걸린 종목만 피드에 남김
+ALERT_RULES = 'alert_rules.json'
+ALERT_DIR = 'alerts'
+
+def check_alerts(df, run_date, rules_path=ALERT_RULES, alert_dir=ALERT_DIR):
+    from alerts import load_rules, AlertFeed
+    try:
+        rules = load_rules(rules_path)
+    except (OSError, ValueError) as e:
+        print(f"[알림] 규칙 파일 '{rules_path}'을 읽지 못해 건너뜁니다: {e}")
+        return None
+    # 알림 평가/피드 기록이 실패해도 대시보드 생성은 계속 진행
+    try:
+        with metrics.stage('alerts'):
+            matches, errors = rules.matches(df)
+            new = AlertFeed(alert_dir).update(matches, df, run_date, df.attrs.get('updated_at'), errors, keep=rules.disabled)
+    except Exception as e:
+        print(f"[알림] 규칙 평가 중 오류가 발생해 건너뜁니다: {e}")
+        metrics.count('alerts.failed')
+        return None
+    for rule_id, reason in errors.items():
+        print(f"[알림] 규칙 '{rule_id}' 평가 실패: {reason}")
+    print(f"[알림] 규칙 {len(rules)}개(조건 {len(rules.conditions)}개) 평가: 일치 {len(matches)}건, 새로 걸린 {len(new)}건 -> '{alert_dir}'")
+    metrics.record('alerts', {'rules': len(rules), 'conditions': len(rules.conditions), 'matches': len(matches),
+                              'new': len(new), 'errors': len(errors)})
+    return new
+
+def run_alerts(run_date, snapshot=WORK_SNAPSHOT, rules_path=ALERT_RULES, alert_dir=ALERT_DIR):
+    if not os.path.exists(rules_path):
+        raise SystemExit(f"[오류] 규칙 파일 '{rules_path}'이 없습니다. (예시: alert_rules.example.json)")
+    with metrics.stage('load_snapshot'):
+        df = load_frame(snapshot)
+    check_alerts(score_market(df), run_date, rules_path, alert_dir)
+
+def run_pipeline(run_date, stream=True, fresh=False, save_snapshot=True):
+    checkpoint = open_checkpoint(run_date, fresh)
+
+    df, history_df = get_full_market_data(stream=stream, checkpoint=checkpoint)
+    with metrics.stage('merge_treasury_stock'):
+        df = merge_treasury_stock(df, 'data.csv')
+
+    # [추가] 렌더링 전에 병합된 원본 데이터를 날짜별 스냅샷으로 누적 저장
+    if save_snapshot:
+        from snapshot_store import SnapshotStore
+        with metrics.stage('snapshot'):
+            store = SnapshotStore('snapshots')
+            snapshot_path = store.append(df, run_date)
+            store.append_history(history_df, run_date)
+        print(f"[스냅샷] {run_date} 데이터를 '{snapshot_path}'에 저장했습니다.")
+    # [추가] 전체 실행 뒤에도 render 명령으로 바로 다시 그릴 수 있게 작업 스냅샷을 남김
+    with metrics.stage('work_snapshot'):
+        save_frame(df, WORK_SNAPSHOT)
+
+    df = score_market(df)
+    if save_snapshot and os.path.exists(ALERT_RULES):
+        check_alerts(df, run_date)
+    with metrics.stage('process_and_save_html'):
+        process_and_save_html(df, filename="index.html", name_max_width=90, output="json")
+    metrics.record('rows', len(df))
+    checkpoint.remove()
+
 if __name__ == "__main__":
-    df = get_full_market_data()
-    df = merge_treasury_stock(df, 'data.csv')
-    process_and_save_html(df, filename="index.html", name_max_width=90)
+    RUN_DATE = datetime.now(timezone(timedelta(hours=9))).strftime("%Y-%m-%d")
+
+    # [수정] 하위 명령 없이 실행하면 기존과 같은 전체 실행(수집 -> 자사주 병합 -> 스냅샷 -> 렌더링)
+    # 수집 관련 옵션은 하위 명령 앞에 둠 (예: python main.py --max-pages 5 crawl)
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--report', default=None, help="실행 계측 리포트(JSON) 경로 (기본: reports/run-<날짜>[-<하위 명령>].json)")
+    parser.add_argument('--profile', action='store_true', help="cProfile로 전체 실행을 프로파일링 (.prof 파일 + 리포트 상위 함수)")
+    parser.add_argument('--base-url', default=BASE_URL, help="네이버 금융 주소 (벤치마크 시 로컬 대역 서버 주소)")
+    parser.add_argument('--max-pages', type=int, default=MAX_MARKET_PAGES, help="시장별 최대 수집 페이지 수")
+    parser.add_argument('--fields', type=parse_field_ids, default=list(MARKET_FIELDS),
+                        help=f"시가총액 페이지에서 받을 항목(fieldIds, 쉼표 구분). {MAX_FIELDS_PER_GROUP}개씩 그룹으로 나눠 동시에 수집")
+    parser.add_argument('--history-pages', type=int, default=INVESTOR_HISTORY_PAGES, help="종목별 수급 페이지 수 (1페이지 = 약 20거래일)")
+    parser.add_argument('--fresh', action='store_true', help="오늘 체크포인트를 버리고 처음부터 다시 수집")
+    parser.add_argument('--cache', action='store_true', help="디스크 응답 캐시 사용 (TTL 안의 응답은 다시 요청하지 않음)")
+    parser.add_argument('--cache-ttl', type=float, default=6 * 3600, help="캐시 유효 시간(초)")
+    parser.add_argument('--cache-max-mb', type=float, default=512, help="캐시 최대 크기(MB, 넘으면 오래 안 쓴 응답부터 삭제)")
+    parser.add_argument('--replay', action='store_true', help="캐시에 저장된 응답만으로 오프라인 실행 (스냅샷은 저장하지 않음)")
+    parser.add_argument('--staged', action='store_true', help="시가총액 크롤링이 끝난 뒤에 수급 수집 시작 (스트리밍 끔)")
+    parser.add_argument('--parse-workers', type=int, nargs='?', const=os.cpu_count() or 1, default=PARSE_WORKERS,
+                        help="수급 페이지를 별도 프로세스 N개에서 파싱 (값 없이 쓰면 CPU 코어 수, 0이면 루프 안에서 파싱)")
+    parser.add_argument('--score-weights', default=None, help="종합점수 팩터 가중치 (예: PER=1,PBR=1,배당수익률=2, 0이면 제외)")
+    parser.add_argument('--top-n', type=int, default=TOP_N, help="시장 내 순위를 매길 종합점수 상위 종목 수")
+    parser.add_argument('--score-details', action='store_true', help="팩터별 백분위 열도 대시보드에 추가")
+    parser.add_argument('--no-score', action='store_true', help="종합점수 열을 만들지 않음")
+    commands = parser.add_subparsers(dest='command')
+    crawl_cmd = commands.add_parser('crawl', help="수집 + 재무비율 계산 후 작업 스냅샷 저장")
+    crawl_cmd.add_argument('--snapshot', default=WORK_SNAPSHOT, help="작업 스냅샷 경로")
+    merge_cmd = commands.add_parser('merge-treasury', help="작업 스냅샷에 자사주 비율(data.csv) 병합")
+    merge_cmd.add_argument('--snapshot', default=WORK_SNAPSHOT, help="작업 스냅샷 경로")
+    merge_cmd.add_argument('--csv', default='data.csv', help="자사주 현황 CSV 경로")
+    render_cmd = commands.add_parser('render', help="작업 스냅샷으로 HTML 대시보드만 다시 생성 (수집 없음)")
+    render_cmd.add_argument('--snapshot', default=WORK_SNAPSHOT, help="작업 스냅샷 경로")
+    render_cmd.add_argument('--out', default='index.html', help="출력 HTML 경로")
+    render_cmd.add_argument('--output', choices=['json', 'table'], default='json', help="json: 열 데이터 + 브라우저 렌더링, table: 서버에서 만든 HTML 표")
+    render_cmd.add_argument('--data-file', default=None, help="json 데이터를 HTML에 넣지 않고 따로 저장할 파일 이름")
+    render_cmd.add_argument('--name-max-width', type=int, default=90, help="종목명 열 최대 너비(px)")
+    refresh_cmd = commands.add_parser('refresh', help="장중 갱신: 시세/수급만 주기적으로 다시 받아 변경분 파일로 저장")
+    refresh_cmd.add_argument('--snapshot', default=WORK_SNAPSHOT, help="기준 작업 스냅샷 경로")
+    refresh_cmd.add_argument('--out', default='index.html', help="변경분을 받아 갱신하는 기준 HTML 경로")
+    refresh_cmd.add_argument('--delta-dir', default='deltas', help="변경분 폴더 (HTML 기준 상대 경로)")
+    refresh_cmd.add_argument('--interval', type=float, default=300, help="갱신 주기(초)")
+    refresh_cmd.add_argument('--cycles', type=int, default=0, help="갱신 횟수 (0이면 종료할 때까지 계속)")
+    refresh_cmd.add_argument('--flow-every', type=int, default=1, help="수급은 N번 갱신마다 한 번 받음 (0이면 시세만)")
+    refresh_cmd.add_argument('--keep', type=int, default=120, help="보관할 변경분 파일 수")
+    serve_cmd = commands.add_parser('serve', help="작업 스냅샷 조건 검색 서버 (범위 조건/정렬/상위 N/페이지)")
+    serve_cmd.add_argument('--snapshot', default=WORK_SNAPSHOT, help="작업 스냅샷 경로")
+    serve_cmd.add_argument('--host', default='127.0.0.1', help="바인드 주소")
+    serve_cmd.add_argument('--port', type=int, default=8080, help="포트")
+    serve_cmd.add_argument('--poll', type=float, default=5, help="스냅샷 변경 확인 주기(초, 0이면 확인 안 함)")
+    alerts_cmd = commands.add_parser('alerts', help="작업 스냅샷에 알림 규칙을 평가해 새로 걸린 종목만 피드에 추가")
+    alerts_cmd.add_argument('--snapshot', default=WORK_SNAPSHOT, help="작업 스냅샷 경로")
+    alerts_cmd.add_argument('--rules', default=ALERT_RULES, help="규칙 파일(JSON) 경로")
+    alerts_cmd.add_argument('--out-dir', default=ALERT_DIR, help="피드(feed.csv, latest.json)와 직전 결과(state.json) 폴더")
+    args = parser.parse_args()
+    args.report = args.report or os.path.join('reports', f"run-{RUN_DATE}{'-' + args.command if args.command else ''}.json")
+
+    set_base_url(args.base_url)
+    MAX_MARKET_PAGES = args.max_pages
+    MARKET_FIELDS = args.fields
+    INVESTOR_HISTORY_PAGES = args.history_pages
+    PARSE_WORKERS = args.parse_workers
+    SCORE_WEIGHTS = parse_weights(args.score_weights) if args.score_weights else None
+    SCORE_TOP_N = args.top_n
+    SCORE_DETAILS = args.score_details
+    SCORE_ENABLED = not args.no_score
+    # [수정] 장중 갱신은 매 주기 새 시세를 받아야 하므로 응답 캐시(TTL 안이면 같은 응답 재사용)를 쓰지 않음
+    if (args.cache or args.replay) and args.command == 'refresh':
+        raise SystemExit("[오류] refresh는 매 주기 새 시세를 받아야 하므로 --cache/--replay와 함께 쓸 수 없습니다.")
+    if (args.cache or args.replay) and args.command in (None, 'crawl'):
+        from http_cache import ResponseCache
+        HTTP_CACHE = ResponseCache(ttl=args.cache_ttl, max_bytes=int(args.cache_max_mb * 1024 * 1024), replay=args.replay)
+
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        if args.command == 'crawl':
+            run_crawl(RUN_DATE, snapshot=args.snapshot, stream=not args.staged, fresh=args.fresh)
+        elif args.command == 'merge-treasury':
+            run_merge_treasury(snapshot=args.snapshot, csv_path=args.csv)
+        elif args.command == 'refresh':
+            run_refresh(snapshot=args.snapshot, filename=args.out, delta_dir=args.delta_dir, interval=args.interval,
+                        cycles=args.cycles, flow_every=args.flow_every, keep=args.keep)
+        elif args.command == 'alerts':
+            run_alerts(RUN_DATE, snapshot=args.snapshot, rules_path=args.rules, alert_dir=args.out_dir)
+        elif args.command == 'serve':
+            run_serve(snapshot=args.snapshot, host=args.host, port=args.port, poll=args.poll)
+        elif args.command == 'render':
+            run_render(snapshot=args.snapshot, filename=args.out, output=args.output, name_max_width=args.name_max_width,
+                       data_file=args.data_file)
+        else:
+            run_pipeline(RUN_DATE, stream=not args.staged, fresh=args.fresh, save_snapshot=not args.replay)
+    finally:
+        if profiler:
+            profiler.disable()
+            profile_path = os.path.splitext(args.report)[0] + '.prof'
+            os.makedirs(os.path.dirname(os.path.abspath(profile_path)), exist_ok=True)
+            profiler.dump_stats(profile_path)
+            metrics.record('profile', {'file': profile_path, 'top': metrics.profile_top(profiler)})
+        print(f"[계측] 실행 리포트를 '{metrics.write_report(args.report)}'에 저장했습니다.")
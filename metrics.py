@@ -0,0 +1,105 @@
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# 실행 계측기: 단계별 소요 시간, 요청 지연 히스토그램, 다운로드 바이트/파싱 시간/대기 시간, 재시도·폴백 카운트, 최대 메모리
+# 실행이 끝나면 JSON 리포트 하나로 저장해서 날마다 비교할 수 있게 함
+
+# 지연 히스토그램 구간 상한(초). 마지막 구간은 그 이상 전부
+LATENCY_BUCKETS = [0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0]
+
+_lock = threading.Lock()
+_stages = {}
+_timings = {}
+_counters = {}
+_extra = {}
+_started = time.time()
+
+def peak_rss_mb():
+    # 리눅스는 KB, macOS는 바이트 단위
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            entry = _stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+            entry['seconds'] += elapsed
+            entry['calls'] += 1
+            entry['peak_rss_mb'] = peak_rss_mb()
+
+def observe(name, seconds):
+    # 요청 지연·파싱 시간·대기 시간 등 개별 관측값 (합계/최대 + 히스토그램)
+    with _lock:
+        entry = _timings.get(name)
+        if entry is None:
+            entry = _timings[name] = {'count': 0, 'total': 0.0, 'max': 0.0, 'buckets': [0] * (len(LATENCY_BUCKETS) + 1)}
+        entry['count'] += 1
+        entry['total'] += seconds
+        entry['max'] = max(entry['max'], seconds)
+        entry['buckets'][next((i for i, b in enumerate(LATENCY_BUCKETS) if seconds <= b), len(LATENCY_BUCKETS))] += 1
+
+def count(name, n=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+def record(name, value):
+    # 그 밖의 실행 정보 (수집 통계, 실패 종목 수 등)
+    with _lock:
+        _extra[name] = value
+
+def _quantile(entry, q):
+    # 히스토그램 구간 상한으로 근사한 분위수
+    target = entry['count'] * q
+    seen = 0
+    for i, n in enumerate(entry['buckets']):
+        seen += n
+        if n and seen >= target:
+            return min(LATENCY_BUCKETS[i], round(entry['max'], 4)) if i < len(LATENCY_BUCKETS) else round(entry['max'], 4)
+    return entry['max']
+
+def report():
+    with _lock:
+        timings = {}
+        for name, entry in _timings.items():
+            timings[name] = {
+                'count': entry['count'],
+                'total_s': round(entry['total'], 4),
+                'mean_s': round(entry['total'] / entry['count'], 4) if entry['count'] else 0,
+                'p50_s': _quantile(entry, 0.5),
+                'p95_s': _quantile(entry, 0.95),
+                'max_s': round(entry['max'], 4),
+                'histogram': dict(zip([f"<={b}" for b in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}"], entry['buckets'])),
+            }
+        return {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(_started)),
+            'wall_s': round(time.time() - _started, 3),
+            'peak_rss_mb': peak_rss_mb(),
+            'stages': {k: dict(v, seconds=round(v['seconds'], 3)) for k, v in _stages.items()},
+            'timings': timings,
+            'counters': dict(_counters),
+            **_extra,
+        }
+
+def write_report(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report(), f, ensure_ascii=False, indent=2)
+    return path
+
+def profile_top(profiler, limit=30):
+    # cProfile 결과 중 누적 시간 상위 함수만 리포트에 포함
+    import pstats
+    stats = pstats.Stats(profiler)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [{'func': f"{os.path.basename(file)}:{line}({func})", 'calls': nc, 'tottime_s': round(tt, 4), 'cumtime_s': round(ct, 4)}
+            for (file, line, func), (_, nc, tt, ct, _) in rows]
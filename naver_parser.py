@@ -0,0 +1,78 @@
+import re
+import time
+import lxml.html
+from lxml import etree
+from pandas.io.parsers import TextParser
+
+# 네이버 금융 페이지 전용 추출기
+# - 시가총액 페이지: lxml로 한 번만 파싱하고 XPath로 표/코드/페이지 정보를 같이 읽음
+# - 수급(frgn) 페이지: 스트리밍 파서로 필요한 행까지만 읽고 중단
+
+_WS = re.compile(r'\s+')
+_PAGE_NO = re.compile(r'page=(\d+)')
+FEED_CHUNK = 16384
+
+def _text(el):
+    return _WS.sub(' ', ''.join(el.itertext())).strip()
+
+def parse_market_sum(html):
+    doc = lxml.html.fromstring(html)
+
+    last_page = None
+    href = doc.xpath('//td[contains(@class, "pgRR")]/a/@href')
+    if href:
+        m = _PAGE_NO.search(href[0])
+        if m: last_page = int(m.group(1))
+
+    tables = doc.xpath('//table[contains(concat(" ", normalize-space(@class), " "), " type_2 ")]')
+    if not tables: return None, last_page
+    table = tables[0]
+
+    headers = [_text(th) for th in table.xpath('.//thead//th')]
+    if not headers or '종목명' not in headers: return None, last_page
+
+    rows, codes = [], []
+    for tr in table.xpath('.//tr[td/a[contains(@class, "tltle")]]'):
+        tds = tr.xpath('./td')
+        if len(tds) != len(headers): continue
+        rows.append([_text(td) for td in tds])
+        codes.append(tr.xpath('./td/a[contains(@class, "tltle")]/@href')[0].split('code=')[-1])
+
+    if not rows: return None, last_page
+
+    # read_html과 같은 규칙(천 단위 콤마, N/A 등 결측 처리)으로 숫자형 변환
+    df = TextParser(rows, names=headers, thousands=',').read()
+    df['종목코드'] = codes
+    df = df.drop(columns=['N', '토론실'], errors='ignore')
+    return df, last_page
+
+def _in_type2_table(tr):
+    for table in tr.iterancestors('table'):
+        return 'type2' in (table.get('class') or '').split()
+    return False
+
+def parse_investor_rows(html, limit=None):
+    # (날짜, 종가, 기관 순매매량, 외국인 순매매량, 외국인 보유율) 목록. limit 개수를 채우면 즉시 중단
+    parser = etree.HTMLPullParser(events=('end',), tag='tr')
+    rows = []
+    for start in range(0, len(html), FEED_CHUNK):
+        parser.feed(html[start:start + FEED_CHUNK])
+        for _, tr in parser.read_events():
+            tds = tr.findall('td')
+            if len(tds) >= 9 and _in_type2_table(tr):
+                date_text = _text(tds[0])
+                if len(date_text) == 10 and date_text.count('.') == 2:
+                    rows.append((date_text, _text(tds[1]), _text(tds[5]), _text(tds[6]), _text(tds[8])))
+                    if limit and len(rows) >= limit:
+                        return rows
+    parser.close()
+    return rows
+
+def parse_investor_batch(items):
+    # 프로세스 풀 작업 단위: [(응답 바이트, 인코딩), ...] -> [(행 목록, 파싱 시간), ...]
+    results = []
+    for body, encoding in items:
+        start = time.perf_counter()
+        rows = parse_investor_rows(body.decode(encoding, errors='replace'))
+        results.append((rows, time.perf_counter() - start))
+    return results
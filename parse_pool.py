@@ -0,0 +1,112 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import metrics
+from http_cache import charset
+from naver_parser import parse_investor_batch
+
+# 수급(frgn) 페이지 파싱을 별도 프로세스로 넘겨서 이벤트 루프는 요청/응답만 처리하게 함
+# - 루프에서는 응답 바이트만 모아 두었다가 batch_size개가 차거나 linger초가 지나면 한 번에 넘김
+# - 워커는 naver_parser.parse_investor_rows를 그대로 쓰므로 결과는 루프 안에서 파싱할 때와 같음
+# - 워커 수 기본값은 CPU 코어 수
+# - 워커 프로세스가 죽으면(메모리 부족 등) 풀을 닫고, 그 배치와 이후 응답은 루프 안에서 파싱
+
+DEFAULT_ENCODING = 'euc-kr'
+
+def _context():
+    # 수집 스레드가 도는 중에 fork하지 않도록 forkserver(없으면 spawn) 사용
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+class ParsePool:
+    def __init__(self, workers=None, batch_size=8, linger=0.005):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.linger = linger
+        self.executor = ProcessPoolExecutor(self.workers, mp_context=_context())
+        self._pending = []
+        self._timer = None
+        # 시가총액 수집이 도는 동안 워커를 미리 띄워 둠
+        for _ in range(self.workers):
+            self.executor.submit(os.getpid)
+
+    async def parse(self, body, content_type):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((body, charset(content_type, DEFAULT_ENCODING), future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.linger, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        metrics.count('parse_pool.batches')
+        metrics.count('parse_pool.pages', len(batch))
+        if self.executor is None:
+            self._parse_here(batch)
+            return
+        try:
+            job = asyncio.get_running_loop().run_in_executor(self.executor, parse_investor_batch,
+                                                             [(body, encoding) for body, encoding, _ in batch])
+        except BrokenProcessPool:
+            self._broken()
+            self._parse_here(batch)
+            return
+        job.add_done_callback(lambda done: self._resolve(batch, done))
+
+    def _resolve(self, batch, done):
+        error = done.exception() if not done.cancelled() else asyncio.CancelledError()
+        if isinstance(error, BrokenProcessPool):
+            # [수정] 깨진 풀에 같은 응답을 다시 요청/제출하지 않고 받은 응답을 그대로 여기서 파싱
+            self._broken()
+            self._parse_here(batch)
+            return
+        for n, (_, _, future) in enumerate(batch):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                rows, seconds = done.result()[n]
+                metrics.observe('investor.parse', seconds)
+                future.set_result(rows)
+
+    def _parse_here(self, batch):
+        for body, encoding, future in batch:
+            if future.done():
+                continue
+            try:
+                (rows, seconds), = parse_investor_batch([(body, encoding)])
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                metrics.observe('investor.parse', seconds)
+                future.set_result(rows)
+
+    def _broken(self):
+        if self.executor is None:
+            return
+        metrics.count('parse_pool.broken')
+        print("\n※ 경고: 파싱 프로세스가 비정상 종료되어 남은 수급 페이지는 이벤트 루프 안에서 파싱합니다.")
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = None
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
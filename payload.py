@@ -0,0 +1,109 @@
+import base64
+import json
+import numpy as np
+import pandas as pd
+from ratios import to_number
+from formatters import fixed2
+from investor_flows import NET_COLS, flow_columns
+
+# 대시보드용 열 단위(JSON) 데이터
+# 숫자는 원시값 그대로 보내고, 표시 형식(콤마/색상/화살표)은 브라우저에서 렌더링할 때 적용
+
+INT32_NULL = -2 ** 31
+
+def _b64(array):
+    return base64.b64encode(np.ascontiguousarray(array).tobytes()).decode('ascii')
+
+def encode_numeric(values, scale):
+    # 값 * scale 이 int32 범위면 int32(결측 = INT32_NULL), 아니면 float64(결측 = NaN)
+    # (실수 열은 이미 소수 둘째 자리로 반올림된 값이라 scale=100 으로 정확히 복원됨)
+    finite = np.isfinite(values)
+    scaled = np.rint(values[finite] * scale)
+    if (np.abs(scaled) < 2 ** 31 - 1).all():
+        data = np.full(len(values), INT32_NULL, dtype='<i4')
+        data[finite] = scaled.astype('<i4')
+        return {'dtype': 'i4', 'scale': scale, 'data': _b64(data)}
+    return {'dtype': 'f8', 'scale': 1, 'data': _b64(np.where(finite, values, np.nan).astype('<f8'))}
+
+def encode_order(keys):
+    # 오름차순 정렬 순열 (결측은 맨 앞). 내림차순은 브라우저에서 뒤집어서 사용
+    order = np.argsort(keys, kind='stable')
+    dtype = '<u2' if len(order) < 2 ** 16 else '<u4'
+    return {'dtype': dtype[1:], 'data': _b64(order.astype(dtype))}
+
+def column_kind(col, int_cols, float_cols):
+    if col == '종목명': return 'name'
+    if col == '종목코드': return 'code'
+    if col == '전일비': return 'diff'
+    if col == '등락률': return 'rate'
+    if col in NET_COLS or col in flow_columns(): return 'net'
+    if col in int_cols: return 'int'
+    if col in float_cols: return 'float'
+    return 'text'
+
+def numeric_values(series, kind):
+    if kind == 'diff':
+        # 부호는 등락률 열로 표시하므로 크기만 보냄
+        if pd.api.types.is_numeric_dtype(series):
+            return np.abs(to_number(series).to_numpy())
+        digits = series.astype(str).str.replace(r'[^\d]', '', regex=True)
+        return pd.to_numeric(digits, errors='coerce').to_numpy(dtype='float64')
+    if kind == 'int':
+        # 0은 표에서 '-'로 표시되고 필터에서도 빈 값으로 취급되므로 결측으로 보냄
+        values = np.trunc(to_number(series).fillna(0).to_numpy(dtype='float64'))
+        return np.where(values == 0, np.nan, values)
+    if kind == 'net':
+        return np.trunc(to_number(series).to_numpy(dtype='float64'))
+
+    # 화면 표시(소수 둘째 자리)와 같은 값으로 반올림해서 보냄 -> 표시/필터 결과가 기존 표와 동일
+    values = to_number(series).to_numpy(dtype='float64', copy=True)
+    finite = np.isfinite(values)
+    # 값이 하나도 없는 열(자사주 CSV 없음, 수급 전부 실패 등)은 그대로 결측으로 보냄
+    if finite.any():
+        values[finite] = fixed2(values[finite]).astype('float64')
+    return values
+
+def build_payload(df, int_cols, float_cols):
+    # 숫자 열은 타입 배열(base64), 문자 열은 JSON 배열. 정렬 가능한 열은 정렬 순열을 미리 계산
+    columns = list(df.columns)
+    kinds = [column_kind(c, int_cols, float_cols) for c in columns]
+    text, numeric, order = {}, {}, {}
+
+    for k, (col, kind) in enumerate(zip(columns, kinds)):
+        if kind in ('name', 'code', 'text'):
+            values = df[col].astype(object).where(df[col].notna(), None).tolist()
+            text[k] = values
+            if kind == 'name':
+                order[k] = encode_order(np.array(['' if v is None else str(v) for v in values]))
+            continue
+
+        values = numeric_values(df[col], kind)
+        values = np.where(np.isfinite(values), values, np.nan)
+        scale = 100 if kind in ('float', 'rate') else 1
+        numeric[k] = encode_numeric(values, scale)
+        order[k] = encode_order(np.where(np.isnan(values), -np.inf, values))
+
+    return {'columns': columns, 'kinds': kinds, 'n': len(df), 'text': text, 'numeric': numeric, 'order': order}
+
+def payload_values(df, columns, int_cols, float_cols):
+    # 변경분 비교/전송용: 대시보드 페이로드와 같은 규칙(표시 자릿수 반올림, 0 -> 결측 등)으로 바꾼 숫자 열
+    return {col: numeric_values(df[col], column_kind(col, int_cols, float_cols)) for col in columns if col in df.columns}
+
+def _json_number(v):
+    if not np.isfinite(v): return None
+    return int(v) if float(v).is_integer() else float(v)
+
+def build_delta(codes, before, after):
+    # before/after: payload_values 결과. 한 열이라도 값이 바뀐 종목만 골라 열 단위로 보냄
+    columns = [c for c in after if c in before]
+    changed = np.zeros(len(codes), dtype=bool)
+    for col in columns:
+        a, b = before[col], after[col]
+        changed |= ~((a == b) | (np.isnan(a) & np.isnan(b)))
+    rows = np.flatnonzero(changed)
+    return {'columns': columns, 'codes': [codes[i] for i in rows],
+            'values': [[_json_number(v) for v in after[col][rows]] for col in columns]}
+
+def dumps(payload):
+    # <script> 안에 그대로 넣을 수 있도록 '</' 이스케이프
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), allow_nan=False).replace('</', '<\\/')
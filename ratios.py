@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+# 재무비율 계산 엔진
+# 원본 숫자 컬럼을 한 번에 정규화한 뒤, 모든 비율을 NumPy 마스크 연산으로 계산 (행 단위 apply 없음)
+# 새 비율은 RATIOS에 (이름, 분자, 분모, 배율) 한 줄만 추가하면 됨
+
+# 계산용 파생 컬럼: 이름 -> (a, b) 이면 a - b
+DERIVED = {
+    '자본총계': ('자산총계', '부채총계'),
+}
+
+RATIOS = [
+    ('배당수익률', '보통주배당금(원)', '현재가', 100),
+    ('영업이익률(%)', '영업이익', '매출액', 100),
+    ('부채비율', '부채총계', '자본총계', 100),
+    ('ROE(%)', '당기순이익', '자본총계', 100),
+]
+
+def to_number(series):
+    # 항상 float64 (결측 = NaN). 이미 숫자형(Int64/float32 포함)인 열은 문자열 변환 없이 그대로 변환
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype('float64')
+    text = series.astype(str).str.replace(',', '', regex=False).str.replace('%', '', regex=False)
+    try:
+        # [수정] 대부분 바로 변환되는 숫자 문자열. 변환 못 하는 값('-', 'N/A' 등)이 있을 때만 to_numeric(coerce)
+        return text.astype('float64')
+    except (ValueError, TypeError):
+        return pd.to_numeric(text, errors='coerce').astype('float64')
+
+def resolve_column(columns, key):
+    if key in columns: return key
+    return next((c for c in columns if key in c), None)
+
+def safe_ratio(numer, denom, scale=100):
+    # 분모가 0 이하이거나 결측이면 0 (기존 apply 로직과 동일한 규칙)
+    numer = np.asarray(numer, dtype='float64')
+    denom = np.asarray(denom, dtype='float64')
+    out = np.zeros(len(denom), dtype='float64')
+    np.divide(numer * scale, denom, out=out, where=denom > 0)
+    return out
+
+def normalize_numeric(df, keys):
+    values = {}
+    for key in keys:
+        col = resolve_column(df.columns, key)
+        if col is not None:
+            values[key] = to_number(df[col]).fillna(0).to_numpy(dtype='float64')
+    return values
+
+def affected_ratios(columns, ratios=RATIOS, derived=DERIVED):
+    # 바뀐 원본 컬럼에 의존하는 비율만 (장중 갱신에서 가격 관련 비율만 다시 계산할 때 사용)
+    changed = set(columns)
+    for name, (a, b) in derived.items():
+        if a in changed or b in changed:
+            changed.add(name)
+    return [r for r in ratios if r[1] in changed or r[2] in changed]
+
+def compute_ratios(df, ratios=RATIOS, derived=DERIVED, dtype='float64'):
+    keys = set()
+    for _, numer, denom, _ in ratios:
+        keys.update([numer, denom])
+    for a, b in derived.values():
+        keys.update([a, b])
+
+    values = normalize_numeric(df, keys - set(derived))
+    for name, (a, b) in derived.items():
+        if a in values and b in values:
+            values[name] = values[a] - values[b]
+
+    for name, numer, denom, scale in ratios:
+        if numer in values and denom in values:
+            df[name] = safe_ratio(values[numer], values[denom], scale).astype(dtype)
+        else:
+            df[name] = 0
+    return df
@@ -0,0 +1,85 @@
+import hashlib
+import io
+import json
+import os
+
+import pandas as pd
+
+import metrics
+
+# 드물게 바뀌는 참조 파일(자사주 현황 CSV, 업종 분류표 등)을 한 번만 변환해서 Parquet 캐시로 재사용
+# - 원본 크기/수정 시각이 같으면 캐시를 바로 읽고, 다르면 내용 해시를 비교해서 실제로 바뀐 경우에만 다시 변환
+# - 인코딩은 원본 바이트를 한 번만 읽어서 판별 (실패할 때마다 파일을 다시 읽지 않음)
+# - build(원본 DataFrame) -> 종목코드 인덱스의 타입 지정된 DataFrame. version을 올리면 변환 규칙이 바뀐 것으로 보고 다시 만듦
+
+REFERENCE_CACHE_DIR = os.path.join('work', 'reference')
+# utf-8은 잘못된 바이트를 거의 통과시키지 않으므로 먼저 시도하고, 아니면 원본 기본값인 cp949(euc-kr 포함)
+ENCODINGS = ['utf-8-sig', 'cp949']
+
+def decode_text(raw, encodings=ENCODINGS):
+    for n, encoding in enumerate(encodings):
+        try:
+            text = raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+        if n:
+            metrics.count('reference.encoding_fallback', n)
+        return text, encoding
+    raise UnicodeDecodeError(encodings[-1], raw, 0, len(raw), "지원하는 인코딩으로 읽을 수 없습니다")
+
+def read_csv_bytes(raw, **kwargs):
+    text, encoding = decode_text(raw)
+    return pd.read_csv(io.StringIO(text), **kwargs), encoding
+
+class ReferenceCache:
+    def __init__(self, root=REFERENCE_CACHE_DIR):
+        self.root = root
+
+    def _paths(self, name):
+        return os.path.join(self.root, name + '.parquet'), os.path.join(self.root, name + '.json')
+
+    def _read_meta(self, meta_path):
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, meta_path, meta):
+        with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def load(self, path, build, name=None, version=1, **read_kwargs):
+        name = name or os.path.splitext(os.path.basename(path))[0]
+        data_path, meta_path = self._paths(name)
+        stat = os.stat(path)
+        meta = self._read_meta(meta_path)
+        usable = meta is not None and meta.get('version') == version and os.path.exists(data_path)
+
+        if usable and meta['size'] == stat.st_size and meta['mtime_ns'] == stat.st_mtime_ns:
+            metrics.count('reference.cache_hit')
+            return pd.read_parquet(data_path)
+
+        with open(path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        if usable and meta['sha256'] == digest:
+            # 내용은 그대로이고 수정 시각만 바뀐 경우(다시 내려받기, git checkout 등)
+            metrics.count('reference.cache_hit')
+            meta.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            self._write_meta(meta_path, meta)
+            return pd.read_parquet(data_path)
+
+        metrics.count('reference.rebuild')
+        csv_df, encoding = read_csv_bytes(raw, **read_kwargs)
+        table = build(csv_df)
+        os.makedirs(self.root, exist_ok=True)
+        table.to_parquet(data_path + '.tmp')
+        os.replace(data_path + '.tmp', data_path)
+        self._write_meta(meta_path, {'source': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                                     'sha256': digest, 'encoding': encoding, 'version': version, 'rows': len(table)})
+        return table
+
+def load_reference(path, build, name=None, version=1, root=REFERENCE_CACHE_DIR, **read_kwargs):
+    return ReferenceCache(root).load(path, build, name=name, version=version, **read_kwargs)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+from investor_flows import NET_COLS, flow_columns
+from ratios import to_number
+
+# 병합 데이터 열 타입 선언 (수집 직후 한 번만 적용)
+# - 금액/수량: Int64 (결측 허용 정수), 비율: float32, 시장: category (종목명은 종목마다 달라서 문자열 그대로)
+# - 종목코드: 6자리 문자열 인덱스. 이후 병합은 모두 인덱스 기준 join
+# 이후 단계(비율 계산, 포맷, JSON, 스냅샷)는 문자열을 다시 숫자로 바꾸지 않고 이 열들을 그대로 사용
+
+CODE = '종목코드'
+INT_COLS = ['현재가', '전일비', '매출액', '영업이익', '당기순이익', '자산총계', '부채총계', '보통주배당금', '보통주배당금(원)',
+            '시가총액', '거래량', '상장주식수', '거래대금', 'EPS', 'BPS'] + NET_COLS + flow_columns()
+FLOAT_COLS = ['등락률', 'PER', 'PBR', '외국인 보유율(%)', '배당수익률', '영업이익률(%)', '부채비율', 'ROE(%)', '자사주 비율(%)',
+              'ROE', 'ROA', '외국인비율']
+CATEGORY_COLS = ['시장']
+RATIO_DTYPE = 'float32'
+
+def code_index(codes):
+    codes = pd.Series(codes).astype(str)
+    if not (codes.str.len() == 6).all():
+        codes = codes.str.zfill(6)
+    # [수정] to_numpy()로 파이썬 문자열 배열을 만들지 않고 Arrow 문자열 그대로 인덱스로 사용
+    return pd.Index(codes, name=CODE)
+
+def signed_diff(diff_col, rate_col):
+    # '상승 1,200' / '하락 300' -> 부호 있는 정수. 상승/하락 표시가 없으면 등락률 부호를 사용
+    # [수정] 정규식 대신 앞의 표시 글자만 떼고 바로 숫자로 변환. 다른 형식이 섞여 있을 때만 정규식으로 숫자만 추림
+    text = diff_col.astype(str)
+    try:
+        digits = np.abs(text.str.lstrip('상승하락한가보합 ').str.replace(',', '', regex=False).astype('float64'))
+    except (ValueError, TypeError):
+        digits = pd.to_numeric(text.str.replace(r'[^\d]', '', regex=True), errors='coerce')
+    up = text.str.startswith(('상승', '상한')).to_numpy(dtype=bool, na_value=False)
+    down = text.str.startswith(('하락', '하한')).to_numpy(dtype=bool, na_value=False)
+    sign = np.where(up, 1.0, np.where(down, -1.0, np.nan))
+    rest = np.isnan(sign)
+    if rest.any():
+        sign[rest] = np.sign(to_number(rate_col[rest]).fillna(0).to_numpy())
+    return digits * sign
+
+def to_int(series):
+    # 이미 정수형이면 float64를 거치지 않고 바로 Int64로
+    if pd.api.types.is_integer_dtype(series):
+        return series.astype('Int64')
+    return np.trunc(to_number(series)).astype('Int64')
+
+def apply_schema(df):
+    if CODE in df.columns:
+        df = df.set_index(code_index(df[CODE])).drop(columns=[CODE])
+    else:
+        df = df.copy(deep=False)
+    if df.index.has_duplicates:
+        df = df[~df.index.duplicated()]
+
+    # [수정] 변환한 열을 모아서 assign 하지 않고 한 열씩 바로 교체 (원래 문자열 열은 교체되는 대로 해제)
+    for col in list(df.columns):
+        series = df[col]
+        if col == '전일비' and not pd.api.types.is_numeric_dtype(series) and '등락률' in df.columns:
+            df[col] = to_int(signed_diff(series, df['등락률']))
+        elif col in INT_COLS:
+            df[col] = to_int(series)
+        elif col in FLOAT_COLS:
+            df[col] = to_number(series).astype(RATIO_DTYPE)
+        elif col in CATEGORY_COLS:
+            df[col] = series.astype('category')
+    return df
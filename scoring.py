@@ -0,0 +1,151 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from ratios import to_number
+
+# 횡단면 점수: 시장(KOSPI/KOSDAQ)별로 팩터마다 백분위 순위와 윈저라이즈한 z-점수를 구하고,
+# 가중 평균한 종합점수로 시장 내 상위 N개 순위를 매김
+# - 팩터 행렬(종목 x 팩터) 하나로 모든 열을 한 번에 계산. 시장별 반복만 있고 종목/열 단위 apply는 없음
+# - PER/PBR은 역수(이익/자산 수익률)로 바꿔서 적자(PER<0) 종목이 저PER로 올라오지 않게 함
+# - 수급 누적은 상장주식수 대비 비율로 바꿔서 주식 수가 많은 종목이 유리하지 않게 함
+
+GROUP_COL = '시장'
+DEFAULT_WEIGHTS = {'PER': 1.0, 'PBR': 1.0, '영업이익률(%)': 1.0, '부채비율': 1.0, '배당수익률': 1.0,
+                   '외국인 5일 누적': 0.5, '기관 5일 누적': 0.5}
+# 변환 규칙 (없으면 값이 클수록 좋음)
+FACTOR_RULES = {'PER': 'inverse', 'PBR': 'inverse', '부채비율': 'lower',
+                '외국인 5일 누적': 'per_share', '기관 5일 누적': 'per_share',
+                '외국인 20일 누적': 'per_share', '기관 20일 누적': 'per_share',
+                '기관 순매매량': 'per_share', '외국인 순매매량': 'per_share'}
+WINSOR = 0.01
+TOP_N = 50
+SCORE_COLS = ['종합점수', '종합 백분위', '시장 내 순위']
+
+def parse_weights(text):
+    # "PER=2,PBR=1,배당수익률=0.5" -> {'PER': 2.0, ...}. 0이면 해당 팩터 제외
+    weights = {}
+    for part in text.split(','):
+        if not part.strip():
+            continue
+        name, _, value = part.rpartition('=')
+        if not name.strip():
+            raise ValueError(f"가중치는 '열=값' 형식이어야 합니다: {part}")
+        weights[name.strip()] = float(value)
+    return weights
+
+def factor_matrix(df, weights):
+    # 가중치가 있는 팩터만 (종목 x 팩터) float64 행렬로. 값이 클수록 좋은 방향으로 맞춤
+    names, columns = [], []
+    shares = to_number(df['상장주식수']).to_numpy() if '상장주식수' in df.columns else None
+    for name, weight in weights.items():
+        if not weight or name not in df.columns:
+            continue
+        rule = FACTOR_RULES.get(name)
+        if rule == 'per_share' and shares is None:
+            continue
+        values = to_number(df[name]).to_numpy(dtype='float64', na_value=np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if rule == 'inverse':
+                values = np.where(values != 0, 1.0 / values, np.nan)
+            elif rule == 'lower':
+                values = -values
+            elif rule == 'per_share':
+                # 상장주식수(천주) 대비 % -> 순매매량 / (상장주식수 * 1000) * 100
+                values = np.where(shares > 0, values / (shares * 10), np.nan)
+        names.append(name)
+        columns.append(np.where(np.isfinite(values), values, np.nan))
+    matrix = np.column_stack(columns) if columns else np.empty((len(df), 0))
+    return names, matrix
+
+def percentile_ranks(X):
+    # 열마다 0~100 백분위 (동률은 평균 순위, 결측은 결측)
+    # 한 번 정렬한 뒤 같은 값 구간의 처음/끝 순위 평균을 구간 전체에 줌
+    out = np.full(X.shape, np.nan)
+    # 동률은 평균 순위로 처리하므로 안정 정렬이 필요 없음. 열을 연속 메모리로 만들어 열 단위로 정렬
+    orders = np.argsort(np.ascontiguousarray(X.T), axis=1)
+    counts = (~np.isnan(X)).sum(axis=0)
+    for j in range(X.shape[1]):
+        count = int(counts[j])
+        if count == 0:
+            continue
+        order = orders[j, :count]
+        s = X[order, j]
+        starts = np.flatnonzero(np.r_[True, s[1:] != s[:-1]])
+        ends = np.r_[starts[1:], count] - 1
+        tie = np.cumsum(np.r_[True, s[1:] != s[:-1]]) - 1
+        rank = (starts + ends)[tie] / 2
+        out[order, j] = rank / (count - 1) * 100 if count > 1 else 50.0
+    return out
+
+def winsorized_zscores(X, limit=WINSOR):
+    # 양 끝 limit 분위수에서 잘라낸 뒤 표준화. 값이 모두 같은 열은 0
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        lo, hi = np.nanquantile(X, [limit, 1 - limit], axis=0)
+        W = np.clip(X, lo, hi)
+        mean = np.nanmean(W, axis=0)
+        std = np.nanstd(W, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(std > 0, (W - mean) / std, np.where(np.isnan(W), np.nan, 0.0))
+
+def composite(Z, weights):
+    # 결측 팩터는 빼고 남은 가중치로 평균 (팩터가 하나도 없으면 결측)
+    w = np.asarray(weights, dtype='float64')
+    present = ~np.isnan(Z)
+    total = (present * w).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(total > 0, np.nansum(Z * w, axis=1) / total, np.nan)
+
+def top_n_ranks(scores, n=TOP_N):
+    # 점수 상위 n개에만 1..n 순위 (argpartition으로 n개만 골라 정렬), 나머지는 결측
+    ranks = np.full(len(scores), np.nan)
+    valid = np.flatnonzero(~np.isnan(scores))
+    if n <= 0 or len(valid) == 0:
+        return ranks
+    keys = -scores[valid]
+    if n < len(valid):
+        top = np.argpartition(keys, n - 1)[:n]
+    else:
+        top = np.arange(len(valid))
+    top = top[np.argsort(keys[top], kind='stable')]
+    ranks[valid[top]] = np.arange(1, len(top) + 1)
+    return ranks
+
+def score_frame(df, weights=None, top_n=TOP_N, group_col=GROUP_COL, winsor=WINSOR):
+    # 팩터별 백분위/z-점수와 종합점수/종합 백분위/시장 내 순위를 df와 같은 인덱스로 반환
+    weights = DEFAULT_WEIGHTS if weights is None else weights
+    names, X = factor_matrix(df, weights)
+    w = [weights[name] for name in names]
+    pct, Z = np.full(X.shape, np.nan), np.full(X.shape, np.nan)
+    score, score_pct, rank = (np.full(len(df), np.nan) for _ in range(3))
+
+    if group_col in df.columns:
+        codes, _ = pd.factorize(df[group_col], use_na_sentinel=False)
+    else:
+        codes = np.zeros(len(df), dtype=np.int64)
+    for g in np.unique(codes):
+        rows = np.flatnonzero(codes == g)
+        pct[rows] = percentile_ranks(X[rows])
+        Z[rows] = winsorized_zscores(X[rows], winsor)
+        score[rows] = composite(Z[rows], w)
+        score_pct[rows] = percentile_ranks(score[rows, None])[:, 0]
+        rank[rows] = top_n_ranks(score[rows], top_n)
+
+    out = {}
+    for j, name in enumerate(names):
+        out[f"{name} 백분위"] = pct[:, j]
+        out[f"{name} z"] = Z[:, j]
+    out.update({'종합점수': score, '종합 백분위': score_pct, '시장 내 순위': rank})
+    return pd.DataFrame(out, index=df.index)
+
+def add_scores(df, weights=None, top_n=TOP_N, details=False):
+    # 대시보드용: 종합점수/종합 백분위/시장 내 순위(+ details면 팩터별 백분위) 열 추가
+    scores = score_frame(df, weights, top_n)
+    cols = SCORE_COLS + ([c for c in scores.columns if c.endswith(' 백분위') and c not in SCORE_COLS] if details else [])
+    scores = scores[cols].astype('float32')
+    scores['시장 내 순위'] = scores['시장 내 순위'].astype('Int64')
+    out = df.drop(columns=[c for c in cols if c in df.columns]).join(scores)
+    out.attrs = df.attrs
+    return out
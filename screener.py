@@ -0,0 +1,260 @@
+import asyncio
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from aiohttp import web
+
+import metrics
+from ratios import to_number
+
+# 작업 스냅샷(work/market.parquet)을 메모리에 올려 두고 조건 검색을 바로 답하는 로컬 스크리너 서버
+# - 숫자 열마다 정렬 배열(값 오름차순 행 번호 + 정렬된 값)을 미리 만들어 두고,
+#   범위 조건은 이진 탐색으로 후보 구간을 구함. 조건이 여러 개면 가장 좁은 구간의 행만 나머지 조건으로 거름
+# - 정렬은 미리 계산한 순위로, 상위 N개는 argpartition으로 필요한 만큼만 정렬 (페이지 = offset + limit)
+# - 스냅샷 파일이 바뀌면 새 인덱스를 따로 만든 뒤 참조만 교체. 처리 중인 요청은 이전 인덱스로 끝까지 응답
+#
+# GET /query?filter=PER:0:10&filter=PBR::1&market=KOSPI&q=삼성&sort=-시가총액&offset=0&limit=50&fields=종목명,현재가
+#   filter=<열>:<최소>:<최대> (양쪽 포함, 한쪽은 비워도 됨), sort 앞의 '-'는 내림차순, 결측은 항상 맨 뒤
+# GET /columns : 검색 가능한 열과 최소/최대/값 개수,  GET /health : 스냅샷 정보
+
+CODE = '종목코드'
+TEXT_COLS = ['종목명', '시장']
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+
+class QueryError(ValueError):
+    pass
+
+class ScreenerIndex:
+    def __init__(self, df, source=None):
+        if df.index.name == CODE:
+            df = df.reset_index()
+        self.source = source
+        self.updated_at = df.attrs.get('updated_at')
+        self.n = len(df)
+        self.codes = df[CODE].astype(str).to_numpy()
+        self.position = {code: i for i, code in enumerate(self.codes)}
+        self.text = {col: df[col].astype(object).where(df[col].notna(), None).to_numpy() for col in TEXT_COLS if col in df.columns}
+        self.names = np.array([str(v).lower() if v is not None else '' for v in self.text.get('종목명', [None] * self.n)])
+        self.markets = {}
+        if '시장' in self.text:
+            for market in pd.unique(self.text['시장']):
+                if market is not None:
+                    self.markets[market] = self.text['시장'] == market
+
+        self.values, self.order, self.sorted, self.rank, self.valid = {}, {}, {}, {}, {}
+        for col in df.columns:
+            if col == CODE or col in TEXT_COLS:
+                continue
+            values = to_number(df[col]).to_numpy(dtype='float64', na_value=np.nan)
+            if df[col].dtype == 'float32':
+                # float32 -> float64 변환 오차(12.340000152...)를 없애서 응답/경계값 비교를 표시값과 맞춤
+                values = np.round(values, 4)
+            finite = np.isfinite(values)
+            # 결측은 정렬 배열 뒤쪽에 모아 두고 범위 검색 구간에서는 빠지게 함
+            order = np.argsort(np.where(finite, values, np.inf), kind='stable')
+            valid = int(finite.sum())
+            rank = np.empty(self.n, dtype=np.int64)
+            rank[order] = np.arange(self.n)
+            self.values[col] = np.where(finite, values, np.nan)
+            self.order[col] = order
+            self.sorted[col] = self.values[col][order[:valid]]
+            self.rank[col] = rank
+            self.valid[col] = valid
+        self.columns = [CODE] + list(self.text) + list(self.values)
+
+    def range_rows(self, col, lo, hi):
+        # 값이 [lo, hi] 안에 있는 행 번호 (정렬 배열에서 이진 탐색한 연속 구간)
+        start = 0 if lo is None else np.searchsorted(self.sorted[col], lo, side='left')
+        stop = self.valid[col] if hi is None else np.searchsorted(self.sorted[col], hi, side='right')
+        return self.order[col][start:max(start, stop)]
+
+    def select(self, filters=(), market=None, keyword=None, codes=None):
+        for col, _, _ in filters:
+            if col not in self.values:
+                raise QueryError(f"검색할 수 없는 열입니다: {col}")
+        if market is not None and market not in self.markets:
+            raise QueryError(f"알 수 없는 시장입니다: {market}")
+
+        if codes:
+            rows = np.array(sorted(self.position[c] for c in codes if c in self.position), dtype=np.int64)
+        elif filters:
+            # 가장 좁은 구간을 후보로 잡고 나머지 조건은 후보 행의 값만 비교
+            spans = sorted((self.range_rows(col, lo, hi) for col, lo, hi in filters), key=len)
+            rows = np.sort(spans[0])
+        else:
+            rows = np.arange(self.n)
+        for col, lo, hi in filters:
+            if len(rows) == 0:
+                break
+            v = self.values[col][rows]
+            keep = ~np.isnan(v)
+            if lo is not None:
+                keep &= v >= lo
+            if hi is not None:
+                keep &= v <= hi
+            rows = rows[keep]
+        if market is not None:
+            rows = rows[self.markets[market][rows]]
+        if keyword:
+            for word in keyword.lower().split():
+                rows = rows[np.char.find(self.names[rows], word) >= 0]
+        return rows
+
+    def sort_keys(self, rows, col, desc=False):
+        if col not in self.rank:
+            raise QueryError(f"정렬할 수 없는 열입니다: {col}")
+        rank = self.rank[col][rows]
+        if desc:
+            valid = self.valid[col]
+            rank = np.where(rank < valid, valid - 1 - rank, rank)
+        return rank
+
+    def page(self, rows, sort=None, desc=False, offset=0, limit=DEFAULT_LIMIT):
+        need = offset + limit
+        if sort is None:
+            return rows[offset:need]
+        keys = self.sort_keys(rows, sort, desc)
+        if need < len(rows):
+            # 상위 need개만 골라서 정렬 (순위는 모두 다른 정수라 결과가 항상 같음)
+            top = np.argpartition(keys, need - 1)[:need]
+            top = top[np.argsort(keys[top], kind='stable')]
+        else:
+            top = np.argsort(keys, kind='stable')
+        return rows[top[offset:need]]
+
+    def records(self, rows, fields=None):
+        fields = fields or self.columns
+        for col in fields:
+            if col not in self.columns:
+                raise QueryError(f"알 수 없는 열입니다: {col}")
+        out = {}
+        for col in fields:
+            if col == CODE:
+                out[col] = self.codes[rows].tolist()
+            elif col in self.text:
+                out[col] = self.text[col][rows].tolist()
+            else:
+                out[col] = [None if v != v else (int(v) if v.is_integer() else v) for v in self.values[col][rows].tolist()]
+        return [dict(zip(fields, row)) for row in zip(*(out[col] for col in fields))]
+
+    def query(self, filters=(), market=None, keyword=None, codes=None, sort=None, desc=False, offset=0, limit=DEFAULT_LIMIT, fields=None):
+        rows = self.select(filters, market, keyword, codes)
+        picked = self.page(rows, sort, desc, offset, limit)
+        return {'total': len(rows), 'offset': offset, 'limit': limit, 'rows': self.records(picked, fields)}
+
+    def describe(self):
+        return [{'column': col, 'count': self.valid[col],
+                 'min': float(self.sorted[col][0]) if self.valid[col] else None,
+                 'max': float(self.sorted[col][-1]) if self.valid[col] else None} for col in self.values]
+
+def _number(text, name):
+    if text is None or text.strip() == '':
+        return None
+    try:
+        return float(text.replace(',', ''))
+    except ValueError:
+        raise QueryError(f"숫자가 아닙니다 ({name}): {text}")
+
+def parse_query(params):
+    filters = []
+    for spec in params.getall('filter', []):
+        parts = spec.rsplit(':', 2)
+        if len(parts) != 3:
+            raise QueryError(f"filter는 '열:최소:최대' 형식이어야 합니다: {spec}")
+        col, lo, hi = parts
+        filters.append((col, _number(lo, col), _number(hi, col)))
+    sort = params.get('sort') or None
+    desc = bool(sort) and sort.startswith('-')
+    try:
+        offset = max(0, int(params.get('offset', 0)))
+        limit = min(MAX_LIMIT, max(1, int(params.get('limit', DEFAULT_LIMIT))))
+    except ValueError:
+        raise QueryError("offset/limit은 정수여야 합니다")
+    codes = [c.strip() for c in params.get('codes', '').split(',') if c.strip()]
+    fields = [c.strip() for c in params.get('fields', '').split(',') if c.strip()]
+    return dict(filters=filters, market=params.get('market') or None, keyword=params.get('q') or None, codes=codes,
+                sort=sort.lstrip('-') if sort else None, desc=desc, offset=offset, limit=limit, fields=fields or None)
+
+def load_index(path):
+    stat = os.stat(path)
+    index = ScreenerIndex(pd.read_parquet(path), source=path)
+    return index, (stat.st_mtime_ns, stat.st_size)
+
+class ScreenerService:
+    def __init__(self, path, poll=5.0):
+        self.path = path
+        self.poll = poll
+        self.index, self.version = load_index(path)
+        self.loaded_at = time.time()
+        self.swaps = 0
+
+    async def reload(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        if (stat.st_mtime_ns, stat.st_size) == self.version:
+            return False
+        try:
+            # 인덱스 생성은 스레드에서. 다 만들어진 뒤에만 교체하므로 요청은 항상 완전한 인덱스 하나만 봄
+            index, version = await asyncio.get_running_loop().run_in_executor(None, load_index, self.path)
+        except Exception as e:
+            print(f"[스크리너] 스냅샷을 다시 읽지 못해 이전 인덱스를 유지합니다: {e}")
+            return False
+        self.index, self.version, self.loaded_at = index, version, time.time()
+        self.swaps += 1
+        metrics.count('screener.swaps')
+        print(f"[스크리너] 새 스냅샷으로 교체했습니다. ({index.n}개 종목, 업데이트 {index.updated_at})")
+        return True
+
+    async def watch(self):
+        while True:
+            await asyncio.sleep(self.poll)
+            await self.reload()
+
+    def respond(self, data, status=200):
+        return web.Response(text=json.dumps(data, ensure_ascii=False, allow_nan=False), status=status,
+                            content_type='application/json', charset='utf-8')
+
+    async def handle_query(self, request):
+        index = self.index
+        start = time.perf_counter()
+        try:
+            result = index.query(**parse_query(request.query))
+        except QueryError as e:
+            return self.respond({'error': str(e)}, status=400)
+        elapsed = time.perf_counter() - start
+        metrics.observe('screener.query', elapsed)
+        result.update(updated_at=index.updated_at, took_ms=round(elapsed * 1000, 3))
+        return self.respond(result)
+
+    async def handle_columns(self, request):
+        index = self.index
+        return self.respond({'updated_at': index.updated_at, 'text': list(index.text), 'markets': list(index.markets),
+                             'numeric': index.describe()})
+
+    async def handle_health(self, request):
+        index = self.index
+        return self.respond({'snapshot': self.path, 'rows': index.n, 'updated_at': index.updated_at,
+                             'loaded_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.loaded_at)), 'swaps': self.swaps})
+
+    def make_app(self):
+        app = web.Application()
+        app.router.add_get('/query', self.handle_query)
+        app.router.add_get('/columns', self.handle_columns)
+        app.router.add_get('/health', self.handle_health)
+
+        async def start_watch(app):
+            app['watch'] = asyncio.ensure_future(self.watch())
+
+        async def stop_watch(app):
+            app['watch'].cancel()
+
+        if self.poll:
+            app.on_startup.append(start_watch)
+            app.on_cleanup.append(stop_watch)
+        return app
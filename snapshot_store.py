@@ -0,0 +1,116 @@
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from ratios import to_number
+from schema import signed_diff
+
+# 일별 스냅샷 저장소 (Parquet, 날짜별 파티션)
+# snapshots/date=2024-01-02/part-0.parquet 처럼 실행일마다 파일 하나를 추가하고,
+# 조회할 때는 필요한 열/날짜/종목만 읽음 (열 단위 projection + 파티션/행 그룹 필터)
+
+SNAPSHOT_DIR = 'snapshots'
+TEXT_COLS = ['종목코드', '종목명', '시장']
+PARTITIONING = ds.partitioning(pa.schema([('date', pa.string())]), flavor='hive')
+
+def typed_frame(df):
+    # 저장용 열 타입: 문자 열은 그대로, 나머지는 float64 (날짜마다 같은 타입이어야 한 데이터셋으로 읽힘)
+    if df.index.name == '종목코드':
+        df = df.reset_index()
+    out = pd.DataFrame(index=df.index)
+    for col in df.columns:
+        if col in TEXT_COLS:
+            out[col] = df[col].astype(str)
+        elif col == '전일비' and '등락률' in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            out[col] = signed_diff(df[col], df['등락률']).astype('float64')
+        else:
+            out[col] = to_number(df[col]).astype('float64')
+    return out.reset_index(drop=True)
+
+class SnapshotStore:
+    def __init__(self, root=SNAPSHOT_DIR):
+        self.root = root
+
+    def partition_dir(self, date):
+        return os.path.join(self.root, f"date={date}")
+
+    def dates(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name[5:] for name in os.listdir(self.root) if name.startswith('date=')
+                      and os.path.exists(os.path.join(self.root, name, 'part-0.parquet')))
+
+    def append(self, df, date, row_group_size=512):
+        # 날짜 단위로만 추가. 같은 날 다시 실행하면 그날 파일만 원자적으로 교체됨
+        # 종목코드 순으로 정렬해서 쓰면 행 그룹 통계(min/max)로 종목 조회 시 불필요한 그룹을 건너뜀
+        frame = typed_frame(df).sort_values('종목코드', kind='stable')
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        path = self.partition_dir(date)
+        os.makedirs(path, exist_ok=True)
+        tmp_file = os.path.join(path, 'part-0.parquet.tmp')
+        pq.write_table(table, tmp_file, compression='zstd', row_group_size=row_group_size)
+        os.replace(tmp_file, os.path.join(path, 'part-0.parquet'))
+        return os.path.join(path, 'part-0.parquet')
+
+    def append_history(self, history, date):
+        # 그날 받은 종목별 수급 시계열(약 20거래일 이상) 전체를 같은 파티션에 따로 저장
+        path = self.partition_dir(date)
+        os.makedirs(path, exist_ok=True)
+        tmp_file = os.path.join(path, 'investor_history.parquet.tmp')
+        pq.write_table(pa.Table.from_pandas(history, preserve_index=False), tmp_file, compression='zstd')
+        os.replace(tmp_file, os.path.join(path, 'investor_history.parquet'))
+
+    def read_history(self, date=None, columns=None, codes=None):
+        # 지정한 날(기본: 가장 최근)에 저장된 수급 시계열
+        dates = [d for d in self.dates() if os.path.exists(os.path.join(self.partition_dir(d), 'investor_history.parquet'))]
+        date = date or (dates[-1] if dates else None)
+        if date is None:
+            return pd.DataFrame()
+        filters = [('종목코드', 'in', list(codes))] if codes is not None else None
+        return pq.read_table(os.path.join(self.partition_dir(date), 'investor_history.parquet'),
+                             columns=columns, filters=filters).to_pandas()
+
+    def dataset(self):
+        # 날짜마다 열 구성이 달라도(새 컬럼 추가 등) 합쳐서 읽을 수 있도록 스키마 통합
+        files = [os.path.join(self.partition_dir(d), 'part-0.parquet') for d in self.dates()]
+        if not files:
+            return None
+        schema = pa.unify_schemas([pq.read_schema(f) for f in files] + [PARTITIONING.schema])
+        return ds.dataset(files, schema=schema, format='parquet', partitioning=PARTITIONING, partition_base_dir=self.root)
+
+    def read(self, columns=None, start=None, end=None, codes=None, market=None, last=None):
+        # 필요한 열/구간만 읽음. last=N 이면 가장 최근 N개 거래일
+        dataset = self.dataset()
+        if dataset is None:
+            return pd.DataFrame(columns=['date', '종목코드'] + list(columns or []))
+
+        if last:
+            dates = [d for d in self.dates() if (start is None or d >= start) and (end is None or d <= end)][-last:]
+            start = dates[0] if dates else start
+
+        expr = None
+        conditions = []
+        if start: conditions.append(ds.field('date') >= start)
+        if end: conditions.append(ds.field('date') <= end)
+        if codes is not None: conditions.append(ds.field('종목코드').isin(list(codes)))
+        if market: conditions.append(ds.field('시장') == market)
+        for cond in conditions:
+            expr = cond if expr is None else expr & cond
+
+        names = dataset.schema.names
+        wanted = ['date', '종목코드'] + [c for c in (columns or names) if c not in ('date', '종목코드')]
+        wanted = [c for c in wanted if c in names]
+        table = dataset.to_table(columns=wanted, filter=expr)
+        return table.to_pandas().sort_values(['date', '종목코드'], kind='stable').reset_index(drop=True)
+
+    def history(self, column, codes=None, market=None, start=None, end=None, last=None):
+        # 날짜 x 종목코드 표 (예: history('외국인 순매매량', codes=['005930'], last=20))
+        df = self.read([column], start=start, end=end, codes=codes, market=market, last=last)
+        if df.empty or column not in df.columns:
+            return pd.DataFrame()
+        return df.drop_duplicates(['date', '종목코드'], keep='last').pivot(index='date', columns='종목코드', values=column)
+
+    def rolling_sum(self, column, days, codes=None, market=None):
+        # 최근 N 거래일 합계 (예: 20일 외국인 순매수)
+        return self.history(column, codes=codes, market=market, last=days).sum(min_count=1)
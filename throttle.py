@@ -0,0 +1,177 @@
+import asyncio
+import contextvars
+import random
+import time
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+
+# 수급 수집용 적응형 동시성 제어기
+# - AIMD: 응답이 빠르면 동시 요청 수를 조금씩 늘리고, 오류/429/타임아웃이면 절반으로 줄임
+# - 실패한 요청은 지터가 들어간 지수 백오프로 재시도
+# - 지연 꼬리(최근 p95 초과)에 걸린 요청은 한 번 더 보내서 먼저 끝난 응답을 사용(헤지)
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# 헤지 대상 요청이 실제로 슬롯을 얻은/반납한 시점을 알리는 이벤트 (슬롯 대기 시간과 반납 뒤 파싱 시간은 헤지 판단에서 제외)
+_slot_events = contextvars.ContextVar('slot_events', default=None)
+
+class ThrottleError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+class EmptyPageError(Exception):
+    pass
+
+class PageParseError(Exception):
+    pass
+
+def is_retryable(exc):
+    if isinstance(exc, ThrottleError):
+        return exc.status in RETRY_STATUS
+    # 정상 응답인데 수급 행이 없거나 해석할 수 없는 페이지는 다시 받아도 같으므로 재시도하지 않음
+    if isinstance(exc, (EmptyPageError, PageParseError)):
+        return False
+    # [수정] 파싱 프로세스 풀이 깨지면 같은 풀로 다시 보내도 또 실패하므로 재시도하지 않음 (ParsePool이 루프 안 파싱으로 전환)
+    if isinstance(exc, BrokenProcessPool):
+        return False
+    return True
+
+class AdaptiveLimiter:
+    def __init__(self, initial=8, min_limit=2, max_limit=40, target_latency=1.0,
+                 retries=3, base_delay=0.5, max_delay=8.0, hedge_quantile=0.95, hedge_min_samples=30):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+
+        self.in_flight = 0
+        self.latencies = deque(maxlen=256)
+        self.stats = {'requests': 0, 'success': 0, 'errors': 0, 'throttled': 0, 'timeouts': 0,
+                      'retries': 0, 'hedges': 0, 'hedge_wins': 0, 'failed': 0, 'peak_limit': self.limit}
+        self._cond = asyncio.Condition()
+        self._last_decrease = 0.0
+
+    # ---- AIMD ----
+    def on_success(self, latency):
+        self.stats['success'] += 1
+        self.latencies.append(latency)
+        if latency <= self.target_latency:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self.stats['peak_limit'] = max(self.stats['peak_limit'], self.limit)
+
+    def on_failure(self, exc):
+        self.stats['errors'] += 1
+        if isinstance(exc, ThrottleError) and exc.status == 429:
+            self.stats['throttled'] += 1
+        elif isinstance(exc, asyncio.TimeoutError):
+            self.stats['timeouts'] += 1
+
+        # 같은 순간에 몰려온 오류들로 한 번에 여러 번 줄어들지 않도록, 최근 지연 시간만큼은 한 번만 감소
+        now = time.monotonic()
+        if now - self._last_decrease >= self.recent_latency():
+            self.limit = max(self.min_limit, self.limit * 0.5)
+            self._last_decrease = now
+
+    def recent_latency(self):
+        if not self.latencies: return self.target_latency
+        return sum(self.latencies) / len(self.latencies)
+
+    def hedge_delay(self):
+        if len(self.latencies) < self.hedge_min_samples: return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.hedge_quantile))]
+
+    @asynccontextmanager
+    async def slot(self):
+        async with self._cond:
+            while self.in_flight >= int(self.limit):
+                try:
+                    await self._cond.wait()
+                except asyncio.CancelledError:
+                    # 깨움을 받은 채 취소(헤지 패자)되면 그 깨움을 다른 대기 작업에 넘김
+                    self._cond.notify(1)
+                    raise
+            self.in_flight += 1
+        events = _slot_events.get()
+        if events is not None:
+            events[0].set()
+        self.stats['requests'] += 1
+        start = time.monotonic()
+        try:
+            yield
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.on_failure(e)
+            raise
+        else:
+            self.on_success(time.monotonic() - start)
+        finally:
+            async with self._cond:
+                self.in_flight -= 1
+                # 전부 깨우면 대기 작업 수에 비례해 비용이 커지므로 빈 자리 수만큼만 깨움
+                self._cond.notify(max(1, int(self.limit) - self.in_flight))
+            if events is not None:
+                events[1].set()
+
+    # ---- 재시도 + 헤지 ----
+    async def _hedged(self, attempt):
+        acquired, released = asyncio.Event(), asyncio.Event()
+        token = _slot_events.set((acquired, released))
+        try:
+            first = asyncio.ensure_future(attempt())
+        finally:
+            _slot_events.reset(token)
+        delay = self.hedge_delay()
+        if delay is None:
+            return await first
+
+        # 대기열에 오래 있었던 요청까지 헤지하지 않도록 슬롯을 얻은 뒤부터 지연을 잼
+        waiter = asyncio.ensure_future(acquired.wait())
+        await asyncio.wait({first, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        waiter.cancel()
+        if first.done():
+            return first.result()
+
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+        # 응답은 이미 받았고 파싱(프로세스 풀)만 남았으면 같은 요청을 다시 보내지 않음
+        if released.is_set():
+            return await first
+
+        self.stats['hedges'] += 1
+        second = asyncio.ensure_future(attempt())
+        pending = {first, second}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second: self.stats['hedge_wins'] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def run(self, attempt):
+        for n in range(self.retries + 1):
+            try:
+                return await self._hedged(attempt)
+            except Exception as e:
+                if n == self.retries or not is_retryable(e):
+                    self.stats['failed'] += 1
+                    raise
+                self.stats['retries'] += 1
+                # full jitter 지수 백오프
+                await asyncio.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** n)))